@@ -0,0 +1,124 @@
+import copy
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .constants import TOKEN_CACHE_KEY, TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
+from .lru import LRUCache
+from .versions import bump_version, get_version
+
+
+def token_version_name(user_id) -> str:
+    return f"auth-user:{user_id}"
+
+
+class TokenCache:
+    """
+    Кеш токен → снимок (token, user) в два уровня: ограниченный LRU
+    с TTL в памяти процесса и, если задан TOKEN_CACHE_ALIAS, общий кеш.
+
+    Каждый снимок помнит версию пользователя; после выхода, блокировки,
+    удаления или смены пароля версия меняется и снимок не используется.
+    """
+
+    def __init__(self, max_size, ttl, alias=None):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._data = LRUCache(max_size, ttl)
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None and self.shared is not None:
+            entry = self.shared.get(TOKEN_CACHE_KEY.format(key=key))
+            if entry is not None:
+                self._data.set(key, entry)
+        if entry is not None:
+            token, version = entry
+            if version == get_version(token_version_name(token.user_id)):
+                self._count(hit=True)
+                # Каждый запрос получает свою копию, чтобы изменения
+                # request.user не попадали в общий снимок.
+                return copy.deepcopy(token)
+            self.discard(key)
+        self._count(hit=False)
+        return None
+
+    def set(self, key, token) -> None:
+        entry = (token, get_version(token_version_name(token.user_id)))
+        self._data.set(key, entry)
+        if self.shared is not None:
+            self.shared.set(
+                TOKEN_CACHE_KEY.format(key=key), entry, self._data.ttl
+            )
+
+    def discard(self, key) -> None:
+        self._data.discard(key)
+        if self.shared is not None:
+            self.shared.delete(TOKEN_CACHE_KEY.format(key=key))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+            }
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+token_cache = TokenCache(
+    max_size=getattr(settings, "TOKEN_CACHE_SIZE", TOKEN_CACHE_SIZE),
+    ttl=getattr(settings, "TOKEN_CACHE_TTL", TOKEN_CACHE_TTL),
+    alias=getattr(settings, "TOKEN_CACHE_ALIAS", None),
+)
+
+
+def invalidate_user_tokens(user_id) -> None:
+    """Сделать недействительными все закешированные токены пользователя."""
+    bump_version(token_version_name(user_id))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication, который не обращается к базе на каждый запрос:
+    пара token/user берётся из TokenCache, а база читается только при промахе.
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related("user").get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if token.user.is_active:
+                token_cache.set(key, token)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+
+        return (token.user, token)
+
+    @staticmethod
+    def stats():
+        """Счётчики попаданий и промахов кеша токенов."""
+        return token_cache.stats()
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+User = get_user_model()
+
+
+class EmailBackend(ModelBackend):
+    """
+    Аутентификация по почте и паролю: пользователь находится одним
+    запросом по уникальному индексу почты, затем проверяется пароль.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get(
+                email=User.normalize_email_address(email)
+            )
+        except User.DoesNotExist:
+            # Хешируем пароль и для несуществующего пользователя,
+            # чтобы время ответа не выдавало, зарегистрирована ли почта.
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
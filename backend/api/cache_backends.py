@@ -0,0 +1,167 @@
+import pickle
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .constants import (
+    CACHE_BYPASS_PREFIXES,
+    CACHE_LOCAL_MAX_ENTRIES,
+    CACHE_LOCAL_TIMEOUT,
+    CACHE_SHORT_PREFIXES,
+    CACHE_SHORT_TIMEOUT,
+)
+from .lru import LRUCache
+
+LOCAL = "local"
+SHARED = "shared"
+
+_missing = object()
+
+
+class TieredCache(BaseCache):
+    """
+    Кеш в два уровня: ограниченный LRU с TTL в памяти процесса перед
+    общим для всех процессов кешем (OPTIONS["SHARED"] — его алиас в CACHES).
+
+    Запись идёт в оба уровня, чтение — сначала из памяти. Другие процессы
+    не узнают о перезаписи ключа, поэтому изменяемые данные кладутся под
+    ключами с версией: сменилась версия — старая запись просто не читается.
+    В памяти запись живёт не дольше LOCAL_TIMEOUT, ключи с префиксами
+    из SHORT_PREFIXES (сами версии) — не дольше SHORT_TIMEOUT, а ключи
+    из BYPASS_PREFIXES читаются только из общего кеша.
+    """
+
+    def __init__(self, location, params):
+        params = dict(params)
+        options = params.get("OPTIONS", {})
+        params.setdefault(
+            "max_entries", options.get("MAX_ENTRIES", CACHE_LOCAL_MAX_ENTRIES)
+        )
+        super().__init__(params)
+        self.shared_alias = options.get("SHARED", SHARED)
+        self.local_timeout = options.get("LOCAL_TIMEOUT", CACHE_LOCAL_TIMEOUT)
+        self.bypass_prefixes = tuple(
+            options.get("BYPASS_PREFIXES", CACHE_BYPASS_PREFIXES)
+        )
+        self.short_prefixes = tuple(
+            options.get("SHORT_PREFIXES", CACHE_SHORT_PREFIXES)
+        )
+        self.short_timeout = options.get("SHORT_TIMEOUT", CACHE_SHORT_TIMEOUT)
+        self._local = LRUCache(self._max_entries, self.local_timeout)
+        self._lock = threading.Lock()
+        self._counters = {LOCAL: [0, 0], SHARED: [0, 0]}
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def get(self, key, default=None, version=None):
+        limit = self._local_limit(key)
+        if not limit:
+            return self._get_shared(key, default, version)
+        local_key = self.make_key(key, version=version)
+        value = self._get_local(local_key)
+        if value is not _missing:
+            return value
+        value = self._get_shared(key, _missing, version)
+        if value is _missing:
+            return default
+        self._set_local(local_key, value, limit, limit)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        self.shared.set(key, value, timeout, version=version)
+        limit = self._local_limit(key)
+        if limit:
+            local_key = self.make_key(key, version=version)
+            self._set_local(local_key, value, timeout, limit)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        added = self.shared.add(key, value, timeout, version=version)
+        limit = self._local_limit(key)
+        if limit:
+            local_key = self.make_key(key, version=version)
+            if added:
+                self._set_local(local_key, value, timeout, limit)
+            else:
+                self._delete_local(local_key)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, self._timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self._delete_local(self.make_key(key, version=version))
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _missing, version=version) is not _missing
+
+    def incr(self, key, delta=1, version=None):
+        self._delete_local(self.make_key(key, version=version))
+        return self.shared.incr(key, delta, version=version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+    def stats(self):
+        """Попадания, промахи и доля попаданий по уровням в этом процессе."""
+        with self._lock:
+            stats = {
+                tier: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": (
+                        hits / (hits + misses) if hits + misses else 0.0
+                    ),
+                }
+                for tier, (hits, misses) in self._counters.items()
+            }
+        stats[LOCAL]["size"] = len(self._local)
+        return stats
+
+    def _local_limit(self, key):
+        """Сколько секунд ключ может жить в памяти; 0 — только общий кеш."""
+        key = str(key)
+        if key.startswith(self.bypass_prefixes):
+            return 0
+        if key.startswith(self.short_prefixes):
+            return self.short_timeout
+        return self.local_timeout
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _count(self, tier: str, hit: bool) -> None:
+        with self._lock:
+            self._counters[tier][0 if hit else 1] += 1
+
+    def _get_shared(self, key, default, version):
+        value = self.shared.get(key, _missing, version=version)
+        self._count(SHARED, value is not _missing)
+        return default if value is _missing else value
+
+    def _get_local(self, local_key):
+        pickled = self._local.get(local_key)
+        self._count(LOCAL, pickled is not None)
+        if pickled is None:
+            return _missing
+        # Каждый вызов получает свою копию, как из общего кеша.
+        return pickle.loads(pickled)
+
+    def _set_local(self, local_key, value, timeout, limit) -> None:
+        if timeout is not None and timeout <= 0:
+            self._delete_local(local_key)
+            return
+        ttl = limit
+        if timeout is not None:
+            ttl = min(timeout, ttl)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._local.set(local_key, pickled, ttl)
+
+    def _delete_local(self, local_key) -> None:
+        self._local.discard(local_key)
@@ -0,0 +1,80 @@
+import gzip
+import hashlib
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List
+
+from django.utils.http import quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from .models import Ingredient
+from .versions import get_version
+
+INGREDIENTS = "ingredients"
+
+
+class IngredientPrefixIndex:
+    """
+    Неизменяемый индекс названий ингредиентов для поиска по префиксу.
+    Названия хранятся в отсортированном массиве в casefold-виде,
+    поиск — бинарный, порядок выдачи совпадает с порядком в базе.
+    """
+
+    def __init__(self, rows: Iterable[Dict]):
+        self.rows = tuple(rows)
+        keyed = sorted(
+            (row["name"].casefold(), position)
+            for position, row in enumerate(self.rows)
+        )
+        self._keys = [key for key, _ in keyed]
+        self._positions = [position for _, position in keyed]
+
+    def search(self, prefix: str) -> List[Dict]:
+        prefix = prefix.casefold()
+        positions = []
+        for index in range(bisect_left(self._keys, prefix), len(self._keys)):
+            if not self._keys[index].startswith(prefix):
+                break
+            positions.append(self._positions[index])
+        positions.sort()
+        return [self.rows[position] for position in positions]
+
+
+class IngredientCatalogue:
+    """
+    Снимок каталога ингредиентов для одной версии: индекс для поиска
+    и заранее отрендеренный JSON всего списка, обычный и сжатый gzip.
+    """
+
+    def __init__(self, rows: Iterable[Dict], version: float):
+        self.index = IngredientPrefixIndex(rows)
+        self.body = JSONRenderer().render(list(self.index.rows))
+        self.gzip_body = gzip.compress(self.body, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()
+        self.etag = quote_etag(digest)
+        self.gzip_etag = quote_etag(f"{digest}-gzip")
+        self.version = version
+        self.last_modified = int(version)
+
+
+_lock = threading.Lock()
+_catalogue = None
+
+
+def get_ingredient_catalogue() -> IngredientCatalogue:
+    """
+    Каталог ингредиентов текущего процесса.
+    Строится лениво и перестраивается, когда меняется версия каталога.
+    """
+    global _catalogue
+    version = get_version(INGREDIENTS)
+    catalogue = _catalogue
+    if catalogue is not None and catalogue.version == version:
+        return catalogue
+    with _lock:
+        if _catalogue is None or _catalogue.version != version:
+            rows = Ingredient.objects.order_by("name", "id").values(
+                "id", "name", "measurement_unit"
+            )
+            _catalogue = IngredientCatalogue(rows, version)
+        return _catalogue
@@ -1,56 +1,130 @@
-POST_STATUS_DRAFT = "draft"
-POST_STATUS_PUBLISHED = "published"
-POST_STATUSES = [
-    (POST_STATUS_DRAFT, "Черновик"),
-    (POST_STATUS_PUBLISHED, "Опубликовано"),
-]
-
-DEFAULT_ZERO = 0
-
-MIN_VALUE = 1
-MAX_VALUE = 32000
-
-MAX_PAGE_SIZE = 32000
-
-MIN_COOKING_TIME = 1
-MAX_COOKING_TIME = 32000
-MIN_INGREDIENT_AMOUNT = 1
-MAX_INGREDIENT_AMOUNT = 32000
-
-ROLE_USER = "user"
-ROLE_ADMIN = "admin"
-ROLE_MODERATOR = "moderator"
-ROLES_CHOICES = [
-    (ROLE_USER, "Пользователь"),
-    (ROLE_ADMIN, "Админ"),
-    (ROLE_MODERATOR, "Модератор"),
-]
-
-NOTIFICATION_TYPE_FOLLOW = "follow"
-NOTIFICATION_TYPE_RECIPE = "recipe"
-NOTIFICATION_TYPES = [
-    (NOTIFICATION_TYPE_FOLLOW, "Подписка"),
-    (NOTIFICATION_TYPE_RECIPE, "Новый рецепт"),
-]
-
-MAX_LENGTH_TITLE = 255
-MAX_LENGTH = 150
-MAX_LENGTH_DESCRIPTION = 1000
-
-DEFAULT_PAGE_SIZE = 10
-DEFAULT_PAGE_SIZES = [10, 20, 50, 100]
-
-MESSAGES = {
-    "subscription_exists": "Вы уже подписаны на этого автора.",
-    "recipe_added_to_favorites": "Рецепт добавлен в избранное.",
-    "recipe_removed_from_favorites": "Рецепт удален из избранного.",
-}
-
-CATEGORY_BREAKFAST = "Завтрак"
-CATEGORY_LUNCH = "Обед"
-CATEGORY_DINNER = "Ужин"
-CATEGORIES = [
-    (CATEGORY_BREAKFAST, "Завтрак"),
-    (CATEGORY_LUNCH, "Обед"),
-    (CATEGORY_DINNER, "Ужин"),
-]
+POST_STATUS_DRAFT = "draft"
+POST_STATUS_PUBLISHED = "published"
+POST_STATUSES = [
+    (POST_STATUS_DRAFT, "Черновик"),
+    (POST_STATUS_PUBLISHED, "Опубликовано"),
+]
+
+DEFAULT_ZERO = 0
+
+MIN_VALUE = 1
+MAX_VALUE = 32000
+
+MAX_PAGE_SIZE = 100
+
+PAGINATION_QUERY_PARAM = "pagination"
+CURSOR_PAGINATION = "cursor"
+
+MIN_COOKING_TIME = 1
+MAX_COOKING_TIME = 32000
+MIN_INGREDIENT_AMOUNT = 1
+MAX_INGREDIENT_AMOUNT = 32000
+
+ROLE_USER = "user"
+ROLE_ADMIN = "admin"
+ROLE_MODERATOR = "moderator"
+ROLES_CHOICES = [
+    (ROLE_USER, "Пользователь"),
+    (ROLE_ADMIN, "Админ"),
+    (ROLE_MODERATOR, "Модератор"),
+]
+
+NOTIFICATION_TYPE_FOLLOW = "follow"
+NOTIFICATION_TYPE_RECIPE = "recipe"
+NOTIFICATION_TYPES = [
+    (NOTIFICATION_TYPE_FOLLOW, "Подписка"),
+    (NOTIFICATION_TYPE_RECIPE, "Новый рецепт"),
+]
+
+EMAIL_SIMILARITY_RATIO = 0.8
+EMAIL_GRAM_SIZE = 2
+EMAIL_GRAM_MAX_LENGTH = 8
+EMAIL_SIMILARITY_CHUNK_SIZE = 500
+
+VERSION_CACHE_KEY = "version:{name}"
+
+CACHE_LOCAL_MAX_ENTRIES = 1000
+CACHE_LOCAL_TIMEOUT = 60
+# Ключи, которые читаются только из общего кеша: у токенов свой кеш
+# в памяти.
+CACHE_BYPASS_PREFIXES = ("auth:",)
+# Версии должны быть одинаковыми во всех процессах, но читаются на каждый
+# запрос по нескольку раз; в памяти процесса они живут не дольше секунды,
+# и смену версии в другом процессе тот замечает с такой же задержкой.
+CACHE_SHORT_PREFIXES = ("version:",)
+CACHE_SHORT_TIMEOUT = 1
+
+USER_RELATIONS_CACHE_SIZE = 1024
+
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_KEY = "auth:token:{key}"
+
+RESPONSE_CACHE_KEY = "response:{view}:{digest}"
+RESPONSE_CACHE_TIMEOUT = 300
+
+MAX_IMAGE_SIZE = 10 * 1024 * 1024
+IMAGE_HEADER_SIZE = 262
+ALLOWED_IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+MAX_LENGTH_CONTENT_TYPE = 100
+UPLOAD_CHUNK_MAX_SIZE = 5 * 1024 * 1024
+UPLOAD_READ_SIZE = 64 * 1024
+UPLOAD_REFERENCE_PREFIX = "upload:"
+UPLOAD_SESSION_MAX_AGE_HOURS = 24
+
+RECIPE_THUMBNAIL_SIZE = (480, 320)
+AVATAR_THUMBNAIL_SIZE = (96, 96)
+THUMBNAIL_QUALITY = 85
+WEBP_QUALITY = 80
+IMAGE_VARIANTS_QUERY_PARAM = "image_variants"
+
+BASE62_ALPHABET = (
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+)
+SHORT_LINK_CODE_LENGTH = 6
+MAX_LENGTH_SHORT_CODE = 16
+SHORT_LINK_CODE_ATTEMPTS = 5
+SHORT_LINK_CACHE_SIZE = 10000
+# Удалённый рецепт другие процессы перестают находить по коду не позже
+# чем через столько секунд.
+SHORT_LINK_CACHE_TTL = 60
+SHORT_LINK_FLUSH_INTERVAL = 30
+SHORT_LINK_FLUSH_THRESHOLD = 1000
+
+POSTINGS_MAX_IN_IDS = 500
+PANTRY_BITSET_CACHE_SIZE = 512
+
+FEED_FANOUT_LIMIT = 1000
+FEED_BACKFILL_SIZE = 100
+
+POPULARITY_FAVORITE_WEIGHT = 2.0
+POPULARITY_CART_WEIGHT = 1.0
+POPULARITY_HALF_LIFE_HOURS = 72
+POPULARITY_DECAY_INTERVAL_HOURS = 1
+POPULARITY_MIN_SCORE = 0.01
+POPULAR_ORDERING = "popular"
+
+IMPORT_BATCH_SIZE = 1000
+JSON_READ_CHUNK_SIZE = 64 * 1024
+
+MAX_LENGTH_TITLE = 255
+MAX_LENGTH = 150
+MAX_LENGTH_DESCRIPTION = 1000
+
+DEFAULT_PAGE_SIZE = 10
+DEFAULT_PAGE_SIZES = [10, 20, 50, 100]
+
+MESSAGES = {
+    "subscription_exists": "Вы уже подписаны на этого автора.",
+    "recipe_added_to_favorites": "Рецепт добавлен в избранное.",
+    "recipe_removed_from_favorites": "Рецепт удален из избранного.",
+}
+
+CATEGORY_BREAKFAST = "Завтрак"
+CATEGORY_LUNCH = "Обед"
+CATEGORY_DINNER = "Ужин"
+CATEGORIES = [
+    (CATEGORY_BREAKFAST, "Завтрак"),
+    (CATEGORY_LUNCH, "Обед"),
+    (CATEGORY_DINNER, "Ужин"),
+]
@@ -0,0 +1,79 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+# Денормализованные счётчики:
+# модель -> поле -> (связанная модель, внешний ключ).
+# Имена моделей, а не классы, чтобы пересчёт работал и в миграциях.
+COUNTERS = {
+    "User": {
+        "recipes_count": ("Recipe", "author"),
+        "followers_count": ("Subscription", "author"),
+    },
+    "Recipe": {
+        "favorites_count": ("Favorite", "recipe"),
+        "cart_count": ("ShoppingList", "recipe"),
+    },
+}
+
+
+def adjust(model, pk, field: str, delta: int) -> None:
+    """
+    Изменить счётчик одним UPDATE с F(), без чтения значения.
+    Уменьшение не опускает счётчик ниже нуля.
+    """
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gt": 0})
+    queryset.update(**{field: F(field) + delta})
+
+
+def actual_count(related_model, foreign_key: str):
+    """Выражение с настоящим количеством связанных строк."""
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(**{foreign_key: OuterRef("pk")})
+            .order_by()
+            .values(foreign_key)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def recount(apps, model_name: str, chunk_size: int) -> int:
+    """
+    Пересчитать счётчики модели пачками по chunk_size строк в порядке pk.
+    Обновляются только разошедшиеся строки; возвращается их количество.
+    """
+    model = apps.get_model("api", model_name)
+    counts = {
+        field: actual_count(apps.get_model("api", related), foreign_key)
+        for field, (related, foreign_key) in COUNTERS[model_name].items()
+    }
+    actual = {f"actual_{field}": count for field, count in counts.items()}
+    stale = reduce(
+        or_, (~Q(**{field: F(f"actual_{field}")}) for field in counts)
+    )
+    fixed = 0
+    last_pk = 0
+    while True:
+        ids = list(
+            model.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return fixed
+        last_pk = ids[-1]
+        stale_ids = list(
+            model.objects.filter(pk__in=ids)
+            .annotate(**actual)
+            .filter(stale)
+            .values_list("pk", flat=True)
+        )
+        if stale_ids:
+            fixed += model.objects.filter(pk__in=stale_ids).update(**counts)
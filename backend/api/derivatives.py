@@ -0,0 +1,189 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .constants import THUMBNAIL_QUALITY, WEBP_QUALITY
+
+logger = logging.getLogger(__name__)
+
+THUMB = "thumb"
+WEBP = "webp"
+THUMB_WEBP = "thumb_webp"
+VARIANTS = (THUMB, WEBP, THUMB_WEBP)
+
+FORMAT_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "GIF": ".gif",
+    "WEBP": ".webp",
+}
+
+
+def derivative_name(name: str, variant: str) -> str:
+    """
+    Имя производного файла рядом с оригиналом:
+    recipes/images/a.png -> a.thumb.png, a.full.webp, a.thumb.webp.
+    """
+    stem, ext = os.path.splitext(name)
+    if variant == THUMB:
+        return f"{stem}.thumb{ext}"
+    if variant == WEBP:
+        return f"{stem}.full.webp"
+    return f"{stem}.thumb.webp"
+
+
+def variant_urls(field_file) -> Optional[Dict[str, str]]:
+    """
+    Ссылки на производные изображения или None, если они ещё не готовы.
+    Миниатюра WebP пишется последней, поэтому её наличие означает,
+    что готовы все варианты.
+    """
+    if not field_file:
+        return None
+    storage = field_file.storage
+    if not storage.exists(derivative_name(field_file.name, THUMB_WEBP)):
+        return None
+    return {
+        variant: storage.url(derivative_name(field_file.name, variant))
+        for variant in VARIANTS
+    }
+
+
+def derivatives_up_to_date(storage, name: str) -> bool:
+    """
+    Готовы ли производные и построены ли они не раньше оригинала.
+    Сравнение времени нужно, если имя оригинала освободилось и заново
+    занято другим файлом, а производные от прежнего остались.
+    """
+    marker = derivative_name(name, THUMB_WEBP)
+    if not storage.exists(marker):
+        return False
+    try:
+        built = storage.get_modified_time(marker)
+        return built >= storage.get_modified_time(name)
+    except NotImplementedError:
+        return True
+
+
+def delete_derivatives(field_file) -> None:
+    """
+    Удалить производные вместе с оригиналом. Миниатюра WebP удаляется
+    первой: без неё variant_urls уже не отдаёт ссылки на остальные.
+    """
+    if field_file:
+        _delete(field_file.storage, field_file.name)
+
+
+def discard_derivatives(storage, name: Optional[str]) -> None:
+    """
+    Удалить производные файла name после фиксации транзакции:
+    для удалённой записи или заменённого изображения.
+    """
+    if name:
+        transaction.on_commit(partial(_delete, storage, name))
+
+
+def _delete(storage, name: str) -> None:
+    for variant in reversed(VARIANTS):
+        target = derivative_name(name, variant)
+        if storage.exists(target):
+            storage.delete(target)
+
+
+def _save(storage, name: str, image: Image.Image, image_format: str) -> None:
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    options = {"quality": THUMBNAIL_QUALITY, "optimize": True}
+    if image_format == "WEBP":
+        options = {"quality": WEBP_QUALITY, "method": 4}
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def generate_derivatives(
+    storage, name: str, size: Tuple[int, int]
+) -> List[str]:
+    """
+    Построить миниатюру фиксированного размера в формате оригинала
+    и WebP-версии оригинала и миниатюры. Возвращает имена записанных файлов.
+    """
+    with storage.open(name, "rb") as source:
+        image = Image.open(source)
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image_format not in FORMAT_EXTENSIONS:
+        image_format = "PNG"
+    if image.mode == "P":
+        image = image.convert("RGBA")
+
+    thumbnail = ImageOps.fit(image, size, Image.LANCZOS)
+    written = []
+    for variant, variant_image, variant_format in (
+        (THUMB, thumbnail, image_format),
+        (WEBP, image, "WEBP"),
+        (THUMB_WEBP, thumbnail, "WEBP"),
+    ):
+        target = derivative_name(name, variant)
+        _save(storage, target, variant_image, variant_format)
+        written.append(target)
+    return written
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+                thread_name_prefix="image-derivatives",
+            )
+    return _executor
+
+
+def _build(storage, name: str, size: Tuple[int, int], on_built=None) -> None:
+    try:
+        if derivatives_up_to_date(storage, name):
+            return
+        generate_derivatives(storage, name, size)
+        if on_built is not None:
+            on_built()
+    except Exception:
+        logger.exception(
+            "Не удалось построить производные изображения %s", name
+        )
+
+
+def schedule_derivatives(
+    field_file,
+    size: Tuple[int, int],
+    on_built: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    Поставить построение производных в пул после фиксации транзакции,
+    чтобы запрос не ждал обработки изображения. Варианты, построенные
+    не раньше оригинала, не пересобираются.
+    on_built вызывается, когда варианты готовы и появились в ответах.
+    """
+    if not field_file:
+        return
+    storage, name = field_file.storage, field_file.name
+    transaction.on_commit(
+        lambda: get_executor().submit(_build, storage, name, size, on_built)
+    )
@@ -0,0 +1,159 @@
+import base64
+import heapq
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Q
+
+from .constants import FEED_BACKFILL_SIZE, FEED_FANOUT_LIMIT, IMPORT_BATCH_SIZE
+from .models import FeedEntry, Recipe, Subscription, User
+
+Key = Tuple[datetime, int]
+
+
+def is_popular(followers_count: int) -> bool:
+    """
+    Рецепты популярных авторов не раскладываются по лентам подписчиков,
+    а подмешиваются при чтении.
+    """
+    return followers_count >= FEED_FANOUT_LIMIT
+
+
+def followers_count(author_id: int) -> int:
+    return (
+        User.objects.filter(pk=author_id)
+        .values_list("followers_count", flat=True)
+        .first()
+        or 0
+    )
+
+
+def fan_out_recipe(recipe_id: int, author_id: int, pub_date: datetime) -> None:
+    """Разложить новый рецепт обычного автора по лентам подписчиков."""
+    if is_popular(followers_count(author_id)):
+        return
+    subscribers = Subscription.objects.filter(author_id=author_id).values_list(
+        "subscriber_id", flat=True
+    )
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=subscriber_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for subscriber_id in subscribers.iterator()
+        ),
+        batch_size=IMPORT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(subscriber_id: int, author_id: int) -> None:
+    """После подписки добавить в ленту последние рецепты автора."""
+    if is_popular(followers_count(author_id)):
+        return
+    recipes = Recipe.objects.filter(author_id=author_id).order_by(
+        "-pub_date", "-id"
+    )
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(
+                user_id=subscriber_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for recipe_id, pub_date in recipes.values_list("id", "pub_date")[
+                :FEED_BACKFILL_SIZE
+            ]
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_followers(author_id: int) -> None:
+    """
+    Автор перестал быть популярным: его недавние рецепты больше
+    не подмешиваются при чтении, поэтому раскладываются по лентам.
+    """
+    subscribers = Subscription.objects.filter(author_id=author_id).values_list(
+        "subscriber_id", flat=True
+    )
+    for subscriber_id in subscribers.iterator():
+        backfill(subscriber_id, author_id)
+
+
+def trim(subscriber_id: int, author_id: int) -> None:
+    """После отписки убрать рецепты автора из ленты."""
+    FeedEntry.objects.filter(
+        user_id=subscriber_id, author_id=author_id
+    ).delete()
+
+
+def encode_cursor(key: Key) -> str:
+    pub_date, recipe_id = key
+    raw = f"{pub_date.isoformat()}|{recipe_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[Key]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        pub_date, recipe_id = raw.split("|")
+        return datetime.fromisoformat(pub_date), int(recipe_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def _before(key: Optional[Key], date_field: str, id_field: str) -> Q:
+    if key is None:
+        return Q()
+    pub_date, recipe_id = key
+    return Q(**{f"{date_field}__lt": pub_date}) | Q(
+        **{date_field: pub_date, f"{id_field}__lt": recipe_id}
+    )
+
+
+def read_feed(
+    user, after: Optional[Key], limit: int
+) -> Tuple[List[int], Optional[Key]]:
+    """
+    Страница ленты: id рецептов от новых к старым и ключ следующей страницы.
+    Записи ленты и рецепты популярных авторов читаются по ключу
+    (pub_date, id) и сливаются; смещения и COUNT не используются.
+    """
+    entries = (
+        FeedEntry.objects.filter(user=user)
+        .filter(_before(after, "pub_date", "recipe_id"))
+        .order_by("-pub_date", "-recipe_id")
+        .values_list("pub_date", "recipe_id")[: limit + 1]
+    )
+    popular_ids = list(
+        User.objects.filter(
+            followers__subscriber=user, followers_count__gte=FEED_FANOUT_LIMIT
+        ).values_list("id", flat=True)
+    )
+    streams = [list(entries)]
+    if popular_ids:
+        streams.append(
+            list(
+                Recipe.objects.filter(author_id__in=popular_ids)
+                .filter(_before(after, "pub_date", "id"))
+                .order_by("-pub_date", "-id")
+                .values_list("pub_date", "id")[: limit + 1]
+            )
+        )
+
+    keys = []
+    seen = set()
+    for key in heapq.merge(*streams, reverse=True):
+        if key[1] in seen:
+            continue
+        seen.add(key[1])
+        keys.append(key)
+        if len(keys) > limit:
+            break
+    next_key = keys[limit - 1] if len(keys) > limit else None
+    return [recipe_id for _, recipe_id in keys[:limit]], next_key
@@ -1,54 +1,116 @@
-import django_filters
-from django_filters.rest_framework import FilterSet, CharFilter
-
-from .models import Ingredient, Recipe
-
-
-class IngredientFilter(FilterSet):
-    """
-    Фильтр для модели Ingredient по имени.
-    Позволяет искать ингредиенты, начинающиеся на указанный префикс.
-    """
-
-    name = CharFilter(field_name="name", lookup_expr="istartswith")
-
-    class Meta:
-        model = Ingredient
-        fields = ("name",)
-
-
-class RecipeFilter(FilterSet):
-    """
-    Фильтр для модели Recipe.
-    Позволяет фильтровать рецепты по автору, а также по наличию в избранном и корзине.
-    """
-
-    author = django_filters.NumberFilter(field_name="author")
-    is_favorited = django_filters.BooleanFilter(
-        method="filter_is_favorited", label="В избранном"
-    )
-    is_in_shopping_cart = django_filters.BooleanFilter(
-        method="filter_is_in_shopping_cart", label="В корзине"
-    )
-
-    def filter_is_favorited(self, queryset, name, value):
-        """
-        Фильтрация рецептов, добавленных в избранное текущего пользователя.
-        """
-        user = getattr(self.request, "user", None)
-        if value and user and user.is_authenticated:
-            return queryset.filter(favorites__user=user)
-        return queryset
-
-    def filter_is_in_shopping_cart(self, queryset, name, value):
-        """
-        Фильтрация рецептов, добавленных в корзину текущего пользователя.
-        """
-        user = getattr(self.request, "user", None)
-        if value and user and user.is_authenticated:
-            return queryset.filter(shoppinglist__user=user)
-        return queryset
-
-    class Meta:
-        model = Recipe
-        fields = ("author", "is_favorited", "is_in_shopping_cart")
+import django_filters
+from django_filters.rest_framework import FilterSet, CharFilter
+from django_filters.widgets import BooleanWidget
+
+from .constants import POPULAR_ORDERING
+from .models import Ingredient, Recipe
+from .postings import filter_by_ingredients
+from .search import search_recipes
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    """Список чисел через запятую: ?ingredients=1,2,3."""
+
+
+class IngredientFilter(FilterSet):
+    """
+    Фильтр для модели Ingredient по имени.
+    Позволяет искать ингредиенты, начинающиеся на указанный префикс.
+    """
+
+    name = CharFilter(field_name="name", lookup_expr="istartswith")
+
+    class Meta:
+        model = Ingredient
+        fields = ("name",)
+
+
+class RecipeFilter(FilterSet):
+    """
+    Фильтр для модели Recipe.
+    Позволяет фильтровать рецепты по автору, а также по наличию в избранном и корзине.
+    Параметр search — полнотекстовый поиск по названию и описанию,
+    ordering=popular — сортировка по популярности.
+    """
+
+    author = django_filters.NumberFilter(field_name="author")
+    is_favorited = django_filters.BooleanFilter(
+        method="filter_is_favorited",
+        label="В избранном",
+        widget=BooleanWidget(),
+    )
+    is_in_shopping_cart = django_filters.BooleanFilter(
+        method="filter_is_in_shopping_cart",
+        label="В корзине",
+        widget=BooleanWidget(),
+    )
+    search = CharFilter(method="filter_search", label="Поиск")
+    ingredients = NumberInFilter(
+        method="filter_ingredients", label="Все ингредиенты из списка"
+    )
+    exclude_ingredients = NumberInFilter(
+        method="filter_ingredients", label="Без ингредиентов из списка"
+    )
+    ordering = django_filters.ChoiceFilter(
+        choices=((POPULAR_ORDERING, "По популярности"),),
+        method="filter_ordering",
+        label="Сортировка",
+    )
+
+    def filter_is_favorited(self, queryset, name, value):
+        """
+        Фильтрация рецептов, добавленных в избранное текущего пользователя.
+        """
+        if not value:
+            return queryset
+        user = getattr(self.request, "user", None)
+        if user and user.is_authenticated:
+            return queryset.filter(favorited_by__user=user)
+        return queryset.none()
+
+    def filter_is_in_shopping_cart(self, queryset, name, value):
+        """
+        Фильтрация рецептов, добавленных в корзину текущего пользователя.
+        """
+        if not value:
+            return queryset
+        user = getattr(self.request, "user", None)
+        if user and user.is_authenticated:
+            return queryset.filter(in_shopping_carts__user=user)
+        return queryset.none()
+
+    def filter_search(self, queryset, name, value):
+        """Поиск по полнотекстовому индексу с сортировкой по релевантности."""
+        return search_recipes(queryset, value)
+
+    def filter_ingredients(self, queryset, name, value):
+        """
+        ingredients и exclude_ingredients применяются вместе, за один раз:
+        пересечение и разность считаются по индексу ингредиентов.
+        """
+        data = self.form.cleaned_data
+        if name == "exclude_ingredients" and data.get("ingredients"):
+            return queryset
+        return filter_by_ingredients(
+            queryset,
+            required=[int(pk) for pk in data.get("ingredients") or ()],
+            excluded=[int(pk) for pk in data.get("exclude_ingredients") or ()],
+        )
+
+    def filter_ordering(self, queryset, name, value):
+        """Сортировка по индексу (popularity, id) после остальных фильтров."""
+        if value == POPULAR_ORDERING:
+            return queryset.order_by("-popularity", "-id")
+        return queryset
+
+    class Meta:
+        model = Recipe
+        fields = (
+            "author",
+            "is_favorited",
+            "is_in_shopping_cart",
+            "search",
+            "ingredients",
+            "exclude_ingredients",
+            "ordering",
+        )
@@ -0,0 +1,145 @@
+import difflib
+import random
+import statistics
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.constants import EMAIL_SIMILARITY_RATIO, IMPORT_BATCH_SIZE
+from api.models import EmailGram, User
+from api.similarity import email_grams, find_similar_email, normalize_email
+
+DOMAINS = ("example.org", "mail.ru", "yandex.ru", "gmail.com", "inbox.ru")
+
+
+def legacy_similar_email(email):
+    """Прежняя проверка: ratio() со всеми пользователями подряд."""
+    email_lower = email.lower()
+    for user in User.objects.only("email").iterator():
+        similarity = difflib.SequenceMatcher(
+            None, email_lower, user.email.lower()
+        ).ratio()
+        if similarity >= EMAIL_SIMILARITY_RATIO:
+            return user.email
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение поиска похожей почты по индексу биграмм с прежним "
+        "перебором всех пользователей через difflib. Данные создаются "
+        "в транзакции и откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000,1000000",
+            help="Количества пользователей через запятую.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Количество повторов каждой проверки.",
+        )
+        parser.add_argument(
+            "--skip-legacy",
+            action="store_true",
+            help="Не замерять прежний перебор.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(
+                {int(size) for size in options["sizes"].split(",")}
+            )
+        except ValueError:
+            raise CommandError("--sizes: ожидаются числа через запятую.")
+        if not sizes or sizes[0] < 1 or options["repeat"] < 1:
+            raise CommandError("Количество должно быть положительным.")
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            emails = []
+            for size in sizes:
+                started = time.monotonic()
+                self._generate(emails, size, rng)
+                self.stdout.write(
+                    f"{connection.vendor}: {size} пользователей, "
+                    f"подготовка {time.monotonic() - started:.1f} с"
+                )
+                # Новый адрес без похожих — худший случай для перебора;
+                # опечатка в существующем адресе находится раньше.
+                probes = {
+                    "новый адрес": self._email(rng, suffix="new"),
+                    "опечатка": self._typo(rng.choice(emails), rng),
+                }
+                for name, email in probes.items():
+                    self._measure(
+                        f"индекс, {name}",
+                        find_similar_email,
+                        email,
+                        options["repeat"],
+                    )
+                    if not options["skip_legacy"]:
+                        self._measure(
+                            f"перебор, {name}",
+                            legacy_similar_email,
+                            email,
+                            options["repeat"],
+                        )
+            transaction.set_rollback(True)
+
+    def _email(self, rng, suffix=""):
+        letters = rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))
+        name = "".join(letters)
+        return f"{name}{rng.randint(0, 9999)}{suffix}@{rng.choice(DOMAINS)}"
+
+    def _typo(self, email, rng):
+        index = rng.randrange(email.index("@"))
+        letter = rng.choice(string.ascii_lowercase)
+        return email[:index] + letter + email[index + 1:]
+
+    def _generate(self, emails, total, rng):
+        while len(emails) < total:
+            batch = []
+            for _ in range(min(IMPORT_BATCH_SIZE, total - len(emails))):
+                number = len(emails) + len(batch)
+                batch.append(
+                    User(
+                        username=f"similarity-benchmark-{number}",
+                        email=self._email(rng, suffix=f".{number}"),
+                    )
+                )
+            # bulk_create не отправляет post_save, поэтому биграммы
+            # строятся здесь же, как это делает sync_email_grams.
+            users = User.objects.bulk_create(batch)
+            if users and users[0].pk is None:
+                users = User.objects.filter(
+                    username__in=[user.username for user in users]
+                )
+            EmailGram.objects.bulk_create(
+                (
+                    EmailGram(user=user, gram=gram, length=len(email))
+                    for user in users
+                    for email in (normalize_email(user.email),)
+                    for gram in email_grams(email)
+                ),
+                batch_size=IMPORT_BATCH_SIZE,
+            )
+            emails.extend(user.email for user in batch)
+
+    def _measure(self, name, check, email, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = check(email)
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f"{name}: {'найдено' if found else 'не найдено'}, "
+            f"p50 {statistics.median(timings):.1f} мс, "
+            f"max {max(timings):.1f} мс"
+        )
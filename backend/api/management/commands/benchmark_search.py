@@ -0,0 +1,93 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.constants import IMPORT_BATCH_SIZE
+from api.models import Recipe, User
+from api.search import search_recipes
+
+WORDS = (
+    "борщ щи суп солянка рассольник уха окрошка каша плов пирог блины "
+    "оладьи сырники котлеты пельмени вареники омлет салат винегрет рагу "
+    "гуляш жаркое запеканка картофель морковь свёкла капуста лук чеснок "
+    "говядина свинина курица индейка рыба сметана сливки молоко яйца мука "
+    "гречка рис пшено укроп петрушка перец соль сахар масло томаты грибы "
+    "тушить варить жарить запекать нарезать добавить смешать посолить подать"
+).split()
+QUERIES = (
+    "борщ",
+    "курица грибы",
+    "пирог с капустой",
+    "сметана",
+    "жаркое свинина",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер полнотекстового поиска рецептов на синтетических данных. "
+        "Данные создаются в транзакции и откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=1_000_000,
+            help="Количество синтетических рецептов.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Количество повторов каждого запроса.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["recipes"] < 1 or options["repeat"] < 1:
+            raise CommandError("Количество должно быть положительным.")
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            started = time.monotonic()
+            self._generate(options["recipes"], rng)
+            self.stdout.write(
+                f"{connection.vendor}: {options['recipes']} рецептов за "
+                f"{time.monotonic() - started:.1f} с"
+            )
+            for query in QUERIES:
+                self._measure(query, options["repeat"])
+            transaction.set_rollback(True)
+
+    def _generate(self, total, rng):
+        author = User.objects.create(
+            username="search-benchmark", email="search-benchmark@example.org"
+        )
+        for start in range(0, total, IMPORT_BATCH_SIZE):
+            Recipe.objects.bulk_create(
+                Recipe(
+                    author=author,
+                    name=" ".join(rng.choices(WORDS, k=3)).capitalize(),
+                    text=" ".join(rng.choices(WORDS, k=40)),
+                    cooking_time=rng.randint(1, 180),
+                )
+                for _ in range(min(IMPORT_BATCH_SIZE, total - start))
+            )
+
+    def _measure(self, query, repeat):
+        queryset = search_recipes(Recipe.objects.only("id"), query)
+        count = queryset.count()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f"«{query}»: найдено {count}, первая страница "
+            f"p50 {statistics.median(timings):.1f} мс, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:.1f} мс"
+        )
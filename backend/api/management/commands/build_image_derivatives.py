@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.constants import AVATAR_THUMBNAIL_SIZE, RECIPE_THUMBNAIL_SIZE
+from api.derivatives import derivatives_up_to_date, generate_derivatives
+from api.models import Recipe, User
+
+
+class Command(BaseCommand):
+    help = "Построение миниатюр и WebP-версий для уже загруженных изображений."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересобрать производные, даже если они уже есть.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.IMAGE_DERIVATIVE_WORKERS,
+            help="Количество потоков обработки.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("Количество потоков должно быть положительным.")
+        self.force = options["force"]
+        recipe_storage = Recipe._meta.get_field("image").storage
+        avatar_storage = User._meta.get_field("avatar").storage
+        jobs = [
+            (recipe_storage, name, RECIPE_THUMBNAIL_SIZE)
+            for name in Recipe.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .values_list("image", flat=True)
+        ] + [
+            (avatar_storage, name, AVATAR_THUMBNAIL_SIZE)
+            for name in User.objects.exclude(avatar="")
+            .exclude(avatar__isnull=True)
+            .values_list("avatar", flat=True)
+        ]
+
+        built = skipped = failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for name, result in zip(
+                (name for _, name, _ in jobs),
+                executor.map(lambda job: self._build(*job), jobs),
+            ):
+                if result is None:
+                    skipped += 1
+                elif isinstance(result, Exception):
+                    failed += 1
+                    self.stderr.write(f"{name}: {result}")
+                else:
+                    built += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Построено: {built}, пропущено: {skipped}, ошибок: {failed}."
+            )
+        )
+
+    def _build(self, storage, name, size):
+        try:
+            if not self.force and derivatives_up_to_date(storage, name):
+                return None
+            return generate_derivatives(storage, name, size)
+        except Exception as error:
+            return error
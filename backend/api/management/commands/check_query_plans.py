@@ -0,0 +1,124 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from api.models import Recipe, RecipeIngredient, Subscription, User
+from api.search import search_recipes
+
+# Обход виртуальной таблицы FTS5 — это поиск по её индексу, а не скан.
+SQLITE_SCAN = re.compile(
+    r"\bSCAN (?:TABLE )?(\w+)\b(?! VIRTUAL TABLE)"
+    r"(?: USING (?:COVERING )?INDEX (\w+))?"
+)
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)()")
+
+
+# Упорядоченный проход по индексу с LIMIT допустим: он читает только
+# первые строки индекса, а не всю таблицу.
+ORDERED_SCANS = {
+    "recipe list": {("api_recipe", "recipe_pub_date_id_idx")},
+}
+
+
+def full_scans(plan: str, pattern, allowed=frozenset()):
+    """Таблицы, которые план читает полным сканированием."""
+    return sorted(
+        {
+            table
+            for table, index in pattern.findall(plan)
+            if (table, index) not in allowed
+        }
+    )
+
+
+def hot_queries(user):
+    """Запросы горячих путей API, план которых проверяется."""
+    return {
+        "recipe list": Recipe.objects.for_read(user)[:10],
+        "recipe search": (
+            search_recipes(Recipe.objects.for_read(user), "борщ")[:10]
+        ),
+        "trending recipes": (
+            Recipe.objects.for_read(user)
+            .filter(popularity__gt=0)
+            .order_by("-popularity", "-id")[:10]
+        ),
+        "recipe list by author": (
+            Recipe.objects.for_read(user).filter(author_id=user.pk)[:10]
+        ),
+        "favorited recipes": (
+            Recipe.objects.with_user_flags(user)
+            .filter(favorited_by__user=user)
+            .distinct()[:10]
+        ),
+        "shopping cart recipes": (
+            Recipe.objects.with_user_flags(user)
+            .filter(in_shopping_carts__user=user)
+            .distinct()[:10]
+        ),
+        "shopping cart export": (
+            RecipeIngredient.objects.filter(
+                recipe__in_shopping_carts__user=user
+            )
+            .values("ingredient__name", "ingredient__measurement_unit")
+            .annotate(total_amount=Sum("amount"))
+            .order_by("ingredient__name", "ingredient__measurement_unit")
+        ),
+        "subscriptions": (
+            User.objects.filter(followers__subscriber=user)
+            .order_by("username")[:10]
+        ),
+        "is_subscribed": Subscription.objects.filter(
+            subscriber=user, author_id=user.pk
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Проверка планов запросов горячих путей API: завершается с ошибкой, "
+        "если какой-либо запрос читает таблицу полным сканированием."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Печатать планы всех запросов.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite":
+            pattern = SQLITE_SCAN
+        elif connection.vendor == "postgresql":
+            pattern = POSTGRES_SCAN
+        else:
+            raise CommandError(f"СУБД {connection.vendor} не поддерживается.")
+
+        user = User(pk=0)
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # На маленьких таблицах планировщик предпочитает Seq Scan,
+                # поэтому проверяем, есть ли вообще путь через индекс.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for name, queryset in hot_queries(user).items():
+                plan = queryset.explain()
+                if options["verbose_plans"]:
+                    self.stdout.write(f"== {name}\n{plan}")
+                tables = full_scans(
+                    plan, pattern, ORDERED_SCANS.get(name, set())
+                )
+                if tables:
+                    failures.append(f"{name}: {', '.join(tables)}")
+
+        if failures:
+            raise CommandError(
+                "Полное сканирование:\n" + "\n".join(failures)
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Все запросы используют индексы.")
+        )
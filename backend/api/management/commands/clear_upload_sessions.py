@@ -0,0 +1,59 @@
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.constants import UPLOAD_SESSION_MAX_AGE_HOURS
+from api.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаление брошенных сессий загрузки и их файлов, а также файлов "
+        "в UPLOAD_SESSIONS_DIR, для которых сессии уже нет."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=UPLOAD_SESSION_MAX_AGE_HOURS,
+            help="Сколько часов сессия может оставаться незавершённой.",
+        )
+
+    def handle(self, *args, **options):
+        if options["hours"] < 0:
+            raise CommandError("Количество часов должно быть положительным.")
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        sessions = 0
+        for session in UploadSession.objects.filter(created__lt=cutoff):
+            session.discard()
+            sessions += 1
+
+        files = 0
+        directory = settings.UPLOAD_SESSIONS_DIR
+        if os.path.isdir(directory):
+            known = {
+                f"{session_id}.part"
+                for session_id in UploadSession.objects.values_list(
+                    "id", flat=True
+                )
+            }
+            oldest = time.time() - options["hours"] * 3600
+            for entry in os.scandir(directory):
+                if (
+                    entry.is_file()
+                    and entry.name not in known
+                    and entry.stat().st_mtime < oldest
+                ):
+                    os.remove(entry.path)
+                    files += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Удалено сессий: {sessions}, лишних файлов: {files}."
+            )
+        )
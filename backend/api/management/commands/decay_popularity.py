@@ -0,0 +1,48 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from api.constants import IMPORT_BATCH_SIZE, POPULARITY_DECAY_INTERVAL_HOURS
+from api.models import Recipe
+from api.popularity import decay, rebuild
+from api.response_cache import RECIPES, bump_versions
+
+
+class Command(BaseCommand):
+    help = (
+        "Затухание оценок популярности рецептов. Запускается периодически "
+        "с интервалом --hours; с --rebuild оценки пересчитываются с нуля."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=POPULARITY_DECAY_INTERVAL_HOURS,
+            help="Сколько часов прошло с предыдущего запуска.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help=(
+                "Пересчитать оценки по датам добавления в избранное "
+                "и покупки."
+            ),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Количество рецептов, обновляемых одним запросом.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["hours"] < 0:
+            raise CommandError("Параметры должны быть положительными.")
+        if options["rebuild"]:
+            scored = rebuild(apps, options["chunk_size"])
+        else:
+            scored = decay(Recipe, options["hours"], options["chunk_size"])
+        # Пачки уже зафиксированы: кешированные ?ordering=popular
+        # и /trending/ должны отдать новый порядок.
+        bump_versions(RECIPES)
+        self.stdout.write(f"Рецептов с ненулевой оценкой: {scored}")
@@ -0,0 +1,200 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.catalogue import INGREDIENTS
+from api.constants import IMPORT_BATCH_SIZE, JSON_READ_CHUNK_SIZE
+from api.models import Ingredient
+from api.versions import bump_version
+
+DEFAULT_PATH = Path(settings.BASE_DIR).parent / "data" / "ingredients.csv"
+
+Row = Tuple[str, str]
+
+
+def read_csv(file) -> Iterator[Row]:
+    """Строки CSV вида «название,единица измерения»."""
+    for row in csv.reader(file):
+        if len(row) >= 2 and row[0].strip():
+            yield row[0].strip(), row[1].strip()
+
+
+def read_json(file) -> Iterator[Row]:
+    """
+    Объекты JSON-массива [{"name": ..., "measurement_unit": ...}, ...].
+    Файл читается кусками, в памяти держится только текущий объект.
+    """
+    decoder = json.JSONDecoder()
+    index = 0
+    buffer = ""
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started:
+            if buffer.startswith("["):
+                buffer = buffer[1:]
+                started = True
+                continue
+        elif buffer.startswith(","):
+            buffer = buffer[1:]
+            continue
+        elif buffer.startswith("]"):
+            return
+        elif buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise CommandError("Некорректный JSON-файл ингредиентов.")
+            else:
+                buffer = buffer[end:]
+                index += 1
+                row = json_row(item, index)
+                if row[0]:
+                    yield row
+                continue
+        if eof:
+            raise CommandError("Некорректный JSON-файл ингредиентов.")
+        chunk = file.read(JSON_READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer += chunk
+
+
+def json_row(item, index: int) -> Row:
+    """Название и единица измерения из объекта с номером index."""
+    try:
+        return item["name"].strip(), item["measurement_unit"].strip()
+    except (KeyError, TypeError, AttributeError):
+        raise CommandError(
+            f"Ингредиент №{index} в JSON-файле должен быть объектом "
+            "со строковыми полями name и measurement_unit."
+        )
+
+
+def batches(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    """Пачки строк без повторов внутри пачки."""
+    rows = iter(rows)
+    while True:
+        batch = list(dict.fromkeys(islice(rows, size)))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Загрузка ингредиентов из CSV или JSON файла."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=str(DEFAULT_PATH),
+            help=(
+                "Путь к файлу ингредиентов "
+                "(по умолчанию data/ingredients.csv)."
+            ),
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "json"],
+            help="Формат файла; по умолчанию определяется по расширению.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Количество строк в одной вставке.",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Не использовать COPY на PostgreSQL.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"Файл {path} не найден.")
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ("csv", "json"):
+            raise CommandError("Поддерживаются только форматы csv и json.")
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("Размер пачки должен быть положительным.")
+
+        reader = read_csv if file_format == "csv" else read_json
+        use_copy = connection.vendor == "postgresql" and not options["no_copy"]
+
+        started = time.monotonic()
+        before = Ingredient.objects.count()
+        with path.open(encoding="utf-8", newline="") as file:
+            with transaction.atomic():
+                if use_copy:
+                    total = self._load_with_copy(reader(file), batch_size)
+                else:
+                    total = self._load_with_bulk_create(
+                        reader(file), batch_size
+                    )
+        created = Ingredient.objects.count() - before
+        elapsed = time.monotonic() - started
+        bump_version(INGREDIENTS)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Прочитано строк: {total}, "
+                f"добавлено ингредиентов: {created}, "
+                f"{total / elapsed if elapsed else total:.0f} строк/с."
+            )
+        )
+
+    def _load_with_bulk_create(self, rows, batch_size):
+        total = 0
+        for batch in batches(rows, batch_size):
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(name=name, measurement_unit=unit)
+                    for name, unit in batch
+                ),
+                ignore_conflicts=True,
+            )
+            total += len(batch)
+        return total
+
+    def _load_with_copy(self, rows, batch_size):
+        """
+        COPY во временную таблицу и перенос с ON CONFLICT DO NOTHING
+        по ограничению unique_ingredient_unit.
+        """
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE ingredient_import "
+                "(name text, measurement_unit text) ON COMMIT DROP"
+            )
+            for batch in batches(rows, batch_size):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    "COPY ingredient_import (name, measurement_unit) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+                cursor.execute(
+                    f"INSERT INTO {table} (name, measurement_unit) "
+                    "SELECT name, measurement_unit FROM ingredient_import "
+                    "ON CONFLICT (name, measurement_unit) DO NOTHING"
+                )
+                cursor.execute("TRUNCATE ingredient_import")
+                total += len(batch)
+        return total
@@ -0,0 +1,27 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from api.constants import IMPORT_BATCH_SIZE
+from api.counters import COUNTERS, recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверка денормализованных счётчиков пользователей и рецептов "
+        "с настоящими количествами и исправление расхождений."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Количество строк, пересчитываемых одним запросом.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("Размер пачки должен быть положительным.")
+        for model_name in COUNTERS:
+            fixed = recount(apps, model_name, options["chunk_size"])
+            self.stdout.write(f"{model_name}: исправлено строк — {fixed}")
@@ -1,491 +1,491 @@
-# Generated by Django 3.2.16 on 2025-05-26 16:29
-
-from django.conf import settings
-import django.contrib.auth.models
-import django.contrib.auth.validators
-import django.core.validators
-from django.db import migrations, models
-import django.db.models.deletion
-import django.utils.timezone
-
-
-class Migration(migrations.Migration):
-
-    initial = True
-
-    dependencies = [
-        ("auth", "0012_alter_user_first_name_max_length"),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name="User",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                ("password", models.CharField(max_length=128, verbose_name="password")),
-                (
-                    "last_login",
-                    models.DateTimeField(
-                        blank=True, null=True, verbose_name="last login"
-                    ),
-                ),
-                (
-                    "is_superuser",
-                    models.BooleanField(
-                        default=False,
-                        help_text="Designates that this user has all permissions without explicitly assigning them.",
-                        verbose_name="superuser status",
-                    ),
-                ),
-                (
-                    "username",
-                    models.CharField(
-                        error_messages={
-                            "unique": "A user with that username already exists."
-                        },
-                        help_text="Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.",
-                        max_length=150,
-                        unique=True,
-                        validators=[
-                            django.contrib.auth.validators.UnicodeUsernameValidator()
-                        ],
-                        verbose_name="username",
-                    ),
-                ),
-                (
-                    "first_name",
-                    models.CharField(
-                        blank=True, max_length=150, verbose_name="first name"
-                    ),
-                ),
-                (
-                    "last_name",
-                    models.CharField(
-                        blank=True, max_length=150, verbose_name="last name"
-                    ),
-                ),
-                (
-                    "email",
-                    models.EmailField(
-                        blank=True, max_length=254, verbose_name="email address"
-                    ),
-                ),
-                (
-                    "is_staff",
-                    models.BooleanField(
-                        default=False,
-                        help_text="Designates whether the user can log into this admin site.",
-                        verbose_name="staff status",
-                    ),
-                ),
-                (
-                    "is_active",
-                    models.BooleanField(
-                        default=True,
-                        help_text="Designates whether this user should be treated as active. Unselect this instead of deleting accounts.",
-                        verbose_name="active",
-                    ),
-                ),
-                (
-                    "date_joined",
-                    models.DateTimeField(
-                        default=django.utils.timezone.now, verbose_name="date joined"
-                    ),
-                ),
-                (
-                    "avatar",
-                    models.ImageField(
-                        blank=True,
-                        null=True,
-                        upload_to="avatars/",
-                        verbose_name="Аватар",
-                    ),
-                ),
-            ],
-            options={
-                "verbose_name": "user",
-                "verbose_name_plural": "users",
-                "abstract": False,
-            },
-            managers=[
-                ("objects", django.contrib.auth.models.UserManager()),
-            ],
-        ),
-        migrations.CreateModel(
-            name="Favorite",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                (
-                    "date_added",
-                    models.DateTimeField(
-                        auto_now_add=True, verbose_name="Дата добавления"
-                    ),
-                ),
-            ],
-            options={
-                "verbose_name": "Избранное",
-                "verbose_name_plural": "Избранное",
-            },
-        ),
-        migrations.CreateModel(
-            name="Ingredient",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                (
-                    "name",
-                    models.CharField(
-                        max_length=128, verbose_name="Название ингредиента"
-                    ),
-                ),
-                (
-                    "measurement_unit",
-                    models.CharField(max_length=64, verbose_name="Единица измерения"),
-                ),
-            ],
-            options={
-                "verbose_name": "Ингредиент",
-                "verbose_name_plural": "Ингредиенты",
-                "ordering": ["name"],
-            },
-        ),
-        migrations.CreateModel(
-            name="Recipe",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                (
-                    "name",
-                    models.CharField(max_length=256, verbose_name="Название рецепта"),
-                ),
-                (
-                    "image",
-                    models.ImageField(
-                        blank=True,
-                        null=True,
-                        upload_to="recipes/images/",
-                        verbose_name="Изображение рецепта",
-                    ),
-                ),
-                ("text", models.TextField(verbose_name="Описание рецепта")),
-                (
-                    "cooking_time",
-                    models.PositiveSmallIntegerField(
-                        validators=[django.core.validators.MinValueValidator(1)],
-                        verbose_name="Время приготовления (в минутах)",
-                    ),
-                ),
-                (
-                    "pub_date",
-                    models.DateTimeField(
-                        auto_now_add=True, verbose_name="Дата публикации"
-                    ),
-                ),
-                (
-                    "author",
-                    models.ForeignKey(
-                        on_delete=django.db.models.deletion.CASCADE,
-                        related_name="recipes",
-                        to=settings.AUTH_USER_MODEL,
-                        verbose_name="Автор рецепта",
-                    ),
-                ),
-            ],
-            options={
-                "verbose_name": "Рецепт",
-                "verbose_name_plural": "Рецепты",
-                "ordering": ["-pub_date"],
-            },
-        ),
-        migrations.CreateModel(
-            name="Tag",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                (
-                    "name",
-                    models.CharField(
-                        max_length=64, unique=True, verbose_name="Название тега"
-                    ),
-                ),
-                (
-                    "color",
-                    models.CharField(
-                        help_text="Цвет в формате HEX, например, #FFFFFF",
-                        max_length=7,
-                        unique=True,
-                        validators=[
-                            django.core.validators.RegexValidator(
-                                message="Введите цвет в формате HEX, например, #FFFFFF",
-                                regex="^#([A-Fa-f0-9]{6})$",
-                            )
-                        ],
-                        verbose_name="Цвет тега в HEX",
-                    ),
-                ),
-                (
-                    "slug",
-                    models.SlugField(
-                        max_length=64, unique=True, verbose_name="Идентификатор тега"
-                    ),
-                ),
-            ],
-            options={
-                "verbose_name": "Тег",
-                "verbose_name_plural": "Теги",
-                "ordering": ["name"],
-            },
-        ),
-        migrations.CreateModel(
-            name="Subscription",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                (
-                    "author",
-                    models.ForeignKey(
-                        help_text="Пользователь, на которого подписываются",
-                        on_delete=django.db.models.deletion.CASCADE,
-                        related_name="followers",
-                        to=settings.AUTH_USER_MODEL,
-                        verbose_name="Автор",
-                    ),
-                ),
-                (
-                    "subscriber",
-                    models.ForeignKey(
-                        help_text="Пользователь, который подписывается",
-                        on_delete=django.db.models.deletion.CASCADE,
-                        related_name="subscriptions",
-                        to=settings.AUTH_USER_MODEL,
-                        verbose_name="Подписчик",
-                    ),
-                ),
-            ],
-            options={
-                "verbose_name": "Подписка",
-                "verbose_name_plural": "Подписки",
-                "ordering": ["author__username"],
-            },
-        ),
-        migrations.CreateModel(
-            name="ShoppingList",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                (
-                    "date_added",
-                    models.DateTimeField(
-                        auto_now_add=True, verbose_name="Дата добавления"
-                    ),
-                ),
-                (
-                    "recipe",
-                    models.ForeignKey(
-                        on_delete=django.db.models.deletion.CASCADE,
-                        related_name="in_shopping_carts",
-                        to="api.recipe",
-                        verbose_name="Рецепт",
-                    ),
-                ),
-                (
-                    "user",
-                    models.ForeignKey(
-                        on_delete=django.db.models.deletion.CASCADE,
-                        related_name="shopping_carts",
-                        to=settings.AUTH_USER_MODEL,
-                        verbose_name="Пользователь",
-                    ),
-                ),
-            ],
-            options={
-                "verbose_name": "Список покупок",
-                "verbose_name_plural": "Списки покупок",
-            },
-        ),
-        migrations.CreateModel(
-            name="RecipeIngredient",
-            fields=[
-                (
-                    "id",
-                    models.BigAutoField(
-                        auto_created=True,
-                        primary_key=True,
-                        serialize=False,
-                        verbose_name="ID",
-                    ),
-                ),
-                (
-                    "amount",
-                    models.PositiveSmallIntegerField(
-                        validators=[django.core.validators.MinValueValidator(1)],
-                        verbose_name="Количество",
-                    ),
-                ),
-                (
-                    "ingredient",
-                    models.ForeignKey(
-                        on_delete=django.db.models.deletion.CASCADE,
-                        related_name="used_in_recipes",
-                        to="api.ingredient",
-                        verbose_name="Ингредиент",
-                    ),
-                ),
-                (
-                    "recipe",
-                    models.ForeignKey(
-                        on_delete=django.db.models.deletion.CASCADE,
-                        related_name="ingredients_amounts",
-                        to="api.recipe",
-                        verbose_name="Рецепт",
-                    ),
-                ),
-            ],
-            options={
-                "verbose_name": "Ингредиент в рецепте",
-                "verbose_name_plural": "Ингредиенты в рецепте",
-            },
-        ),
-        migrations.AddField(
-            model_name="recipe",
-            name="ingredients",
-            field=models.ManyToManyField(
-                related_name="recipes",
-                through="api.RecipeIngredient",
-                to="api.Ingredient",
-                verbose_name="Ингредиенты в рецепте",
-            ),
-        ),
-        migrations.AddField(
-            model_name="recipe",
-            name="tags",
-            field=models.ManyToManyField(
-                related_name="recipes", to="api.Tag", verbose_name="Теги"
-            ),
-        ),
-        migrations.AddConstraint(
-            model_name="ingredient",
-            constraint=models.UniqueConstraint(
-                fields=("name", "measurement_unit"), name="unique_ingredient_unit"
-            ),
-        ),
-        migrations.AddField(
-            model_name="favorite",
-            name="recipe",
-            field=models.ForeignKey(
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name="favorited_by",
-                to="api.recipe",
-                verbose_name="Рецепт",
-            ),
-        ),
-        migrations.AddField(
-            model_name="favorite",
-            name="user",
-            field=models.ForeignKey(
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name="favorites",
-                to=settings.AUTH_USER_MODEL,
-                verbose_name="Пользователь",
-            ),
-        ),
-        migrations.AddField(
-            model_name="user",
-            name="groups",
-            field=models.ManyToManyField(
-                blank=True,
-                help_text="The groups this user belongs to. A user will get all permissions granted to each of their groups.",
-                related_name="user_set",
-                related_query_name="user",
-                to="auth.Group",
-                verbose_name="groups",
-            ),
-        ),
-        migrations.AddField(
-            model_name="user",
-            name="user_permissions",
-            field=models.ManyToManyField(
-                blank=True,
-                help_text="Specific permissions for this user.",
-                related_name="user_set",
-                related_query_name="user",
-                to="auth.Permission",
-                verbose_name="user permissions",
-            ),
-        ),
-        migrations.AddConstraint(
-            model_name="subscription",
-            constraint=models.UniqueConstraint(
-                fields=("author", "subscriber"), name="unique_subscription"
-            ),
-        ),
-        migrations.AddConstraint(
-            model_name="shoppinglist",
-            constraint=models.UniqueConstraint(
-                fields=("user", "recipe"), name="unique_shopping_cart"
-            ),
-        ),
-        migrations.AddConstraint(
-            model_name="recipeingredient",
-            constraint=models.UniqueConstraint(
-                fields=("recipe", "ingredient"), name="unique_recipe_ingredient"
-            ),
-        ),
-        migrations.AddConstraint(
-            model_name="favorite",
-            constraint=models.UniqueConstraint(
-                fields=("user", "recipe"), name="unique_favorite"
-            ),
-        ),
-    ]
+# Generated by Django 3.2.16 on 2025-05-26 16:29
+
+from django.conf import settings
+import django.contrib.auth.models
+import django.contrib.auth.validators
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="User",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("password", models.CharField(max_length=128, verbose_name="password")),
+                (
+                    "last_login",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="last login"
+                    ),
+                ),
+                (
+                    "is_superuser",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Designates that this user has all permissions without explicitly assigning them.",
+                        verbose_name="superuser status",
+                    ),
+                ),
+                (
+                    "username",
+                    models.CharField(
+                        error_messages={
+                            "unique": "A user with that username already exists."
+                        },
+                        help_text="Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.",
+                        max_length=150,
+                        unique=True,
+                        validators=[
+                            django.contrib.auth.validators.UnicodeUsernameValidator()
+                        ],
+                        verbose_name="username",
+                    ),
+                ),
+                (
+                    "first_name",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="first name"
+                    ),
+                ),
+                (
+                    "last_name",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="last name"
+                    ),
+                ),
+                (
+                    "email",
+                    models.EmailField(
+                        blank=True, max_length=254, verbose_name="email address"
+                    ),
+                ),
+                (
+                    "is_staff",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Designates whether the user can log into this admin site.",
+                        verbose_name="staff status",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Designates whether this user should be treated as active. Unselect this instead of deleting accounts.",
+                        verbose_name="active",
+                    ),
+                ),
+                (
+                    "date_joined",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="date joined"
+                    ),
+                ),
+                (
+                    "avatar",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        upload_to="avatars/",
+                        verbose_name="Аватар",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "user",
+                "verbose_name_plural": "users",
+                "abstract": False,
+            },
+            managers=[
+                ("objects", django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Favorite",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date_added",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата добавления"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Избранное",
+                "verbose_name_plural": "Избранное",
+            },
+        ),
+        migrations.CreateModel(
+            name="Ingredient",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=128, verbose_name="Название ингредиента"
+                    ),
+                ),
+                (
+                    "measurement_unit",
+                    models.CharField(max_length=64, verbose_name="Единица измерения"),
+                ),
+            ],
+            options={
+                "verbose_name": "Ингредиент",
+                "verbose_name_plural": "Ингредиенты",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Recipe",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=256, verbose_name="Название рецепта"),
+                ),
+                (
+                    "image",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        upload_to="recipes/images/",
+                        verbose_name="Изображение рецепта",
+                    ),
+                ),
+                ("text", models.TextField(verbose_name="Описание рецепта")),
+                (
+                    "cooking_time",
+                    models.PositiveSmallIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)],
+                        verbose_name="Время приготовления (в минутах)",
+                    ),
+                ),
+                (
+                    "pub_date",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата публикации"
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recipes",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор рецепта",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Рецепт",
+                "verbose_name_plural": "Рецепты",
+                "ordering": ["-pub_date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="Название тега"
+                    ),
+                ),
+                (
+                    "color",
+                    models.CharField(
+                        help_text="Цвет в формате HEX, например, #FFFFFF",
+                        max_length=7,
+                        unique=True,
+                        validators=[
+                            django.core.validators.RegexValidator(
+                                message="Введите цвет в формате HEX, например, #FFFFFF",
+                                regex="^#([A-Fa-f0-9]{6})$",
+                            )
+                        ],
+                        verbose_name="Цвет тега в HEX",
+                    ),
+                ),
+                (
+                    "slug",
+                    models.SlugField(
+                        max_length=64, unique=True, verbose_name="Идентификатор тега"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Тег",
+                "verbose_name_plural": "Теги",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Subscription",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        help_text="Пользователь, на которого подписываются",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="followers",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор",
+                    ),
+                ),
+                (
+                    "subscriber",
+                    models.ForeignKey(
+                        help_text="Пользователь, который подписывается",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="subscriptions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Подписчик",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Подписка",
+                "verbose_name_plural": "Подписки",
+                "ordering": ["author__username"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ShoppingList",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date_added",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата добавления"
+                    ),
+                ),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="in_shopping_carts",
+                        to="api.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shopping_carts",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Список покупок",
+                "verbose_name_plural": "Списки покупок",
+            },
+        ),
+        migrations.CreateModel(
+            name="RecipeIngredient",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.PositiveSmallIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)],
+                        verbose_name="Количество",
+                    ),
+                ),
+                (
+                    "ingredient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="used_in_recipes",
+                        to="api.ingredient",
+                        verbose_name="Ингредиент",
+                    ),
+                ),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ingredients_amounts",
+                        to="api.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ингредиент в рецепте",
+                "verbose_name_plural": "Ингредиенты в рецепте",
+            },
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="ingredients",
+            field=models.ManyToManyField(
+                related_name="recipes",
+                through="api.RecipeIngredient",
+                to="api.Ingredient",
+                verbose_name="Ингредиенты в рецепте",
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="tags",
+            field=models.ManyToManyField(
+                related_name="recipes", to="api.Tag", verbose_name="Теги"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ingredient",
+            constraint=models.UniqueConstraint(
+                fields=("name", "measurement_unit"), name="unique_ingredient_unit"
+            ),
+        ),
+        migrations.AddField(
+            model_name="favorite",
+            name="recipe",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="favorited_by",
+                to="api.recipe",
+                verbose_name="Рецепт",
+            ),
+        ),
+        migrations.AddField(
+            model_name="favorite",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="favorites",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="groups",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="The groups this user belongs to. A user will get all permissions granted to each of their groups.",
+                related_name="user_set",
+                related_query_name="user",
+                to="auth.Group",
+                verbose_name="groups",
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="user_permissions",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Specific permissions for this user.",
+                related_name="user_set",
+                related_query_name="user",
+                to="auth.Permission",
+                verbose_name="user permissions",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="subscription",
+            constraint=models.UniqueConstraint(
+                fields=("author", "subscriber"), name="unique_subscription"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="shoppinglist",
+            constraint=models.UniqueConstraint(
+                fields=("user", "recipe"), name="unique_shopping_cart"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="recipeingredient",
+            constraint=models.UniqueConstraint(
+                fields=("recipe", "ingredient"), name="unique_recipe_ingredient"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="favorite",
+            constraint=models.UniqueConstraint(
+                fields=("user", "recipe"), name="unique_favorite"
+            ),
+        ),
+    ]
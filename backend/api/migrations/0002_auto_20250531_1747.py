@@ -1,47 +1,47 @@
-# Generated by Django 3.2.16 on 2025-05-31 17:47
-
-import django.core.validators
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ("api", "0001_initial"),
-    ]
-
-    operations = [
-        migrations.AlterModelOptions(
-            name="user",
-            options={"ordering": ["username"]},
-        ),
-        migrations.RemoveField(
-            model_name="recipe",
-            name="tags",
-        ),
-        migrations.AlterField(
-            model_name="recipe",
-            name="cooking_time",
-            field=models.PositiveSmallIntegerField(
-                validators=[
-                    django.core.validators.MinValueValidator(1),
-                    django.core.validators.MaxValueValidator(32000),
-                ],
-                verbose_name="Время приготовления (в минутах)",
-            ),
-        ),
-        migrations.AlterField(
-            model_name="recipeingredient",
-            name="amount",
-            field=models.PositiveSmallIntegerField(
-                validators=[
-                    django.core.validators.MinValueValidator(1),
-                    django.core.validators.MaxValueValidator(32000),
-                ],
-                verbose_name="Количество",
-            ),
-        ),
-        migrations.DeleteModel(
-            name="Tag",
-        ),
-    ]
+# Generated by Django 3.2.16 on 2025-05-31 17:47
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="user",
+            options={"ordering": ["username"]},
+        ),
+        migrations.RemoveField(
+            model_name="recipe",
+            name="tags",
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="cooking_time",
+            field=models.PositiveSmallIntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(32000),
+                ],
+                verbose_name="Время приготовления (в минутах)",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipeingredient",
+            name="amount",
+            field=models.PositiveSmallIntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(32000),
+                ],
+                verbose_name="Количество",
+            ),
+        ),
+        migrations.DeleteModel(
+            name="Tag",
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+EMAIL_GRAM_SIZE = 2
+
+
+def email_grams(email):
+    seen = {}
+    grams = []
+    for index in range(len(email) - EMAIL_GRAM_SIZE + 1):
+        gram = email[index : index + EMAIL_GRAM_SIZE]
+        seen[gram] = seen.get(gram, 0) + 1
+        grams.append(f"{gram}{seen[gram]}")
+    return grams
+
+
+def fill_email_grams(apps, schema_editor):
+    User = apps.get_model("api", "User")
+    EmailGram = apps.get_model("api", "EmailGram")
+    grams = []
+    for user_id, email in User.objects.values_list("id", "email").iterator():
+        email = (email or "").lower()
+        grams.extend(
+            EmailGram(user_id=user_id, gram=gram, length=len(email))
+            for gram in email_grams(email)
+        )
+        if len(grams) >= 1000:
+            EmailGram.objects.bulk_create(grams)
+            grams = []
+    EmailGram.objects.bulk_create(grams)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_auto_20250531_1747"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailGram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "gram",
+                    models.CharField(
+                        help_text="Биграмма с порядковым номером вхождения, например «ab1»",
+                        max_length=8,
+                        verbose_name="Биграмма",
+                    ),
+                ),
+                (
+                    "length",
+                    models.PositiveSmallIntegerField(verbose_name="Длина почты"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="email_grams",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Биграмма почты",
+                "verbose_name_plural": "Биграммы почты",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="emailgram",
+            index=models.Index(fields=["gram", "length"], name="email_gram_lookup_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="emailgram",
+            constraint=models.UniqueConstraint(
+                fields=("user", "gram"), name="unique_email_gram"
+            ),
+        ),
+        migrations.RunPython(fill_email_grams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_recipe_pub_date_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["recipe", "user"], name="favorite_recipe_user_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["author", "-pub_date", "-id"], name="recipe_author_pub_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipeingredient",
+            index=models.Index(
+                fields=["recipe", "ingredient", "amount"],
+                name="recipe_ingredient_amount_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipeingredient",
+            index=models.Index(
+                fields=["ingredient", "recipe"], name="ingredient_recipe_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shoppinglist",
+            index=models.Index(
+                fields=["recipe", "user"], name="shopping_cart_recipe_user_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subscription",
+            index=models.Index(
+                fields=["subscriber", "author"], name="subscription_subscriber_idx"
+            ),
+        ),
+    ]
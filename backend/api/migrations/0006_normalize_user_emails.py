@@ -0,0 +1,49 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:27
+
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def normalize_email_address(email):
+    # Копия User.normalize_email_address: у исторической модели
+    # нет методов. Сравнение делается в Python, потому что LOWER
+    # в SQLite меняет регистр только у латиницы.
+    return (email or "").strip().lower()
+
+
+def normalize_user_emails(apps, schema_editor):
+    User = apps.get_model("api", "User")
+    usernames = defaultdict(list)
+    changed = []
+    for user_id, username, email in (
+        User.objects.values_list("id", "username", "email").order_by("id").iterator()
+    ):
+        normalized = normalize_email_address(email)
+        usernames[normalized].append(username)
+        if normalized != email:
+            changed.append((user_id, normalized))
+    conflicts = {email: names for email, names in usernames.items() if len(names) > 1}
+    if conflicts:
+        details = "\n".join(
+            f"  {email or '<пусто>'}: {', '.join(names)}"
+            for email, names in conflicts.items()
+        )
+        raise RuntimeError(
+            "Невозможно сделать почту уникальной: у нескольких пользователей "
+            "совпадает адрес без учёта регистра. Исправьте записи и повторите "
+            f"миграцию.\n{details}"
+        )
+    for user_id, normalized in changed:
+        User.objects.filter(pk=user_id).update(email=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_user_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_normalize_user_emails"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="email",
+            field=models.EmailField(
+                max_length=254, unique=True, verbose_name="Электронная почта"
+            ),
+        ),
+    ]
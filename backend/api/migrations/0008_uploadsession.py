@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_user_email_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("size", models.PositiveIntegerField(verbose_name="Размер файла")),
+                (
+                    "offset",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Получено байт"
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Тип содержимого"
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сессия загрузки",
+                "verbose_name_plural": "Сессии загрузки",
+            },
+        ),
+    ]
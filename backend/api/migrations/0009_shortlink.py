@@ -0,0 +1,55 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_uploadsession"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShortLink",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "code",
+                    models.CharField(max_length=16, unique=True, verbose_name="Код"),
+                ),
+                (
+                    "hits",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Переходы"),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "recipe",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="short_link",
+                        to="api.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Короткая ссылка",
+                "verbose_name_plural": "Короткие ссылки",
+            },
+        ),
+    ]
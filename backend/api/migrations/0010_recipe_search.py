@@ -0,0 +1,83 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:40
+
+from django.db import migrations
+
+RECIPE_TABLE = "api_recipe"
+FTS_TABLE = "api_recipe_fts"
+
+
+def fold(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+SQLITE_SETUP = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, text, content='', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT "
+    f"ON {RECIPE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, text) "
+    f"VALUES (new.id, {fold('new.name')}, {fold('new.text')}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE "
+    f"ON {RECIPE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text) "
+    f"VALUES ('delete', old.id, {fold('old.name')}, {fold('old.text')}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF name, text "
+    f"ON {RECIPE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text) "
+    f"VALUES ('delete', old.id, {fold('old.name')}, {fold('old.text')}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, text) "
+    f"VALUES (new.id, {fold('new.name')}, {fold('new.text')}); END",
+]
+SQLITE_REBUILD = [
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f"INSERT INTO {FTS_TABLE}(rowid, name, text) "
+    f"SELECT id, {fold('name')}, {fold('text')} FROM {RECIPE_TABLE}",
+]
+SQLITE_TEARDOWN = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+POSTGRES_SETUP = [
+    "CREATE INDEX IF NOT EXISTS recipe_search_idx "
+    f"ON {RECIPE_TABLE} USING GIN (("
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(text, '')), 'B')))",
+]
+POSTGRES_TEARDOWN = ["DROP INDEX IF EXISTS recipe_search_idx"]
+
+
+def run(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        run(connection, SQLITE_SETUP + SQLITE_REBUILD)
+    elif connection.vendor == "postgresql":
+        run(connection, POSTGRES_SETUP)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        run(connection, SQLITE_TEARDOWN)
+    elif connection.vendor == "postgresql":
+        run(connection, POSTGRES_TEARDOWN)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_shortlink"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 3.2.16 on 2026-10-15 02:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+FEED_FANOUT_LIMIT = 1000
+FEED_BACKFILL_SIZE = 100
+
+
+def fill_feeds(apps, schema_editor):
+    User = apps.get_model("api", "User")
+    Subscription = apps.get_model("api", "Subscription")
+    Recipe = apps.get_model("api", "Recipe")
+    FeedEntry = apps.get_model("api", "FeedEntry")
+    followers = (
+        Subscription.objects.filter(author=OuterRef("pk"))
+        .order_by()
+        .values("author")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    User.objects.update(followers_count=Coalesce(Subquery(followers), 0))
+
+    latest = {}
+    entries = []
+    subscriptions = Subscription.objects.filter(
+        author__followers_count__lt=FEED_FANOUT_LIMIT
+    ).values_list("subscriber_id", "author_id")
+    for subscriber_id, author_id in subscriptions.iterator():
+        if author_id not in latest:
+            latest[author_id] = list(
+                Recipe.objects.filter(author_id=author_id)
+                .order_by("-pub_date", "-id")
+                .values_list("id", "pub_date")[:FEED_BACKFILL_SIZE]
+            )
+        entries.extend(
+            FeedEntry(
+                user_id=subscriber_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for recipe_id, pub_date in latest[author_id]
+        )
+        if len(entries) >= 1000:
+            FeedEntry.objects.bulk_create(entries)
+            entries = []
+    FeedEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_recipe_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="followers_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество подписчиков"
+            ),
+        ),
+        migrations.CreateModel(
+            name="FeedEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pub_date", models.DateTimeField(verbose_name="Дата публикации")),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор рецепта",
+                    ),
+                ),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_entries",
+                        to="api.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_entries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Владелец ленты",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Запись ленты",
+                "verbose_name_plural": "Записи ленты",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="feedentry",
+            index=models.Index(
+                fields=["user", "-pub_date", "-recipe"], name="feed_entry_timeline_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="feedentry",
+            index=models.Index(fields=["user", "author"], name="feed_entry_author_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="feedentry",
+            constraint=models.UniqueConstraint(
+                fields=("user", "recipe"), name="unique_feed_entry"
+            ),
+        ),
+        migrations.RunPython(fill_feeds, migrations.RunPython.noop),
+    ]
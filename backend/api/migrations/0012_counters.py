@@ -0,0 +1,71 @@
+# Generated by Django 3.2.16 on 2026-10-15 03:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+COUNTERS = {
+    "User": {
+        "recipes_count": ("Recipe", "author"),
+        "followers_count": ("Subscription", "author"),
+    },
+    "Recipe": {
+        "favorites_count": ("Favorite", "recipe"),
+        "cart_count": ("ShoppingList", "recipe"),
+    },
+}
+
+
+def actual_count(related_model, foreign_key):
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(**{foreign_key: OuterRef("pk")})
+            .order_by()
+            .values(foreign_key)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    for model_name, fields in COUNTERS.items():
+        apps.get_model("api", model_name).objects.update(
+            **{
+                field: actual_count(apps.get_model("api", related), foreign_key)
+                for field, (related, foreign_key) in fields.items()
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_feed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="cart_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="В списках покупок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="favorites_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="В избранном"
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="recipes_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество рецептов"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-15 03:40
+
+from django.db import migrations, models
+from django.utils import timezone
+
+WEIGHTS = {
+    "Favorite": 2.0,
+    "ShoppingList": 1.0,
+}
+HALF_LIFE_HOURS = 72
+MIN_SCORE = 0.01
+
+
+def fill_popularity(apps, schema_editor):
+    Recipe = apps.get_model("api", "Recipe")
+    now = timezone.now()
+    scores = {}
+    for model_name, weight in WEIGHTS.items():
+        rows = apps.get_model("api", model_name).objects.values_list(
+            "recipe_id", "date_added"
+        )
+        for recipe_id, date_added in rows.iterator():
+            hours = max((now - date_added).total_seconds(), 0) / 3600
+            scores[recipe_id] = scores.get(recipe_id, 0) + weight * 0.5 ** (
+                hours / HALF_LIFE_HOURS
+            )
+    Recipe.objects.bulk_update(
+        [
+            Recipe(pk=recipe_id, popularity=score)
+            for recipe_id, score in scores.items()
+            if score >= MIN_SCORE
+        ],
+        ["popularity"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="popularity",
+            field=models.FloatField(
+                default=0,
+                editable=False,
+                help_text="Добавления в избранное и покупки с затуханием по времени",
+                verbose_name="Популярность",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["-popularity", "-id"], name="recipe_popularity_idx"
+            ),
+        ),
+        migrations.RunPython(fill_popularity, migrations.RunPython.noop),
+    ]
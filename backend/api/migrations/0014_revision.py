@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_recipe_popularity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Revision",
+            fields=[
+                (
+                    "name",
+                    models.CharField(
+                        max_length=150,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Набор данных",
+                    ),
+                ),
+                (
+                    "value",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Ревизия"),
+                ),
+            ],
+            options={
+                "verbose_name": "Ревизия",
+                "verbose_name_plural": "Ревизии",
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-15 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_revision"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ingredient",
+            name="measurement_unit",
+            field=models.CharField(max_length=150, verbose_name="Единица измерения"),
+        ),
+        migrations.AlterField(
+            model_name="ingredient",
+            name="name",
+            field=models.CharField(max_length=150, verbose_name="Название ингредиента"),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="name",
+            field=models.CharField(max_length=255, verbose_name="Название рецепта"),
+        ),
+    ]
@@ -1,251 +1,649 @@
-from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.core.validators import MinValueValidator, MaxValueValidator
-
-from .constants import MIN_VALUE, MAX_VALUE, MAX_LENGTH, MAX_LENGTH_TITLE
-
-
-class User(AbstractUser):
-    """
-    Пользовательская модель, расширяющая AbstractUser.
-    """
-
-    avatar = models.ImageField(
-        upload_to="avatars/",
-        blank=True,
-        null=True,
-        verbose_name="Аватар",
-    )
-
-    class Meta:
-        ordering = ["username"]
-
-    def __str__(self):
-        return self.username
-
-
-class Subscription(models.Model):
-    """
-    Модель для подписок пользователей.
-    """
-
-    author = models.ForeignKey(
-        User,
-        on_delete=models.CASCADE,
-        related_name="followers",
-        verbose_name="Автор",
-        help_text="Пользователь, на которого подписываются",
-    )
-    subscriber = models.ForeignKey(
-        User,
-        on_delete=models.CASCADE,
-        related_name="subscriptions",
-        verbose_name="Подписчик",
-        help_text="Пользователь, который подписывается",
-    )
-
-    class Meta:
-        verbose_name = "Подписка"
-        verbose_name_plural = "Подписки"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["author", "subscriber"], name="unique_subscription"
-            )
-        ]
-        ordering = ["author__username"]
-
-    def __str__(self):
-        return f"{self.subscriber} подписан на {self.author}"
-
-
-class Ingredient(models.Model):
-    """
-    Модель для ингредиентов.
-    """
-
-    name = models.CharField(
-        max_length=MAX_LENGTH,
-        verbose_name="Название ингредиента",
-    )
-    measurement_unit = models.CharField(
-        max_length=MAX_LENGTH,
-        verbose_name="Единица измерения",
-    )
-
-    class Meta:
-        verbose_name = "Ингредиент"
-        verbose_name_plural = "Ингредиенты"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["name", "measurement_unit"], name="unique_ingredient_unit"
-            )
-        ]
-        ordering = ["name"]
-
-    def __str__(self):
-        return f"{self.name}, {self.measurement_unit}"
-
-
-class Recipe(models.Model):
-    """
-    Модель для рецептов.
-    """
-
-    author = models.ForeignKey(
-        User,
-        on_delete=models.CASCADE,
-        related_name="recipes",
-        verbose_name="Автор рецепта",
-    )
-    name = models.CharField(
-        max_length=MAX_LENGTH_TITLE,
-        verbose_name="Название рецепта",
-    )
-    image = models.ImageField(
-        upload_to="recipes/images/",
-        verbose_name="Изображение рецепта",
-        null=True,
-        blank=True,
-    )
-    text = models.TextField(
-        verbose_name="Описание рецепта",
-    )
-    ingredients = models.ManyToManyField(
-        Ingredient,
-        through="RecipeIngredient",
-        related_name="recipes",
-        verbose_name="Ингредиенты в рецепте",
-    )
-    cooking_time = models.PositiveSmallIntegerField(
-        validators=[
-            MinValueValidator(MIN_VALUE),
-            MaxValueValidator(MAX_VALUE),
-        ],
-        verbose_name="Время приготовления (в минутах)",
-    )
-    pub_date = models.DateTimeField(
-        auto_now_add=True,
-        verbose_name="Дата публикации",
-    )
-
-    class Meta:
-        ordering = ["-pub_date"]
-        verbose_name = "Рецепт"
-        verbose_name_plural = "Рецепты"
-
-    def __str__(self):
-        return self.name
-
-
-class RecipeIngredient(models.Model):
-    """
-    Модель для связи рецепта и ингредиента с указанием количества.
-    """
-
-    recipe = models.ForeignKey(
-        Recipe,
-        on_delete=models.CASCADE,
-        related_name="ingredients_amounts",
-        verbose_name="Рецепт",
-    )
-    ingredient = models.ForeignKey(
-        Ingredient,
-        on_delete=models.CASCADE,
-        related_name="used_in_recipes",
-        verbose_name="Ингредиент",
-    )
-    amount = models.PositiveSmallIntegerField(
-        validators=[
-            MinValueValidator(MIN_VALUE),
-            MaxValueValidator(MAX_VALUE),
-        ],
-        verbose_name="Количество",
-    )
-
-    class Meta:
-        verbose_name = "Ингредиент в рецепте"
-        verbose_name_plural = "Ингредиенты в рецепте"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["recipe", "ingredient"],
-                name="unique_recipe_ingredient",
-            ),
-        ]
-
-    def __str__(self):
-        return (
-            f"{self.ingredient.name} ({self.amount} "
-            f"{self.ingredient.measurement_unit})"
-        )
-
-
-class Favorite(models.Model):
-    """
-    Модель для избранных рецептов пользователя.
-    """
-
-    user = models.ForeignKey(
-        User,
-        on_delete=models.CASCADE,
-        related_name="favorites",
-        verbose_name="Пользователь",
-    )
-    recipe = models.ForeignKey(
-        Recipe,
-        on_delete=models.CASCADE,
-        related_name="favorited_by",
-        verbose_name="Рецепт",
-    )
-    date_added = models.DateTimeField(
-        auto_now_add=True,
-        verbose_name="Дата добавления",
-    )
-
-    class Meta:
-        verbose_name = "Избранное"
-        verbose_name_plural = "Избранное"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["user", "recipe"],
-                name="unique_favorite",
-            ),
-        ]
-
-    def __str__(self):
-        return f"{self.user.username} - {self.recipe.name}"
-
-
-class ShoppingList(models.Model):
-    """
-    Модель для списка покупок пользователя.
-    """
-
-    user = models.ForeignKey(
-        User,
-        on_delete=models.CASCADE,
-        related_name="shopping_carts",
-        verbose_name="Пользователь",
-    )
-    recipe = models.ForeignKey(
-        Recipe,
-        on_delete=models.CASCADE,
-        related_name="in_shopping_carts",
-        verbose_name="Рецепт",
-    )
-    date_added = models.DateTimeField(
-        auto_now_add=True,
-        verbose_name="Дата добавления",
-    )
-
-    class Meta:
-        verbose_name = "Список покупок"
-        verbose_name_plural = "Списки покупок"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["user", "recipe"],
-                name="unique_shopping_cart",
-            ),
-        ]
-
-    def __str__(self):
-        return f"{self.user.username} - {self.recipe.name}"
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.db.models import (
+    BooleanField,
+    Exists,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Value,
+)
+from django.core.validators import MinValueValidator, MaxValueValidator
+
+from .constants import (
+    MIN_VALUE,
+    MAX_VALUE,
+    MAX_LENGTH,
+    MAX_LENGTH_TITLE,
+    EMAIL_GRAM_MAX_LENGTH,
+    MAX_LENGTH_CONTENT_TYPE,
+    MAX_LENGTH_SHORT_CODE,
+)
+
+
+class CounterFieldsMixin:
+    """
+    Счётчики из COUNTER_FIELDS меняются только через F() в сигналах;
+    обычное сохранение их не перезаписывает, чтобы не затереть
+    изменения из других запросов.
+    """
+
+    COUNTER_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class User(CounterFieldsMixin, AbstractUser):
+    """
+    Пользовательская модель, расширяющая AbstractUser.
+    """
+
+    email = models.EmailField(
+        unique=True,
+        verbose_name="Электронная почта",
+    )
+    avatar = models.ImageField(
+        upload_to="avatars/",
+        blank=True,
+        null=True,
+        verbose_name="Аватар",
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество подписчиков",
+    )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество рецептов",
+    )
+
+    COUNTER_FIELDS = ("followers_count", "recipes_count")
+
+    class Meta:
+        ordering = ["username"]
+
+    def __str__(self):
+        return self.username
+
+    @staticmethod
+    def normalize_email_address(email):
+        """Почта хранится в нижнем регистре, чтобы искать её по индексу."""
+        return (email or "").strip().lower()
+
+    def save(self, *args, **kwargs):
+        self.email = self.normalize_email_address(self.email)
+        super().save(*args, **kwargs)
+
+
+class EmailGram(models.Model):
+    """
+    Биграмма нормализованной почты пользователя.
+    Используется как индекс для поиска похожих адресов при регистрации.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="email_grams",
+        verbose_name="Пользователь",
+    )
+    gram = models.CharField(
+        max_length=EMAIL_GRAM_MAX_LENGTH,
+        verbose_name="Биграмма",
+        help_text="Биграмма с порядковым номером вхождения, например «ab1»",
+    )
+    length = models.PositiveSmallIntegerField(
+        verbose_name="Длина почты",
+    )
+
+    class Meta:
+        verbose_name = "Биграмма почты"
+        verbose_name_plural = "Биграммы почты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "gram"], name="unique_email_gram"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["gram", "length"], name="email_gram_lookup_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.gram}"
+
+
+class Subscription(models.Model):
+    """
+    Модель для подписок пользователей.
+    """
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="followers",
+        verbose_name="Автор",
+        help_text="Пользователь, на которого подписываются",
+    )
+    subscriber = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="subscriptions",
+        verbose_name="Подписчик",
+        help_text="Пользователь, который подписывается",
+    )
+
+    class Meta:
+        verbose_name = "Подписка"
+        verbose_name_plural = "Подписки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "subscriber"], name="unique_subscription"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["subscriber", "author"],
+                name="subscription_subscriber_idx",
+            ),
+        ]
+        ordering = ["author__username"]
+
+    def __str__(self):
+        return f"{self.subscriber} подписан на {self.author}"
+
+
+class Ingredient(models.Model):
+    """
+    Модель для ингредиентов.
+    """
+
+    name = models.CharField(
+        max_length=MAX_LENGTH,
+        verbose_name="Название ингредиента",
+    )
+    measurement_unit = models.CharField(
+        max_length=MAX_LENGTH,
+        verbose_name="Единица измерения",
+    )
+
+    class Meta:
+        verbose_name = "Ингредиент"
+        verbose_name_plural = "Ингредиенты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "measurement_unit"], name="unique_ingredient_unit"
+            )
+        ]
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name}, {self.measurement_unit}"
+
+
+def subscription_flag(user):
+    """
+    Выражение для аннотации is_subscribed у авторов: подписан ли на них
+    пользователь user.
+    """
+    if user is None or not user.is_authenticated:
+        return Value(False, output_field=BooleanField())
+    return Exists(
+        Subscription.objects.filter(subscriber=user, author=OuterRef("pk"))
+    )
+
+
+class RecipeQuerySet(models.QuerySet):
+    """
+    Набор запросов для рецептов.
+    """
+
+    def with_user_flags(self, user):
+        """
+        Аннотирует рецепты флагами is_favorited и is_in_shopping_cart
+        для пользователя, чтобы они вычислялись в том же SQL-запросе.
+        """
+        if user is None or not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField()),
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingList.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+        )
+
+    def latest_per_author(self, limit):
+        """
+        Не больше limit последних рецептов каждого автора одним запросом:
+        коррелированный подзапрос отбирает первые limit id по автору.
+        """
+        if not limit:
+            return self
+        latest_ids = (
+            Recipe.objects.filter(author=OuterRef("author"))
+            .order_by("-pub_date", "-id")
+            .values("pk")[:limit]
+        )
+        return self.filter(pk__in=Subquery(latest_ids))
+
+    def for_read(self, user):
+        """
+        Набор запросов для чтения рецептов: автор с флагом подписки
+        и ингредиенты подгружаются пакетно, поэтому страница рецептов
+        стоит фиксированное число запросов.
+        """
+        return self.with_user_flags(user).prefetch_related(
+            Prefetch(
+                "author",
+                queryset=User.objects.annotate(
+                    is_subscribed=subscription_flag(user)
+                ),
+            ),
+            Prefetch(
+                "ingredients_amounts",
+                queryset=RecipeIngredient.objects.select_related("ingredient"),
+            ),
+        )
+
+
+class Recipe(CounterFieldsMixin, models.Model):
+    """
+    Модель для рецептов.
+    """
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="recipes",
+        verbose_name="Автор рецепта",
+    )
+    name = models.CharField(
+        max_length=MAX_LENGTH_TITLE,
+        verbose_name="Название рецепта",
+    )
+    image = models.ImageField(
+        upload_to="recipes/images/",
+        verbose_name="Изображение рецепта",
+        null=True,
+        blank=True,
+    )
+    text = models.TextField(
+        verbose_name="Описание рецепта",
+    )
+    ingredients = models.ManyToManyField(
+        Ingredient,
+        through="RecipeIngredient",
+        related_name="recipes",
+        verbose_name="Ингредиенты в рецепте",
+    )
+    cooking_time = models.PositiveSmallIntegerField(
+        validators=[
+            MinValueValidator(MIN_VALUE),
+            MaxValueValidator(MAX_VALUE),
+        ],
+        verbose_name="Время приготовления (в минутах)",
+    )
+    pub_date = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата публикации",
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В избранном",
+    )
+    cart_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В списках покупок",
+    )
+    popularity = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name="Популярность",
+        help_text="Добавления в избранное и покупки с затуханием по времени",
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
+    COUNTER_FIELDS = ("favorites_count", "cart_count", "popularity")
+
+    class Meta:
+        ordering = ["-pub_date"]
+        verbose_name = "Рецепт"
+        verbose_name_plural = "Рецепты"
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"], name="recipe_pub_date_id_idx"
+            ),
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="recipe_author_pub_date_idx",
+            ),
+            models.Index(
+                fields=["-popularity", "-id"], name="recipe_popularity_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class RecipeIngredient(models.Model):
+    """
+    Модель для связи рецепта и ингредиента с указанием количества.
+    """
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="ingredients_amounts",
+        verbose_name="Рецепт",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="used_in_recipes",
+        verbose_name="Ингредиент",
+    )
+    amount = models.PositiveSmallIntegerField(
+        validators=[
+            MinValueValidator(MIN_VALUE),
+            MaxValueValidator(MAX_VALUE),
+        ],
+        verbose_name="Количество",
+    )
+
+    class Meta:
+        verbose_name = "Ингредиент в рецепте"
+        verbose_name_plural = "Ингредиенты в рецепте"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "ingredient"],
+                name="unique_recipe_ingredient",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipe", "ingredient", "amount"],
+                name="recipe_ingredient_amount_idx",
+            ),
+            models.Index(
+                fields=["ingredient", "recipe"],
+                name="ingredient_recipe_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.ingredient.name} ({self.amount} "
+            f"{self.ingredient.measurement_unit})"
+        )
+
+
+class Favorite(models.Model):
+    """
+    Модель для избранных рецептов пользователя.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="favorites",
+        verbose_name="Пользователь",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="favorited_by",
+        verbose_name="Рецепт",
+    )
+    date_added = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата добавления",
+    )
+
+    class Meta:
+        verbose_name = "Избранное"
+        verbose_name_plural = "Избранное"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"],
+                name="unique_favorite",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipe", "user"], name="favorite_recipe_user_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.recipe.name}"
+
+
+class ShoppingList(models.Model):
+    """
+    Модель для списка покупок пользователя.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_carts",
+        verbose_name="Пользователь",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="in_shopping_carts",
+        verbose_name="Рецепт",
+    )
+    date_added = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата добавления",
+    )
+
+    class Meta:
+        verbose_name = "Список покупок"
+        verbose_name_plural = "Списки покупок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"],
+                name="unique_shopping_cart",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipe", "user"], name="shopping_cart_recipe_user_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.recipe.name}"
+
+
+class UploadSession(models.Model):
+    """
+    Сессия докачиваемой загрузки изображения.
+    Файл собирается по частям во временном каталоге UPLOAD_SESSIONS_DIR.
+    """
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+        verbose_name="Пользователь",
+    )
+    size = models.PositiveIntegerField(
+        verbose_name="Размер файла",
+    )
+    offset = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Получено байт",
+    )
+    content_type = models.CharField(
+        max_length=MAX_LENGTH_CONTENT_TYPE,
+        blank=True,
+        verbose_name="Тип содержимого",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания",
+    )
+
+    class Meta:
+        verbose_name = "Сессия загрузки"
+        verbose_name_plural = "Сессии загрузки"
+
+    def __str__(self):
+        return f"{self.user} - {self.id}"
+
+    @property
+    def complete(self):
+        return self.offset >= self.size
+
+    @property
+    def path(self):
+        return os.path.join(settings.UPLOAD_SESSIONS_DIR, f"{self.id}.part")
+
+    def discard(self):
+        """Удалить сессию вместе с её файлом."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.delete()
+
+
+class ShortLink(models.Model):
+    """
+    Короткая ссылка на рецепт: код base62 и счётчик переходов.
+    """
+
+    code = models.CharField(
+        max_length=MAX_LENGTH_SHORT_CODE,
+        unique=True,
+        verbose_name="Код",
+    )
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="short_link",
+        verbose_name="Рецепт",
+    )
+    hits = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Переходы",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания",
+    )
+
+    class Meta:
+        verbose_name = "Короткая ссылка"
+        verbose_name_plural = "Короткие ссылки"
+
+    def __str__(self):
+        return f"{self.code} - {self.recipe}"
+
+
+class FeedEntry(models.Model):
+    """
+    Запись ленты подписок: рецепт автора, на которого подписан пользователь.
+    Дата публикации копируется из рецепта, чтобы лента читалась
+    по одному индексу без соединений.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+        verbose_name="Владелец ленты",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+        verbose_name="Рецепт",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор рецепта",
+    )
+    pub_date = models.DateTimeField(
+        verbose_name="Дата публикации",
+    )
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"],
+                name="unique_feed_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-pub_date", "-recipe"],
+                name="feed_entry_timeline_idx",
+            ),
+            models.Index(
+                fields=["user", "author"], name="feed_entry_author_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.recipe}"
+
+
+class Revision(models.Model):
+    """
+    Счётчик ревизий набора данных. Увеличивается одним UPDATE в базе,
+    поэтому номера выдаются строго по порядку и без повторов
+    при любом бэкенде кеша.
+    """
+
+    name = models.CharField(
+        max_length=MAX_LENGTH,
+        primary_key=True,
+        verbose_name="Набор данных",
+    )
+    value = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Ревизия",
+    )
+
+    class Meta:
+        verbose_name = "Ревизия"
+        verbose_name_plural = "Ревизии"
+
+    def __str__(self):
+        return f"{self.name} - {self.value}"
@@ -1,48 +1,181 @@
-from rest_framework.pagination import PageNumberPagination
-from .constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
-
-
-class CustomPagination(PageNumberPagination):
-    page_size = DEFAULT_PAGE_SIZE
-    page_size_query_param = 'limit'
-    max_page_size = MAX_PAGE_SIZE
-
-
-class RecipesPagination(PageNumberPagination):
-    """
-    Пагинация для страниц рецептов.
-    """
-
-    page_size = DEFAULT_PAGE_SIZE
-    page_size_query_param = "limit"
-    max_page_size = MAX_PAGE_SIZE
-
-
-class FavoritesPagination(PageNumberPagination):
-    """
-    Пагинация для страниц избранных рецептов.
-    """
-
-    page_size = DEFAULT_PAGE_SIZE
-    page_size_query_param = "limit"
-    max_page_size = MAX_PAGE_SIZE
-
-
-class SubscriptionsPagination(PageNumberPagination):
-    """
-    Пагинация для страниц подписок.
-    """
-
-    page_size = DEFAULT_PAGE_SIZE
-    page_size_query_param = "limit"
-    max_page_size = MAX_PAGE_SIZE
-
-
-class ShoppingListPagination(PageNumberPagination):
-    """
-    Пагинация для страниц списка покупок.
-    """
-
-    page_size = DEFAULT_PAGE_SIZE
-    page_size_query_param = "limit"
-    max_page_size = MAX_PAGE_SIZE
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .feed import decode_cursor, encode_cursor, read_feed
+from .constants import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    PAGINATION_QUERY_PARAM,
+    CURSOR_PAGINATION,
+    POPULAR_ORDERING,
+)
+
+
+class CustomPagination(PageNumberPagination):
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'limit'
+    max_page_size = MAX_PAGE_SIZE
+
+
+class RecipesPagination(PageNumberPagination):
+    """
+    Пагинация для страниц рецептов.
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class FavoritesPagination(PageNumberPagination):
+    """
+    Пагинация для страниц избранных рецептов.
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class SubscriptionsPagination(PageNumberPagination):
+    """
+    Пагинация для страниц подписок.
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class ShoppingListPagination(PageNumberPagination):
+    """
+    Пагинация для страниц списка покупок.
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class RecipesCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация рецептов по (pub_date, id), а при
+    ?ordering=popular — по (popularity, id), как задаёт фильтр.
+    Глубокие страницы стоят столько же, сколько первая: нет COUNT и OFFSET.
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+    ordering = ("-pub_date", "-id")
+    popular_ordering = ("-popularity", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get("ordering") == POPULAR_ORDERING:
+            return self.popular_ordering
+        return super().get_ordering(request, queryset, view)
+
+
+class TrendingCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация популярных рецептов по (popularity, id):
+    страница — один проход по индексу recipe_popularity_idx.
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+    ordering = ("-popularity", "-id")
+
+
+class SubscriptionsCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация подписок по (username автора, id).
+    """
+
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+    ordering = ("username", "id")
+
+
+class FeedPagination(BasePagination):
+    """
+    Пагинация ленты подписок по ключу (pub_date, id) последнего рецепта
+    страницы. Лента собирается из нескольких источников, поэтому страница
+    строится не по queryset, а функцией read_feed.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+    invalid_cursor_message = "Неверный курсор."
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def paginate_feed(self, user, request):
+        """Id рецептов страницы в порядке ленты."""
+        self.request = request
+        after = None
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            after = decode_cursor(cursor)
+            if after is None:
+                raise NotFound(self.invalid_cursor_message)
+        recipe_ids, self.next_key = read_feed(
+            user, after, self.get_page_size(request)
+        )
+        return recipe_ids
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encode_cursor(self.next_key),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            {"next": self.get_next_link(), "previous": None, "results": data}
+        )
+
+
+class CursorPaginationMixin:
+    """
+    Включает курсорную пагинацию для действий из cursor_pagination_classes,
+    если клиент передал ?pagination=cursor. Иначе используется
+    pagination_class вьюсета.
+    """
+
+    cursor_pagination_classes = {}
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            cursor_class = self.cursor_pagination_classes.get(self.action)
+            mode = self.request.query_params.get(PAGINATION_QUERY_PARAM)
+            if cursor_class is not None and mode == CURSOR_PAGINATION:
+                self._paginator = cursor_class()
+            else:
+                self._paginator = (
+                    self.pagination_class() if self.pagination_class else None
+                )
+        return self._paginator
@@ -0,0 +1,185 @@
+import threading
+from typing import Dict, Iterable, List, NamedTuple
+
+from .constants import PANTRY_BITSET_CACHE_SIZE
+from .postings import IngredientPostings, get_ingredient_postings
+
+
+class PantryMatch(NamedTuple):
+    recipe_id: int
+    matched: int
+    missing: int
+
+
+def to_bitset(ids: Iterable[int]) -> int:
+    """Битовая маска, в которой бит с номером id рецепта установлен."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray((max(ids) >> 3) + 1)
+    for recipe_id in ids:
+        buffer[recipe_id >> 3] |= 1 << (recipe_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def add_to_counter(planes: List[int], bits: int) -> None:
+    """
+    Прибавить единицу всем рецептам из bits в «вертикальном» счётчике:
+    planes[i] — i-й двоичный разряд счётчика всех рецептов сразу.
+    """
+    carry = bits
+    for position, plane in enumerate(planes):
+        planes[position], carry = plane ^ carry, plane & carry
+        if not carry:
+            return
+    planes.append(carry)
+
+
+def subtract(left: List[int], right: List[int], mask: int) -> List[int]:
+    """
+    Поразрядная разность вертикальных счётчиков left - right
+    (left >= right).
+    """
+    result = []
+    borrow = 0
+    for position in range(max(len(left), len(right))):
+        a = left[position] if position < len(left) else 0
+        b = right[position] if position < len(right) else 0
+        result.append((a ^ b ^ borrow) & mask)
+        borrow = (~a & (b | borrow)) | (a & b & borrow)
+    return result
+
+
+def equal_to(planes: List[int], value: int, mask: int) -> int:
+    """Маска рецептов, у которых значение счётчика равно value."""
+    if value >> len(planes):
+        return 0
+    bits = mask
+    for position, plane in enumerate(planes):
+        bits &= plane if value >> position & 1 else ~plane
+    return bits
+
+
+class PantryIndex:
+    """
+    Битовые маски для подбора рецептов по набору продуктов.
+    Число ингредиентов рецептов хранится вертикальным счётчиком
+    (по маске на двоичный разряд), маски ингредиентов строятся из индекса
+    ингредиентов при первом обращении и кешируются.
+    Подсчёт совпадений и недостающих — несколько десятков операций
+    над длинными целыми, без цикла по рецептам.
+    """
+
+    def __init__(
+        self, postings: IngredientPostings, sizes: List[int], bitsets
+    ):
+        self.postings = postings
+        self.sizes = sizes
+        self._bitsets: Dict[int, int] = bitsets
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, postings: IngredientPostings):
+        by_size = {}
+        for recipe_id, ingredient_ids in postings.recipes.items():
+            by_size.setdefault(len(ingredient_ids), []).append(recipe_id)
+        sizes = []
+        for size, recipe_ids in by_size.items():
+            bits = to_bitset(recipe_ids)
+            for position in range(size.bit_length()):
+                if size >> position & 1:
+                    while len(sizes) <= position:
+                        sizes.append(0)
+                    sizes[position] |= bits
+        return cls(postings, sizes, {})
+
+    def bitset(self, ingredient_id: int) -> int:
+        bits = self._bitsets.get(ingredient_id)
+        if bits is None:
+            bits = to_bitset(self.postings.postings.get(ingredient_id, ()))
+            with self._lock:
+                if len(self._bitsets) >= PANTRY_BITSET_CACHE_SIZE:
+                    self._bitsets.pop(next(iter(self._bitsets)))
+                self._bitsets[ingredient_id] = bits
+        return bits
+
+    def top(
+        self, ingredient_ids: Iterable[int], limit: int
+    ) -> List[PantryMatch]:
+        """
+        Рецепты хотя бы с одним ингредиентом из набора: сначала те,
+        для которых хватает всего, затем по числу недостающих;
+        при равенстве — более новые.
+        """
+        touched = 0
+        hits: List[int] = []
+        for ingredient_id in set(ingredient_ids):
+            bits = self.bitset(ingredient_id)
+            if bits:
+                touched |= bits
+                add_to_counter(hits, bits)
+        if not touched:
+            return []
+        missing = subtract(self.sizes, hits, touched)
+
+        matches = []
+        for count in range(1 << len(missing)):
+            bits = equal_to(missing, count, touched)
+            while bits and len(matches) < limit:
+                recipe_id = bits.bit_length() - 1
+                bits ^= 1 << recipe_id
+                size = len(self.postings.recipes[recipe_id])
+                matches.append(PantryMatch(recipe_id, size - count, count))
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def with_recipe(
+        self,
+        recipe_id: int,
+        old: set,
+        new: set,
+        previous: IngredientPostings,
+        postings: IngredientPostings,
+    ):
+        """
+        Копия с изменённым составом одного рецепта или None, если нельзя
+        доказать, что postings отличается от индекса масок ровно этим
+        рецептом: он должен быть получен из того же объекта previous
+        и иметь следующую ревизию (ревизии выдаёт база без пропусков).
+        Тогда маски строятся заново при первом обращении.
+        """
+        if (
+            previous is not self.postings
+            or postings.version != previous.version + 1
+        ):
+            return None
+        bit = 1 << recipe_id
+        sizes = [plane & ~bit for plane in self.sizes]
+        for position in range(len(new).bit_length()):
+            if len(new) >> position & 1:
+                while len(sizes) <= position:
+                    sizes.append(0)
+                sizes[position] |= bit
+        with self._lock:
+            bitsets = dict(self._bitsets)
+        for ingredient_id in old - new:
+            if ingredient_id in bitsets:
+                bitsets[ingredient_id] &= ~bit
+        for ingredient_id in new - old:
+            if ingredient_id in bitsets:
+                bitsets[ingredient_id] |= bit
+        return PantryIndex(postings, sizes, bitsets)
+
+
+_lock = threading.Lock()
+
+
+def get_pantry_index() -> PantryIndex:
+    """Маски для текущей версии индекса ингредиентов."""
+    postings = get_ingredient_postings()
+    if postings.pantry is None:
+        with _lock:
+            if postings.pantry is None:
+                postings.pantry = PantryIndex.build(postings)
+    return postings.pantry
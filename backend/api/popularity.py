@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .constants import (
+    POPULARITY_CART_WEIGHT,
+    POPULARITY_FAVORITE_WEIGHT,
+    POPULARITY_HALF_LIFE_HOURS,
+    POPULARITY_MIN_SCORE,
+)
+
+# Вес добавления рецепта в каждую из связей.
+WEIGHTS = {
+    "Favorite": POPULARITY_FAVORITE_WEIGHT,
+    "ShoppingList": POPULARITY_CART_WEIGHT,
+}
+
+
+def decay_factor(hours: float) -> float:
+    """Во сколько раз затухает оценка за hours часов."""
+    return 0.5 ** (hours / POPULARITY_HALF_LIFE_HOURS)
+
+
+def contribution(
+    weight: float, date_added: datetime, now: Optional[datetime] = None
+) -> float:
+    """Сколько добавление с датой date_added сейчас даёт в оценку."""
+    age = (now or timezone.now()) - date_added
+    return weight * decay_factor(max(age.total_seconds(), 0) / 3600)
+
+
+def add_score(recipe_model, recipe_id: int, amount: float) -> None:
+    """
+    Изменить оценку рецепта через F(). После уменьшения остаток
+    меньше POPULARITY_MIN_SCORE (в том числе отрицательный) обнуляется.
+    """
+    recipe = recipe_model.objects.filter(pk=recipe_id)
+    recipe.update(popularity=F("popularity") + amount)
+    if amount < 0:
+        recipe.filter(popularity__lt=POPULARITY_MIN_SCORE).update(popularity=0)
+
+
+def decay(recipe_model, hours: float, chunk_size: int) -> int:
+    """
+    Уменьшить оценки всех рецептов на затухание за hours часов, пачками
+    по chunk_size строк. Слишком маленькие оценки обнуляются, чтобы
+    рецепты выпадали из индекса популярных. Возвращает число рецептов
+    с ненулевой оценкой.
+    """
+    factor = decay_factor(hours)
+    scored = recipe_model.objects.filter(popularity__gt=0)
+    remaining = 0
+    last_pk = 0
+    while True:
+        ids = list(
+            scored.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return remaining
+        last_pk = ids[-1]
+        chunk = recipe_model.objects.filter(pk__in=ids)
+        with transaction.atomic():
+            chunk.update(popularity=F("popularity") * factor)
+            chunk.filter(popularity__lt=POPULARITY_MIN_SCORE).update(
+                popularity=0
+            )
+        remaining += chunk.filter(popularity__gt=0).count()
+
+
+def rebuild(apps, chunk_size: int) -> int:
+    """
+    Пересчитать оценки с нуля по датам добавления в избранное
+    и в списки покупок. Возвращает число рецептов с ненулевой оценкой.
+    """
+    recipe_model = apps.get_model("api", "Recipe")
+    now = timezone.now()
+    scores: Dict[int, float] = {}
+    for model_name, weight in WEIGHTS.items():
+        rows = apps.get_model("api", model_name).objects.values_list(
+            "recipe_id", "date_added"
+        )
+        for recipe_id, date_added in rows.iterator():
+            scores[recipe_id] = scores.get(recipe_id, 0) + contribution(
+                weight, date_added, now
+            )
+    scores = {
+        recipe_id: score
+        for recipe_id, score in scores.items()
+        if score >= POPULARITY_MIN_SCORE
+    }
+    with transaction.atomic():
+        recipe_model.objects.filter(popularity__gt=0).update(popularity=0)
+        recipe_model.objects.bulk_update(
+            [
+                recipe_model(pk=recipe_id, popularity=score)
+                for recipe_id, score in scores.items()
+            ],
+            ["popularity"],
+            batch_size=chunk_size,
+        )
+    return len(scores)
@@ -0,0 +1,199 @@
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from django.db.models import Count
+
+from .constants import POSTINGS_MAX_IN_IDS
+from .models import RecipeIngredient
+from .versions import bump_revision, get_revision
+
+RECIPE_INGREDIENTS = "recipe-ingredients"
+
+
+def _contains(ids: Sequence[int], value: int) -> bool:
+    position = bisect_left(ids, value)
+    return position < len(ids) and ids[position] == value
+
+
+def intersect(left: Sequence[int], right: Sequence[int]) -> List[int]:
+    """
+    Пересечение отсортированных массивов id. Короткий массив проверяется
+    бинарным поиском по длинному, поэтому редкий ингредиент
+    не заставляет просматривать список популярного целиком.
+    """
+    if len(left) > len(right):
+        left, right = right, left
+    return [value for value in left if _contains(right, value)]
+
+
+class IngredientPostings:
+    """
+    Инвертированный индекс «ингредиент -> отсортированный массив id рецептов»
+    и обратный ему «рецепт -> массив id ингредиентов» для одной версии.
+    Массивы array("I") занимают по 4 байта на id.
+    pantry — битовые маски для подбора по продуктам, строятся по запросу.
+    """
+
+    def __init__(
+        self,
+        postings: Dict[int, array],
+        recipes: Dict[int, array],
+        version: int,
+    ):
+        self.postings = postings
+        self.recipes = recipes
+        self.version = version
+        self.pantry = None
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[int, int]], version: int):
+        """Строки (ingredient_id, recipe_id), упорядоченные по ингредиенту."""
+        postings = {}
+        recipes = {}
+        for ingredient_id, group in groupby(rows, key=itemgetter(0)):
+            ids = array("I", sorted({recipe_id for _, recipe_id in group}))
+            postings[ingredient_id] = ids
+            for recipe_id in ids:
+                recipes.setdefault(recipe_id, array("I")).append(ingredient_id)
+        return cls(postings, recipes, version)
+
+    def recipes_with_all(self, ingredient_ids: Iterable[int]) -> List[int]:
+        lists = sorted(
+            (self.postings.get(pk, ()) for pk in ingredient_ids),
+            key=len,
+        )
+        if not lists:
+            return []
+        result = list(lists[0])
+        for ids in lists[1:]:
+            if not result:
+                break
+            result = intersect(result, ids)
+        return result
+
+    def recipes_with_any(self, ingredient_ids: Iterable[int]) -> Set[int]:
+        result = set()
+        for ingredient_id in ingredient_ids:
+            result.update(self.postings.get(ingredient_id, ()))
+        return result
+
+    def with_recipe(
+        self, recipe_id: int, ingredient_ids: Iterable[int], version: int
+    ):
+        """
+        Новая версия индекса с обновлённым составом одного рецепта.
+        Затронутые массивы копируются, поэтому читатели текущей версии
+        в других потоках не видят промежуточного состояния.
+        """
+        postings = dict(self.postings)
+        recipes = dict(self.recipes)
+        old = set(recipes.pop(recipe_id, ()))
+        new = set(ingredient_ids)
+        for ingredient_id in old - new:
+            ids = array("I", postings[ingredient_id])
+            ids.pop(bisect_left(ids, recipe_id))
+            if ids:
+                postings[ingredient_id] = ids
+            else:
+                del postings[ingredient_id]
+        for ingredient_id in new - old:
+            ids = array("I", postings.get(ingredient_id, ()))
+            ids.insert(bisect_left(ids, recipe_id), recipe_id)
+            postings[ingredient_id] = ids
+        if new:
+            recipes[recipe_id] = array("I", sorted(new))
+        result = IngredientPostings(postings, recipes, version)
+        if self.pantry is not None:
+            result.pantry = self.pantry.with_recipe(
+                recipe_id, old, new, self, result
+            )
+        return result
+
+
+_lock = threading.Lock()
+_postings = None
+
+
+def get_ingredient_postings() -> IngredientPostings:
+    """
+    Индекс текущего процесса. Строится лениво одним проходом по индексу
+    (ingredient, recipe) и перестраивается, когда меняется ревизия.
+    """
+    global _postings
+    version = get_revision(RECIPE_INGREDIENTS)
+    postings = _postings
+    if postings is not None and postings.version == version:
+        return postings
+    with _lock:
+        if _postings is None or _postings.version != version:
+            rows = (
+                RecipeIngredient.objects.order_by("ingredient_id", "recipe_id")
+                .values_list("ingredient_id", "recipe_id")
+                .iterator()
+            )
+            _postings = IngredientPostings.build(rows, version)
+        return _postings
+
+
+def recipe_ingredients_changed(recipe_id: int) -> None:
+    """
+    Состав рецепта изменился (вызывается после фиксации транзакции).
+    Другие процессы перестроят индекс по новой ревизии, а текущий
+    обновляет только один рецепт, если его индекс построен ровно
+    для предыдущей ревизии. Ревизии выдаёт база без пропусков
+    и повторов, поэтому совпадение с version - 1 значит, что чужих
+    изменений между ними не было; иначе индекс перестроится целиком
+    при следующем чтении.
+    """
+    global _postings
+    version = bump_revision(RECIPE_INGREDIENTS)
+    with _lock:
+        if _postings is None or _postings.version != version - 1:
+            return
+        ingredient_ids = RecipeIngredient.objects.filter(
+            recipe_id=recipe_id
+        ).values_list("ingredient_id", flat=True)
+        _postings = _postings.with_recipe(recipe_id, ingredient_ids, version)
+
+
+def filter_by_ingredients(
+    queryset, required: Iterable[int] = (), excluded: Iterable[int] = ()
+):
+    """
+    Рецепты со всеми ингредиентами required и без ингредиентов excluded.
+    Пересечение и разность считаются по индексу в памяти; если id
+    получилось слишком много для IN, то же условие уходит в базу
+    одним запросом с группировкой вместо соединения на каждый ингредиент.
+    """
+    required = set(required)
+    excluded = set(excluded)
+    postings = get_ingredient_postings()
+    if required:
+        ids = postings.recipes_with_all(required)
+        if excluded:
+            skip = postings.recipes_with_any(excluded)
+            ids = [recipe_id for recipe_id in ids if recipe_id not in skip]
+        if len(ids) <= POSTINGS_MAX_IN_IDS:
+            return queryset.filter(pk__in=ids)
+        queryset = queryset.filter(
+            pk__in=RecipeIngredient.objects.filter(ingredient_id__in=required)
+            .values("recipe_id")
+            .annotate(matched=Count("ingredient_id"))
+            .filter(matched=len(required))
+            .values("recipe_id")
+        )
+    elif excluded:
+        skip = postings.recipes_with_any(excluded)
+        if len(skip) <= POSTINGS_MAX_IN_IDS:
+            return queryset.exclude(pk__in=skip)
+    if excluded:
+        queryset = queryset.exclude(
+            pk__in=RecipeIngredient.objects.filter(
+                ingredient_id__in=excluded
+            ).values("recipe_id")
+        )
+    return queryset
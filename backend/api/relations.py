@@ -0,0 +1,93 @@
+from typing import FrozenSet
+
+from django.conf import settings
+
+from .constants import USER_RELATIONS_CACHE_SIZE
+from .lru import LRUCache
+from .models import Favorite, ShoppingList, Subscription
+from .versions import get_version
+
+SUBSCRIPTIONS = "subscriptions"
+FAVORITES = "favorites"
+SHOPPING_CART = "shopping_cart"
+
+RELATION_QUERIES = {
+    SUBSCRIPTIONS: lambda user: Subscription.objects.filter(
+        subscriber=user
+    ).values_list("author_id", flat=True),
+    FAVORITES: lambda user: Favorite.objects.filter(user=user).values_list(
+        "recipe_id", flat=True
+    ),
+    SHOPPING_CART: lambda user: ShoppingList.objects.filter(
+        user=user
+    ).values_list("recipe_id", flat=True),
+}
+
+
+def relations_version_name(user_id) -> str:
+    return f"user-relations:{user_id}"
+
+
+# Множества связей между запросами. Ключ включает версию связей
+# пользователя, поэтому после подписки, добавления в избранное
+# или корзину старые записи просто не читаются.
+relation_cache = LRUCache(
+    getattr(settings, "USER_RELATIONS_CACHE_SIZE", USER_RELATIONS_CACHE_SIZE)
+)
+
+
+class UserRelations:
+    """
+    Связи текущего пользователя в пределах одного запроса: id авторов,
+    на которых он подписан, id рецептов в избранном и в корзине.
+    Каждое множество загружается лениво и не больше одного раза.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._sets = {}
+        self._version = None
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.user is not None and self.user.is_authenticated
+
+    def _load(self, relation: str) -> FrozenSet[int]:
+        if relation in self._sets:
+            return self._sets[relation]
+        if not self.is_authenticated:
+            ids = frozenset()
+        elif relation_cache.max_size:
+            if self._version is None:
+                self._version = get_version(
+                    relations_version_name(self.user.pk)
+                )
+            key = (self.user.pk, relation, self._version)
+            ids = relation_cache.get(key)
+            if ids is None:
+                ids = frozenset(RELATION_QUERIES[relation](self.user))
+                relation_cache.set(key, ids)
+        else:
+            ids = frozenset(RELATION_QUERIES[relation](self.user))
+        self._sets[relation] = ids
+        return ids
+
+    def is_subscribed(self, author_id) -> bool:
+        return author_id in self._load(SUBSCRIPTIONS)
+
+    def is_favorited(self, recipe_id) -> bool:
+        return recipe_id in self._load(FAVORITES)
+
+    def is_in_shopping_cart(self, recipe_id) -> bool:
+        return recipe_id in self._load(SHOPPING_CART)
+
+
+def get_user_relations(request) -> UserRelations:
+    """Связи пользователя запроса; создаются один раз на запрос."""
+    if request is None:
+        return UserRelations(None)
+    relations = getattr(request, "_user_relations", None)
+    if relations is None or relations.user is not request.user:
+        relations = UserRelations(request.user)
+        request._user_relations = relations
+    return relations
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator
+
+from rest_framework.renderers import BaseRenderer
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """
+    Базовый рендерер списка покупок.
+    Строки списка выдаются по одной, чтобы ответ можно было отдавать
+    потоком, не собирая весь файл в памяти.
+    """
+
+    charset = "utf-8"
+    filename = "shopping_list"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Рендер обычных ответов, например ошибок авторизации."""
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+    def stream(self, rows: Iterable[Dict]) -> Iterator[bytes]:
+        for chunk in self.iter_chunks(rows):
+            yield chunk.encode(self.charset)
+
+    def iter_chunks(self, rows: Iterable[Dict]) -> Iterator[str]:
+        raise NotImplementedError
+
+    @property
+    def content_disposition(self) -> str:
+        return f'attachment; filename="{self.filename}.{self.format}"'
+
+
+class ShoppingListTxtRenderer(ShoppingListRenderer):
+    """Список покупок в виде текста: «название-количество(единица)»."""
+
+    media_type = "text/plain"
+    format = "txt"
+
+    def iter_chunks(self, rows):
+        separator = ""
+        for row in rows:
+            yield (
+                f"{separator}{row['ingredient__name']}-{row['total_amount']}"
+                f"({row['ingredient__measurement_unit']})"
+            )
+            separator = "\n"
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    """Список покупок в формате CSV."""
+
+    media_type = "text/csv"
+    format = "csv"
+    header = ("name", "measurement_unit", "amount")
+
+    def iter_chunks(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.header)
+        for row in rows:
+            writer.writerow(
+                (
+                    row["ingredient__name"],
+                    row["ingredient__measurement_unit"],
+                    row["total_amount"],
+                )
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+
+class ShoppingListJSONRenderer(ShoppingListRenderer):
+    """Список покупок в виде JSON-массива."""
+
+    media_type = "application/json"
+    format = "json"
+
+    def iter_chunks(self, rows):
+        separator = "["
+        for row in rows:
+            yield separator + json.dumps(
+                {
+                    "name": row["ingredient__name"],
+                    "measurement_unit": row["ingredient__measurement_unit"],
+                    "amount": row["total_amount"],
+                },
+                ensure_ascii=False,
+            )
+            separator = ","
+        yield "[]" if separator == "[" else "]"
@@ -0,0 +1,135 @@
+import copy
+import hashlib
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from .constants import RESPONSE_CACHE_KEY, RESPONSE_CACHE_TIMEOUT
+from .relations import UserRelations, get_user_relations
+from .versions import bump_version, get_version
+
+# Версия всех списков рецептов: меняется при любом изменении,
+# которое видно в списке или влияет на порядок.
+RECIPES = "responses:recipes"
+
+# Фильтры, результат которых у каждого пользователя свой.
+PERSONAL_PARAMS = ("is_favorited", "is_in_shopping_cart")
+
+# Поля пользователя, которые видны в ответах.
+PUBLIC_USER_FIELDS = {"username", "email", "first_name", "last_name", "avatar"}
+
+
+def recipe_version_name(recipe_id) -> str:
+    return f"responses:recipe:{recipe_id}"
+
+
+def author_version_name(author_id) -> str:
+    return f"responses:author:{author_id}"
+
+
+def bump_versions(*names: str) -> None:
+    for name in names:
+        bump_version(name)
+
+
+def bump_after_commit(*names: str) -> None:
+    """
+    Сменить версии после фиксации транзакции: иначе параллельный запрос
+    успел бы закешировать старые данные уже под новой версией.
+    """
+    transaction.on_commit(partial(bump_versions, *names))
+
+
+def overlay_user(data: Dict, relations: UserRelations) -> None:
+    data["is_subscribed"] = relations.is_subscribed(data["id"])
+
+
+def overlay_recipe(data: Dict, relations: UserRelations) -> None:
+    data["is_favorited"] = relations.is_favorited(data["id"])
+    data["is_in_shopping_cart"] = relations.is_in_shopping_cart(data["id"])
+    overlay_user(data["author"], relations)
+
+
+def overlay_recipes(data: Dict, relations: UserRelations) -> None:
+    """Страница списка: с пагинацией или без неё."""
+    items = data["results"] if isinstance(data, dict) else data
+    for item in items:
+        overlay_recipe(item, relations)
+
+
+class ResponseCacheMixin:
+    """
+    Кеш ответов на чтение, общий для всех пользователей.
+    Ключ — нормализованные параметры запроса и версии данных, от которых
+    зависит ответ, поэтому сброс — это смена версии, без поиска ключей.
+    В кеше лежит ответ для анонима; для пользователя поверх него
+    проставляются только его флаги подписки, избранного и корзины.
+    """
+
+    def cached_response(
+        self,
+        request,
+        versions: Iterable[str],
+        build: Callable[[], Response],
+        overlay: Callable[[Dict, UserRelations], None],
+        depends: Optional[Callable[[], Iterable[str]]] = None,
+    ) -> Response:
+        """
+        versions — версии, известные до запроса к базе (входят в ключ);
+        depends — версии, которые становятся известны только по данным
+        (например, автор рецепта), они сохраняются вместе с ответом
+        и сверяются при чтении.
+        """
+        user_is_authenticated = request.user.is_authenticated
+        if user_is_authenticated and any(
+            request.query_params.get(param) for param in PERSONAL_PARAMS
+        ):
+            return build()
+        key = self._response_cache_key(request, versions)
+        entry = cache.get(key)
+        if entry is not None and all(
+            get_version(name) == version for name, version in entry["depends"]
+        ):
+            data = entry["data"]
+            if user_is_authenticated:
+                overlay(data, get_user_relations(request))
+            return Response(data)
+
+        names = depends() if depends is not None else ()
+        dependencies = [(name, get_version(name)) for name in names]
+        response = build()
+        if response.status_code == status.HTTP_200_OK:
+            data = response.data
+            if user_is_authenticated:
+                data = copy.deepcopy(data)
+                overlay(data, UserRelations(None))
+            cache.set(
+                key,
+                {"data": data, "depends": dependencies},
+                RESPONSE_CACHE_TIMEOUT,
+            )
+        return response
+
+    def _response_cache_key(self, request, versions: Iterable[str]) -> str:
+        params = sorted(
+            (name, value)
+            for name in request.query_params
+            for value in request.query_params.getlist(name)
+            if value
+        )
+        raw = repr(
+            (
+                request.build_absolute_uri("/"),
+                self.action,
+                sorted(self.kwargs.items()),
+                params,
+                [(name, get_version(name)) for name in versions],
+            )
+        )
+        digest = hashlib.sha1(raw.encode()).hexdigest()
+        return RESPONSE_CACHE_KEY.format(view=self.basename, digest=digest)
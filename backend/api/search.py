@@ -0,0 +1,209 @@
+import re
+from typing import List
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+RECIPE_TABLE = "api_recipe"
+FTS_TABLE = "api_recipe_fts"
+
+# Название рецепта весит больше описания: в bm25 — коэффициентами
+# столбцов, в PostgreSQL — весами setweight A и B.
+SQLITE_RANK = f"-bm25({FTS_TABLE}, 10.0, 1.0)"
+
+
+def fold(column: str) -> str:
+    """
+    unicode61 не приравнивает «ё» к «е», поэтому в индекс попадает
+    текст с заменённой «ё»; то же делается и с запросом.
+    """
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+# Индекс без собственной копии текста (content=''): в него пишутся
+# нормализованные значения, а сами рецепты читаются из api_recipe.
+SQLITE_SETUP = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, text, content='', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT "
+    f"ON {RECIPE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, text) "
+    f"VALUES (new.id, {fold('new.name')}, {fold('new.text')}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE "
+    f"ON {RECIPE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text) "
+    f"VALUES ('delete', old.id, {fold('old.name')}, {fold('old.text')}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    f"AFTER UPDATE OF name, text "
+    f"ON {RECIPE_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text) "
+    f"VALUES ('delete', old.id, {fold('old.name')}, {fold('old.text')}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, text) "
+    f"VALUES (new.id, {fold('new.name')}, {fold('new.text')}); END",
+]
+SQLITE_REBUILD = [
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f"INSERT INTO {FTS_TABLE}(rowid, name, text) "
+    f"SELECT id, {fold('name')}, {fold('text')} FROM {RECIPE_TABLE}",
+]
+SQLITE_TEARDOWN = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def postgres_vector(table: str = "") -> str:
+    """
+    Выражение tsvector рецепта. Индекс и запрос должны использовать одно
+    и то же выражение, иначе планировщик не возьмёт GIN-индекс.
+    """
+    prefix = f'"{table}".' if table else ""
+    return (
+        f"setweight(to_tsvector('russian', "
+        f"coalesce({prefix}name, '')), 'A') || "
+        f"setweight(to_tsvector('russian', "
+        f"coalesce({prefix}text, '')), 'B')"
+    )
+
+
+POSTGRES_QUERY = "websearch_to_tsquery('russian', %s)"
+POSTGRES_SETUP = [
+    "CREATE INDEX IF NOT EXISTS recipe_search_idx "
+    f"ON {RECIPE_TABLE} USING GIN (({postgres_vector()}))",
+]
+POSTGRES_TEARDOWN = ["DROP INDEX IF EXISTS recipe_search_idx"]
+
+WORD_RE = re.compile(r"\w+")
+
+# Окончания для грубого стемминга русских слов в запросе к FTS5:
+# у SQLite нет русского стеммера, поэтому слово обрезается до основы
+# и ищется по префиксу («яйца» -> «яйц*» находит и «яйцо»).
+RUSSIAN_ENDINGS = sorted(
+    (
+        "иями ями ами ией ием ого его ому ему ыми ими ая яя ое ее ие ые ой ей "
+        "ий ый ую юю ом ем ам ям ах ях ов ев ью ия ья а я о е и ы у ю ь й"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 3
+
+
+def stem(word: str) -> str:
+    for ending in RUSSIAN_ENDINGS:
+        stem_length = len(word) - len(ending)
+        if word.endswith(ending) and stem_length >= MIN_STEM_LENGTH:
+            return word[: -len(ending)]
+    return word
+
+
+def fts_query(query: str) -> str:
+    """
+    Запрос FTS5: все слова запроса по основе с префиксным совпадением.
+    Однобуквенные слова (предлоги, союзы) отбрасываются, двухбуквенные
+    ищутся целиком.
+    """
+    terms: List[str] = []
+    for word in WORD_RE.findall(query.casefold().replace("ё", "е")):
+        if len(word) >= MIN_STEM_LENGTH:
+            terms.append(f'"{stem(word)}"*')
+        elif len(word) > 1:
+            terms.append(f'"{word}"')
+    return " ".join(dict.fromkeys(terms))
+
+
+def install_search_index(connection, rebuild: bool = True) -> None:
+    """
+    Создать полнотекстовый индекс рецептов для текущей СУБД.
+    Для остальных СУБД поиск работает без индекса.
+    """
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for statement in SQLITE_SETUP:
+                cursor.execute(statement)
+            if rebuild:
+                for statement in SQLITE_REBUILD:
+                    cursor.execute(statement)
+    elif connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for statement in POSTGRES_SETUP:
+                cursor.execute(statement)
+
+
+def repair_search_triggers(connection) -> None:
+    """
+    SQLite пересоздаёт таблицу при изменении её схемы и теряет триггеры.
+    Если индекс есть, а триггеров нет, они создаются заново и индекс
+    перестраивается.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master WHERE name LIKE %s",
+            [f"{FTS_TABLE}%"],
+        )
+        existing = {name for _, name in cursor.fetchall()}
+    triggers = {
+        f"{FTS_TABLE}_{event}" for event in ("insert", "delete", "update")
+    }
+    if FTS_TABLE in existing and not triggers <= existing:
+        install_search_index(connection)
+
+
+def uninstall_search_index(connection) -> None:
+    statements = {
+        "sqlite": SQLITE_TEARDOWN,
+        "postgresql": POSTGRES_TEARDOWN,
+    }.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def search_recipes(queryset, query: str):
+    """
+    Рецепты, подходящие под поисковый запрос, с релевантностью search_rank
+    (больше — лучше) и сортировкой по ней, затем по дате публикации.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "sqlite":
+        match = fts_query(query)
+        if not match:
+            return queryset
+        matches = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        queryset = queryset.filter(pk__in=RawSQL(matches, [match])).annotate(
+            search_rank=RawSQL(
+                f"SELECT {SQLITE_RANK} FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {RECIPE_TABLE}.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+    elif connection.vendor == "postgresql":
+        if not WORD_RE.search(query):
+            return queryset
+        vector = postgres_vector(RECIPE_TABLE)
+        queryset = queryset.filter(
+            RawSQL(
+                f"({vector}) @@ {POSTGRES_QUERY}",
+                [query],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({vector}, {POSTGRES_QUERY})",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        for word in WORD_RE.findall(query):
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(text__icontains=word)
+            )
+        return queryset
+    return queryset.order_by("-search_rank", "-pub_date", "-id")
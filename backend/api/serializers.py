@@ -1,600 +1,881 @@
-from typing import List, Dict, Optional
-from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
-from django.core.validators import (
-    RegexValidator,
-    MinLengthValidator,
-    MaxLengthValidator,
-)
-from rest_framework.validators import UniqueValidator
-
-import base64
-import binascii
-import re
-import difflib
-from django.core.files.base import ContentFile
-
-from django.contrib.auth import authenticate, get_user_model
-from .models import (
-    Subscription,
-    Ingredient,
-    Recipe,
-    RecipeIngredient,
-    Favorite,
-    ShoppingList,
-)
-
-from .constants import (
-    MIN_COOKING_TIME,
-    MAX_COOKING_TIME,
-    MIN_VALUE,
-    MAX_VALUE,
-    MAX_LENGTH,
-)
-
-
-User = get_user_model()
-
-
-class UserSerializer(serializers.ModelSerializer):
-
-    is_subscribed = serializers.SerializerMethodField()
-
-    class Meta:
-        model = User
-        fields = [
-            "id",
-            "username",
-            "email",
-            "first_name",
-            "last_name",
-            "is_subscribed",
-            "avatar",
-        ]
-
-    def get_is_subscribed(self, obj):
-        request = self.context.get("request")
-        user = request.user
-        if not user.is_authenticated:
-            return False
-        return user.subscriptions.filter(author=obj).exists()
-
-
-class Base64ImageField(serializers.ImageField):
-    """ "
-    Пользовательское поле сериализатора для обработки изображений,
-    закодированных в base64. Преобразует строку base64 в объект ContentFile,
-    который может быть сохранен как изображение.
-    """
-
-    def to_internal_value(self, data):
-        if isinstance(data, str) and data.startswith("data:image"):
-            format, imgstr = data.split(";base64,")
-            ext = format.split("/")[-1]
-
-            imgstr = self._add_base64_padding(imgstr)
-
-            try:
-                decoded_file = base64.b64decode(imgstr)
-            except (binascii.Error, ValueError) as e:
-                raise serializers.ValidationError("Некорректная строка base64")
-
-            file_name = f"uploaded.{ext}"
-            data = ContentFile(decoded_file, name=file_name)
-
-        return super().to_internal_value(data)
-
-    def _add_base64_padding(self, s):
-        return s + "=" * (-len(s) % 4)
-
-
-class UserProfileSerializer(serializers.ModelSerializer):
-    """Профиль пользователя с рецептами и их количеством."""
-
-    recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.ReadOnlyField(source="recipes.count")
-    is_subscribed = serializers.SerializerMethodField()
-
-    class Meta:
-        model = User
-        fields = [
-            "id",
-            "username",
-            "email",
-            "first_name",
-            "last_name",
-            "avatar",
-            "is_subscribed",
-            "recipes",
-            "recipes_count",
-        ]
-
-    def get_is_subscribed(self, obj):
-        request = self.context.get("request")
-        user = request.user
-        if not user.is_authenticated:
-            return False
-        return user.subscriptions.filter(author=obj).exists()
-
-    def get_recipes(self, obj):
-        request = self.context.get("request")
-        recipes_limit = request.query_params.get("recipes_limit")
-        try:
-            limit = int(recipes_limit)
-        except (TypeError, ValueError):
-            limit = None
-
-        recipes_qs = obj.recipes.all()
-        if limit:
-            recipes_qs = recipes_qs[:limit]
-        return RecipeAddSerializer(
-            recipes_qs, many=True, context={"request": request}
-        ).data
-
-
-class AvatarSerializer(serializers.ModelSerializer):
-    """Мини-сериализатор для обновления аватара пользователя."""
-
-    avatar = Base64ImageField(required=True)
-
-    class Meta:
-        model = User
-        fields = ["avatar"]
-
-
-class CreateSubscriptionSerializer(serializers.ModelSerializer):
-    """Сериализатор для подписки на пользователя."""
-
-    author = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
-
-    class Meta:
-        model = Subscription
-        fields = ["author"]
-
-    def validate(self, data):
-        """Проверка, чтобы пользователь не подписывался сам на себя и не дублировал подписку."""
-        user = self.context["request"].user
-        author = data["author"]
-        if user == author:
-            raise serializers.ValidationError("Вы не можете подписаться на себя!")
-        if user.subscriptions.filter(author=author).exists():
-            raise serializers.ValidationError("Вы уже подписаны на этого пользователя.")
-        return data
-
-    def create(self, validated_data):
-        """Создание подписки."""
-        subscriber = self.context["request"].user
-        subscription = Subscription.objects.create(
-            author=validated_data["author"], subscriber=subscriber
-        )
-        return subscription
-
-    def to_representation(self, instance):
-        """Отображение профиля подписанного пользователя."""
-        request = self.context.get("request")
-        author = instance.author
-        return UserProfileSerializer(author, context={"request": request}).data
-
-
-class UserRegistrationSerializer(serializers.ModelSerializer):
-    """Регистрация нового пользователя."""
-
-    username = serializers.CharField(
-        max_length=MAX_LENGTH,
-        validators=[
-            RegexValidator(
-                regex=r"^[A-Za-z0-9._-]+$",
-                message="InvalidU$ername",
-            ),
-            UniqueValidator(
-                queryset=User.objects.all(), message="Такой username уже существует."
-            ),
-        ],
-    )
-    email = serializers.EmailField(validators=[])
-    password = serializers.CharField(write_only=True)
-    first_name = serializers.CharField(
-        max_length=MAX_LENGTH,
-        validators=[
-            MaxLengthValidator(MAX_LENGTH),
-        ],
-    )
-    last_name = serializers.CharField(
-        max_length=MAX_LENGTH,
-        validators=[
-            MaxLengthValidator(MAX_LENGTH),
-        ],
-    )
-
-    class Meta:
-        model = User
-        fields = [
-            "username",
-            "email",
-            "password",
-            "first_name",
-            "last_name",
-        ]
-
-    def validate_email(self, value):
-        email_lower = value.lower()
-        for user in User.objects.all():
-            similarity = difflib.SequenceMatcher(
-                None, email_lower, user.email.lower()
-            ).ratio()
-            if similarity >= 0.8:
-                raise serializers.ValidationError(
-                    "Пользователь с похожей почтой уже зарегистрирован."
-                )
-        return value
-
-    def validate(self, data):
-        return data
-
-    def create(self, validated_data):
-        user = User.objects.create_user(**validated_data)
-        return user
-
-
-class UserResponseSerializer(serializers.ModelSerializer):
-    """Форма вывода определенных данных о пользователях."""
-
-    class Meta:
-        model = User
-        fields = [
-            "id",
-            "username",
-            "email",
-            "first_name",
-            "last_name",
-        ]
-
-
-class LoginSerializer(serializers.Serializer):
-    """Обработка данных пользователя при входе в аккаунт."""
-
-    email = serializers.EmailField()
-    password = serializers.CharField()
-
-    def validate(self, data):
-        email = data.get("email")
-        password = data.get("password")
-
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            raise serializers.ValidationError("Пользователь с таким email не найден.")
-
-        if not user.check_password(password):
-            raise serializers.ValidationError("Неправильный пароль.")
-
-        data["user"] = user
-        return data
-
-
-class SetPasswordSerializer(serializers.Serializer):
-    """Смена пароля."""
-
-    current_password = serializers.CharField(required=True)
-    new_password = serializers.CharField(required=True)
-
-    def validate_current_password(self, value):
-        user = self.context["request"].user
-        if not user.check_password(value):
-            raise serializers.ValidationError("Текущий пароль указан неверно.")
-        return value
-
-    def validate_new_password(self, value):
-        return value
-
-
-class UserSubscriptionSerializer(serializers.ModelSerializer):
-    """Серилизатор для вывода данных о пользователе с подпиской."""
-
-    is_subscribed = serializers.SerializerMethodField()
-
-    class Meta:
-        model = User
-        fields = [
-            "id",
-            "username",
-            "email",
-            "first_name",
-            "last_name",
-            "avatar",
-            "is_subscribed",
-        ]
-
-    def get_is_subscribed(self, obj):
-        request = self.context.get("request")
-        user = request.user
-        if not user.is_authenticated:
-            return False
-        return user.subscriptions.filter(author=obj).exists()
-
-
-class ShortIngredientsSerializer(serializers.ModelSerializer):
-    """Краткий сериализатор ингредиентов для отображения."""
-
-    class Meta:
-        model = Ingredient
-        fields = ["id", "name", "measurement_unit"]
-        read_only_fields = ["id"]
-
-
-class IngredientInputSerializer(serializers.Serializer):
-    """Создание и изменение ингридиентов администратором."""
-
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(),
-        source="ingredient",
-        required=True,
-        help_text="Идентификатор ингредиента",
-    )
-    amount = serializers.IntegerField(
-        min_value=MIN_VALUE,
-        max_value=MAX_VALUE,
-        required=True,
-        help_text="Количество ингредиента",
-    )
-
-
-class RecipeIngredientSerializer(serializers.ModelSerializer):
-    """Сериализатор для ингредиентов в рецепте."""
-
-    id = serializers.ReadOnlyField(source="ingredient.id")
-    name = serializers.ReadOnlyField(source="ingredient.name")
-    measurement_unit = serializers.ReadOnlyField(source="ingredient.measurement_unit")
-    amount = serializers.IntegerField(min_value=MIN_VALUE, max_value=MAX_VALUE)
-
-    class Meta:
-        model = RecipeIngredient
-        fields = ["id", "name", "measurement_unit", "amount"]
-
-
-class RecipeResponseSerializer(serializers.ModelSerializer):
-    """Представление рецептов согласно схеме."""
-
-    author = UserSerializer(read_only=True)
-    ingredients = RecipeIngredientSerializer(
-        source="ingredients_amounts",
-        many=True,
-        read_only=True,
-    )
-    image = Base64ImageField(required=False)
-    cooking_time = serializers.IntegerField(
-        min_value=MIN_COOKING_TIME, max_value=MAX_COOKING_TIME
-    )
-
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Recipe
-        fields = [
-            "id",
-            "author",
-            "name",
-            "image",
-            "text",
-            "ingredients",
-            "cooking_time",
-            "is_favorited",
-            "is_in_shopping_cart",
-        ]
-
-    def get_is_favorited(self, obj):
-        user = self.context["request"].user
-        if not user.is_authenticated:
-            return False
-        return obj.favorited_by.filter(user=user).exists()
-
-    def get_is_in_shopping_cart(self, obj):
-        user = self.context["request"].user
-        if not user.is_authenticated:
-            return False
-        return obj.in_shopping_carts.filter(user=user).exists()
-
-    def create(self, validated_data):
-        ingredients_data = validated_data.pop("ingredients", [])
-        recipe = super().create(validated_data)
-        self._create_ingredients(recipe, ingredients_data)
-        return recipe
-
-    def update(self, instance, validated_data):
-        ingredients_data = validated_data.pop("ingredients", None)
-        recipe = super().update(instance, validated_data)
-        if ingredients_data is not None:
-            self._update_ingredients(recipe, ingredients_data)
-        return recipe
-
-
-class RecipeAddSerializer(serializers.ModelSerializer):
-    """Добавление рецепта согласно схеме."""
-
-    class Meta:
-        model = Recipe
-        fields = [
-            "id",
-            "name",
-            "image",
-            "cooking_time",
-        ]
-
-
-class RecipeSerializer(serializers.ModelSerializer):
-    """Основной сериализатор для рецептов."""
-
-    author = UserSerializer(read_only=True)
-    ingredients = IngredientInputSerializer(many=True, write_only=True, required=False)
-    image = Base64ImageField(required=False)
-    cooking_time = serializers.IntegerField(
-        min_value=MIN_COOKING_TIME, max_value=MAX_COOKING_TIME
-    )
-
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Recipe
-        fields = [
-            "id",
-            "author",
-            "name",
-            "image",
-            "text",
-            "ingredients",
-            "cooking_time",
-            "is_favorited",
-            "is_in_shopping_cart",
-        ]
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["ingredients"] = RecipeIngredientSerializer(
-            instance.ingredients_amounts.all(), many=True
-        ).data
-        return data
-
-    def get_is_favorited(self, obj):
-        user = self.context["request"].user
-        if not user.is_authenticated:
-            return False
-        return obj.favorited_by.filter(user=user).exists()
-
-    def get_is_in_shopping_cart(self, obj):
-        user = self.context["request"].user
-        if not user.is_authenticated:
-            return False
-        return obj.in_shopping_carts.filter(user=user).exists()
-
-    def validate(self, data: Dict) -> Dict:
-        """Проверка данных перед созданием/обновлением."""
-        name = data.get("name")
-        if name is None:
-            raise serializers.ValidationError("Название рецепта обязательно.")
-
-        ingredients = data.get("ingredients")
-        if not ingredients:
-            raise serializers.ValidationError(
-                "Список ингредиентов не может быть пустым!"
-            )
-
-        for item in ingredients:
-            if "ingredient" not in item:
-                raise serializers.ValidationError(
-                    f"Элемент {item} не содержит ключ 'ingredient'."
-                )
-
-        ingredient_ids = [
-            (
-                item["ingredient"].id
-                if hasattr(item["ingredient"], "id")
-                else item["ingredient"]
-            )
-            for item in ingredients
-        ]
-
-        existing_ids = set(
-            Ingredient.objects.filter(id__in=ingredient_ids).values_list(
-                "id", flat=True
-            )
-        )
-
-        missing_ids = set(ingredient_ids) - existing_ids
-        if missing_ids:
-            raise serializers.ValidationError(
-                f"Некоторые ингредиенты не найдены: {missing_ids}"
-            )
-
-        if len(ingredient_ids) != len(set(ingredient_ids)):
-            raise serializers.ValidationError("Ингредиенты должны быть уникальными!")
-
-        if "image" not in self.initial_data or not self.initial_data.get("image"):
-            raise ValidationError("Поле 'image' обязательно при создании рецепта.")
-
-        return data
-
-    def _create_ingredients(self, recipe: Recipe, ingredients_data: List[Dict]) -> None:
-        """Создать связи ингредиентов для рецепта."""
-        ingredients_bulk = []
-        RecipeIngredient.objects.bulk_create(ingredients_bulk)
-
-    def _update_ingredients(self, recipe: Recipe, ingredients_data: List[Dict]) -> None:
-        """Обновить связи ингредиентов."""
-        recipe.ingredients_amounts.all().delete()
-        self._create_ingredients(recipe, ingredients_data)
-
-    def create(self, validated_data: Dict) -> Recipe:
-        """Создать рецепт с ингредиентами."""
-        ingredients_data = validated_data.pop("ingredients", [])
-        recipe = Recipe.objects.create(**validated_data)
-        self._create_ingredients(recipe, ingredients_data)
-        return recipe
-
-    def update(self, instance: Recipe, validated_data: Dict) -> Recipe:
-        """Обновить рецепт и ингредиенты."""
-        ingredients_data = validated_data.pop("ingredients", None)
-
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if ingredients_data is not None:
-            self._update_ingredients(instance, ingredients_data)
-
-        return instance
-
-
-class FavoriteResponseSerializer(serializers.ModelSerializer):
-    """Представление рецептов в избранном согласно схеме."""
-
-    class Meta:
-        model = Recipe
-        fields = ["id", "name", "image", "cooking_time"]
-
-
-class FavoriteCreateSerializer(serializers.ModelSerializer):
-    """Сериализатор для добавления рецепта в избранное."""
-
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
-
-    class Meta:
-        model = Favorite
-        fields = ["recipe"]
-
-    def validate(self, data):
-        user = self.context["request"].user
-        recipe = data["recipe"]
-        if user.favorites.filter(recipe=recipe).exists():
-            raise serializers.ValidationError("Этот рецепт уже в избранном.")
-        return data
-
-    def create(self, validated_data):
-        user = self.context["request"].user
-        favorite = user.favorites.get_or_create(recipe=validated_data["recipe"])
-        return favorite
-
-
-class ShoppingListCreateSerializer(serializers.ModelSerializer):
-    """Сериализатор для добавления рецепта в список покупок."""
-
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
-
-    class Meta:
-        model = ShoppingList
-        fields = ["recipe"]
-
-    def validate(self, data):
-        user = self.context["request"].user
-        recipe = data["recipe"]
-        if user.shopping_carts.filter(recipe=recipe).exists():
-            raise serializers.ValidationError("Этот рецепт уже в списке покупок.")
-        return data
-
-    def create(self, validated_data):
-        user = self.context["request"].user
-        shopping_item = user.shopping_carts.get_or_create(
-            recipe=validated_data["recipe"]
-        )
-        return shopping_item
+from typing import List, Dict, Optional
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from django.core.validators import (
+    RegexValidator,
+    MinLengthValidator,
+    MaxLengthValidator,
+)
+from rest_framework.validators import UniqueValidator
+
+import base64
+import binascii
+import re
+from functools import partial
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from django.contrib.auth import authenticate, get_user_model
+from .models import (
+    UploadSession,
+    Subscription,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    Favorite,
+    ShoppingList,
+)
+
+from .derivatives import discard_derivatives, variant_urls
+from .postings import recipe_ingredients_changed
+from .relations import get_user_relations
+from .response_cache import (
+    RECIPES,
+    author_version_name,
+    bump_after_commit,
+    recipe_version_name,
+)
+from .similarity import find_similar_email
+from .uploads import SessionUploadedFile
+from .constants import (
+    MIN_COOKING_TIME,
+    MAX_COOKING_TIME,
+    MIN_VALUE,
+    MAX_VALUE,
+    MAX_LENGTH,
+    MAX_IMAGE_SIZE,
+    UPLOAD_REFERENCE_PREFIX,
+    IMAGE_VARIANTS_QUERY_PARAM,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
+
+
+User = get_user_model()
+
+
+class ImageVariantsMixin:
+    """
+    По параметру ?image_variants=1 добавляет к ответу ссылки на миниатюру
+    и WebP-версии изображений из image_variant_fields (поле <имя>_variants).
+    Пока производные не построены, значение — null.
+    """
+
+    image_variant_fields = ()
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get("request")
+        params = getattr(request, "query_params", {})
+        if not params.get(IMAGE_VARIANTS_QUERY_PARAM):
+            return data
+        for field in self.image_variant_fields:
+            urls = variant_urls(getattr(instance, field))
+            if urls is not None:
+                urls = {
+                    variant: request.build_absolute_uri(url)
+                    for variant, url in urls.items()
+                }
+            data[f"{field}_variants"] = urls
+        return data
+
+
+class UserSerializer(ImageVariantsMixin, serializers.ModelSerializer):
+    image_variant_fields = ("avatar",)
+
+    is_subscribed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "is_subscribed",
+            "avatar",
+        ]
+
+    def get_is_subscribed(self, obj):
+        annotated = getattr(obj, "is_subscribed", None)
+        if annotated is not None:
+            return annotated
+        relations = get_user_relations(self.context.get("request"))
+        return relations.is_subscribed(obj.pk)
+
+
+class Base64ImageField(serializers.ImageField):
+    """ "
+    Пользовательское поле сериализатора для обработки изображений,
+    закодированных в base64. Преобразует строку base64 в объект ContentFile,
+    который может быть сохранен как изображение.
+    Также принимает файлы multipart и ссылки «upload:<id>» на завершённые
+    сессии докачиваемой загрузки.
+    """
+
+    upload_session = None
+    upload_file = None
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) and data.startswith(UPLOAD_REFERENCE_PREFIX):
+            return self._session_file(data[len(UPLOAD_REFERENCE_PREFIX):])
+        if isinstance(data, str) and data.startswith("data:image"):
+            format, imgstr = data.split(";base64,")
+            ext = format.split("/")[-1]
+
+            imgstr = self._add_base64_padding(imgstr)
+
+            try:
+                decoded_file = base64.b64decode(imgstr)
+            except (binascii.Error, ValueError) as e:
+                raise serializers.ValidationError("Некорректная строка base64")
+
+            file_name = f"uploaded.{ext}"
+            data = ContentFile(decoded_file, name=file_name)
+
+        return super().to_internal_value(data)
+
+    def _add_base64_padding(self, s):
+        return s + "=" * (-len(s) % 4)
+
+    def _session_file(self, session_id):
+        request = self.context.get("request")
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            raise serializers.ValidationError("Загрузка не найдена.")
+        try:
+            session = UploadSession.objects.get(pk=session_id, user=user)
+        except (UploadSession.DoesNotExist, DjangoValidationError, ValueError):
+            raise serializers.ValidationError("Загрузка не найдена.")
+        if not session.complete:
+            raise serializers.ValidationError("Загрузка ещё не завершена.")
+        file = SessionUploadedFile(session)
+        try:
+            value = super().to_internal_value(file)
+        except serializers.ValidationError:
+            file.close()
+            raise
+        self.upload_session, self.upload_file = session, file
+        return value
+
+    def release_upload(self, saved: bool) -> None:
+        """
+        Закрыть файл сессии загрузки. Если изображение сохранено,
+        сессия удаляется после фиксации транзакции.
+        """
+        if self.upload_file is None:
+            return
+        self.upload_file.close()
+        if saved:
+            transaction.on_commit(self.upload_session.discard)
+        self.upload_session = self.upload_file = None
+
+
+class UploadSessionMixin:
+    """
+    Освобождает сессии загрузки, на которые ссылаются поля Base64ImageField:
+    после неудачной проверки или сохранения только закрывает их файлы,
+    а после успешного сохранения ещё и удаляет сессии.
+    """
+
+    def is_valid(self, raise_exception=False):
+        try:
+            valid = super().is_valid(raise_exception=raise_exception)
+        except ValidationError:
+            self._release_uploads(saved=False)
+            raise
+        if not valid:
+            self._release_uploads(saved=False)
+        return valid
+
+    def save(self, **kwargs):
+        try:
+            instance = super().save(**kwargs)
+        except Exception:
+            self._release_uploads(saved=False)
+            raise
+        self._release_uploads(saved=True)
+        return instance
+
+    def _release_uploads(self, saved: bool) -> None:
+        for field in self.fields.values():
+            if isinstance(field, Base64ImageField):
+                field.release_upload(saved)
+
+
+def get_recipes_limit(request) -> Optional[int]:
+    """Значение параметра recipes_limit или None."""
+    try:
+        return int(request.query_params.get("recipes_limit"))
+    except (TypeError, ValueError):
+        return None
+
+
+class UserProfileSerializer(ImageVariantsMixin, serializers.ModelSerializer):
+    """Профиль пользователя с рецептами и их количеством."""
+
+    image_variant_fields = ("avatar",)
+
+    recipes = serializers.SerializerMethodField()
+    is_subscribed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "avatar",
+            "is_subscribed",
+            "recipes",
+            "recipes_count",
+            "followers_count",
+        ]
+
+    def validate_email(self, value):
+        """Почта сравнивается в том виде, в котором её сохранит модель."""
+        value = User.normalize_email_address(value)
+        taken = User.objects.filter(email__iexact=value)
+        if self.instance is not None:
+            taken = taken.exclude(pk=self.instance.pk)
+        if taken.exists():
+            raise serializers.ValidationError(
+                "Пользователь с такой почтой уже существует."
+            )
+        return value
+
+    def get_is_subscribed(self, obj):
+        annotated = getattr(obj, "is_subscribed", None)
+        if annotated is not None:
+            return annotated
+        relations = get_user_relations(self.context.get("request"))
+        return relations.is_subscribed(obj.pk)
+
+    def get_recipes(self, obj):
+        request = self.context.get("request")
+        recipes_qs = getattr(obj, "recipe_previews", None)
+        if recipes_qs is None:
+            limit = get_recipes_limit(request)
+            recipes_qs = obj.recipes.all()
+            if limit:
+                recipes_qs = recipes_qs[:limit]
+        return RecipeAddSerializer(
+            recipes_qs, many=True, context={"request": request}
+        ).data
+
+
+class AvatarSerializer(UploadSessionMixin, serializers.ModelSerializer):
+    """Мини-сериализатор для обновления аватара пользователя."""
+
+    avatar = Base64ImageField(required=True)
+
+    class Meta:
+        model = User
+        fields = ["avatar"]
+
+    def update(self, instance, validated_data):
+        previous = instance.avatar.name
+        instance = super().update(instance, validated_data)
+        if instance.avatar.name != previous:
+            discard_derivatives(instance.avatar.storage, previous)
+        return instance
+
+
+class CreateSubscriptionSerializer(serializers.ModelSerializer):
+    """Сериализатор для подписки на пользователя."""
+
+    author = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+
+    class Meta:
+        model = Subscription
+        fields = ["author"]
+
+    def validate(self, data):
+        """Проверка, чтобы пользователь не подписывался сам на себя и не дублировал подписку."""
+        user = self.context["request"].user
+        author = data["author"]
+        if user == author:
+            raise serializers.ValidationError("Вы не можете подписаться на себя!")
+        if user.subscriptions.filter(author=author).exists():
+            raise serializers.ValidationError("Вы уже подписаны на этого пользователя.")
+        return data
+
+    def create(self, validated_data):
+        """Создание подписки."""
+        subscriber = self.context["request"].user
+        subscription = Subscription.objects.create(
+            author=validated_data["author"], subscriber=subscriber
+        )
+        return subscription
+
+    def to_representation(self, instance):
+        """Отображение профиля подписанного пользователя."""
+        request = self.context.get("request")
+        author = instance.author
+        return UserProfileSerializer(author, context={"request": request}).data
+
+
+class UserRegistrationSerializer(serializers.ModelSerializer):
+    """Регистрация нового пользователя."""
+
+    username = serializers.CharField(
+        max_length=MAX_LENGTH,
+        validators=[
+            RegexValidator(
+                regex=r"^[A-Za-z0-9._-]+$",
+                message="InvalidU$ername",
+            ),
+            UniqueValidator(
+                queryset=User.objects.all(), message="Такой username уже существует."
+            ),
+        ],
+    )
+    email = serializers.EmailField(validators=[])
+    password = serializers.CharField(write_only=True)
+    first_name = serializers.CharField(
+        max_length=MAX_LENGTH,
+        validators=[
+            MaxLengthValidator(MAX_LENGTH),
+        ],
+    )
+    last_name = serializers.CharField(
+        max_length=MAX_LENGTH,
+        validators=[
+            MaxLengthValidator(MAX_LENGTH),
+        ],
+    )
+
+    class Meta:
+        model = User
+        fields = [
+            "username",
+            "email",
+            "password",
+            "first_name",
+            "last_name",
+        ]
+
+    def validate_email(self, value):
+        if find_similar_email(value) is not None:
+            raise serializers.ValidationError(
+                "Пользователь с похожей почтой уже зарегистрирован."
+            )
+        return value
+
+    def validate(self, data):
+        return data
+
+    def create(self, validated_data):
+        user = User.objects.create_user(**validated_data)
+        return user
+
+
+class UserResponseSerializer(serializers.ModelSerializer):
+    """Форма вывода определенных данных о пользователях."""
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+        ]
+
+
+class LoginSerializer(serializers.Serializer):
+    """Обработка данных пользователя при входе в аккаунт."""
+
+    email = serializers.EmailField()
+    password = serializers.CharField()
+
+    def validate(self, data):
+        email = data.get("email")
+        password = data.get("password")
+
+        try:
+            user = User.objects.get(email=User.normalize_email_address(email))
+        except User.DoesNotExist:
+            raise serializers.ValidationError("Пользователь с таким email не найден.")
+
+        if not user.check_password(password):
+            raise serializers.ValidationError("Неправильный пароль.")
+
+        data["user"] = user
+        return data
+
+
+class SetPasswordSerializer(serializers.Serializer):
+    """Смена пароля."""
+
+    current_password = serializers.CharField(required=True)
+    new_password = serializers.CharField(required=True)
+
+    def validate_current_password(self, value):
+        user = self.context["request"].user
+        if not user.check_password(value):
+            raise serializers.ValidationError("Текущий пароль указан неверно.")
+        return value
+
+    def validate_new_password(self, value):
+        return value
+
+
+class UserSubscriptionSerializer(serializers.ModelSerializer):
+    """Серилизатор для вывода данных о пользователе с подпиской."""
+
+    is_subscribed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "avatar",
+            "is_subscribed",
+        ]
+
+    def get_is_subscribed(self, obj):
+        annotated = getattr(obj, "is_subscribed", None)
+        if annotated is not None:
+            return annotated
+        relations = get_user_relations(self.context.get("request"))
+        return relations.is_subscribed(obj.pk)
+
+
+class ShortIngredientsSerializer(serializers.ModelSerializer):
+    """Краткий сериализатор ингредиентов для отображения."""
+
+    class Meta:
+        model = Ingredient
+        fields = ["id", "name", "measurement_unit"]
+        read_only_fields = ["id"]
+
+
+class IngredientInputSerializer(serializers.Serializer):
+    """Создание и изменение ингридиентов администратором."""
+
+    id = serializers.PrimaryKeyRelatedField(
+        queryset=Ingredient.objects.all(),
+        source="ingredient",
+        required=True,
+        help_text="Идентификатор ингредиента",
+    )
+    amount = serializers.IntegerField(
+        min_value=MIN_VALUE,
+        max_value=MAX_VALUE,
+        required=True,
+        help_text="Количество ингредиента",
+    )
+
+
+class RecipeIngredientSerializer(serializers.ModelSerializer):
+    """Сериализатор для ингредиентов в рецепте."""
+
+    id = serializers.ReadOnlyField(source="ingredient.id")
+    name = serializers.ReadOnlyField(source="ingredient.name")
+    measurement_unit = serializers.ReadOnlyField(source="ingredient.measurement_unit")
+    amount = serializers.IntegerField(min_value=MIN_VALUE, max_value=MAX_VALUE)
+
+    class Meta:
+        model = RecipeIngredient
+        fields = ["id", "name", "measurement_unit", "amount"]
+
+
+class RecipeResponseSerializer(
+    ImageVariantsMixin, serializers.ModelSerializer
+):
+    """Представление рецептов согласно схеме."""
+
+    image_variant_fields = ("image",)
+
+    author = UserSerializer(read_only=True)
+    ingredients = RecipeIngredientSerializer(
+        source="ingredients_amounts",
+        many=True,
+        read_only=True,
+    )
+    image = Base64ImageField(required=False)
+    cooking_time = serializers.IntegerField(
+        min_value=MIN_COOKING_TIME, max_value=MAX_COOKING_TIME
+    )
+
+    is_favorited = serializers.SerializerMethodField()
+    is_in_shopping_cart = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Recipe
+        fields = [
+            "id",
+            "author",
+            "name",
+            "image",
+            "text",
+            "ingredients",
+            "cooking_time",
+            "is_favorited",
+            "is_in_shopping_cart",
+            "favorites_count",
+        ]
+
+    def get_is_favorited(self, obj):
+        annotated = getattr(obj, "is_favorited", None)
+        if annotated is not None:
+            return annotated
+        relations = get_user_relations(self.context.get("request"))
+        return relations.is_favorited(obj.pk)
+
+    def get_is_in_shopping_cart(self, obj):
+        annotated = getattr(obj, "is_in_shopping_cart", None)
+        if annotated is not None:
+            return annotated
+        relations = get_user_relations(self.context.get("request"))
+        return relations.is_in_shopping_cart(obj.pk)
+
+    def create(self, validated_data):
+        ingredients_data = validated_data.pop("ingredients", [])
+        recipe = super().create(validated_data)
+        self._create_ingredients(recipe, ingredients_data)
+        return recipe
+
+    def update(self, instance, validated_data):
+        ingredients_data = validated_data.pop("ingredients", None)
+        recipe = super().update(instance, validated_data)
+        if ingredients_data is not None:
+            self._update_ingredients(recipe, ingredients_data)
+        return recipe
+
+
+class RecipeAddSerializer(ImageVariantsMixin, serializers.ModelSerializer):
+    """Добавление рецепта согласно схеме."""
+
+    image_variant_fields = ("image",)
+
+    class Meta:
+        model = Recipe
+        fields = [
+            "id",
+            "name",
+            "image",
+            "cooking_time",
+        ]
+
+
+class RecipeSerializer(
+    UploadSessionMixin, ImageVariantsMixin, serializers.ModelSerializer
+):
+    """Основной сериализатор для рецептов."""
+
+    image_variant_fields = ("image",)
+
+    author = UserSerializer(read_only=True)
+    ingredients = IngredientInputSerializer(many=True, write_only=True, required=False)
+    image = Base64ImageField(required=False)
+    cooking_time = serializers.IntegerField(
+        min_value=MIN_COOKING_TIME, max_value=MAX_COOKING_TIME
+    )
+
+    is_favorited = serializers.SerializerMethodField()
+    is_in_shopping_cart = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Recipe
+        fields = [
+            "id",
+            "author",
+            "name",
+            "image",
+            "text",
+            "ingredients",
+            "cooking_time",
+            "is_favorited",
+            "is_in_shopping_cart",
+        ]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data["ingredients"] = RecipeIngredientSerializer(
+            instance.ingredients_amounts.select_related("ingredient"),
+            many=True,
+        ).data
+        return data
+
+    def get_is_favorited(self, obj):
+        annotated = getattr(obj, "is_favorited", None)
+        if annotated is not None:
+            return annotated
+        relations = get_user_relations(self.context.get("request"))
+        return relations.is_favorited(obj.pk)
+
+    def get_is_in_shopping_cart(self, obj):
+        annotated = getattr(obj, "is_in_shopping_cart", None)
+        if annotated is not None:
+            return annotated
+        relations = get_user_relations(self.context.get("request"))
+        return relations.is_in_shopping_cart(obj.pk)
+
+    def validate(self, data: Dict) -> Dict:
+        """Проверка данных перед созданием/обновлением."""
+        name = data.get("name")
+        if name is None:
+            raise serializers.ValidationError("Название рецепта обязательно.")
+
+        ingredients = data.get("ingredients")
+        if not ingredients:
+            raise serializers.ValidationError(
+                "Список ингредиентов не может быть пустым!"
+            )
+
+        for item in ingredients:
+            if "ingredient" not in item:
+                raise serializers.ValidationError(
+                    f"Элемент {item} не содержит ключ 'ingredient'."
+                )
+
+        ingredient_ids = [
+            (
+                item["ingredient"].id
+                if hasattr(item["ingredient"], "id")
+                else item["ingredient"]
+            )
+            for item in ingredients
+        ]
+
+        existing_ids = set(
+            Ingredient.objects.filter(id__in=ingredient_ids).values_list(
+                "id", flat=True
+            )
+        )
+
+        missing_ids = set(ingredient_ids) - existing_ids
+        if missing_ids:
+            raise serializers.ValidationError(
+                f"Некоторые ингредиенты не найдены: {missing_ids}"
+            )
+
+        if len(ingredient_ids) != len(set(ingredient_ids)):
+            raise serializers.ValidationError("Ингредиенты должны быть уникальными!")
+
+        if "image" not in self.initial_data or not self.initial_data.get("image"):
+            raise ValidationError("Поле 'image' обязательно при создании рецепта.")
+
+        return data
+
+    def _create_ingredients(self, recipe: Recipe, ingredients_data: List[Dict]) -> None:
+        """Создать связи ингредиентов для рецепта одной вставкой."""
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=self._ingredient_id(item),
+                amount=item["amount"],
+            )
+            for item in ingredients_data
+        )
+
+    def _update_ingredients(
+        self, recipe: Recipe, ingredients_data: List[Dict]
+    ) -> bool:
+        """
+        Обновить связи ингредиентов: вставить новые, изменить количество
+        у изменившихся и удалить лишние, не трогая остальные строки.
+        Возвращает True, если состав рецепта изменился.
+        """
+        existing = {
+            row.ingredient_id: row for row in recipe.ingredients_amounts.all()
+        }
+        requested = {
+            self._ingredient_id(item): item["amount"]
+            for item in ingredients_data
+        }
+
+        to_delete = [
+            row.pk
+            for ingredient_id, row in existing.items()
+            if ingredient_id not in requested
+        ]
+        to_update = []
+        to_create = []
+        for ingredient_id, amount in requested.items():
+            row = existing.get(ingredient_id)
+            if row is None:
+                to_create.append(
+                    RecipeIngredient(
+                        recipe=recipe,
+                        ingredient_id=ingredient_id,
+                        amount=amount,
+                    )
+                )
+            elif row.amount != amount:
+                row.amount = amount
+                to_update.append(row)
+
+        if to_delete:
+            RecipeIngredient.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ["amount"])
+        if to_create:
+            RecipeIngredient.objects.bulk_create(to_create)
+        return bool(to_delete or to_update or to_create)
+
+    @staticmethod
+    def _ingredient_id(item: Dict) -> int:
+        ingredient = item["ingredient"]
+        return getattr(ingredient, "id", ingredient)
+
+    @transaction.atomic
+    def create(self, validated_data: Dict) -> Recipe:
+        """Создать рецепт с ингредиентами."""
+        ingredients_data = validated_data.pop("ingredients", [])
+        recipe = Recipe.objects.create(**validated_data)
+        self._create_ingredients(recipe, ingredients_data)
+        return recipe
+
+    @transaction.atomic
+    def update(self, instance: Recipe, validated_data: Dict) -> Recipe:
+        """Обновить рецепт и ингредиенты."""
+        ingredients_data = validated_data.pop("ingredients", None)
+        previous_image = instance.image.name
+
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save()
+        if instance.image.name != previous_image:
+            discard_derivatives(instance.image.storage, previous_image)
+
+        if ingredients_data is not None and self._update_ingredients(
+            instance, ingredients_data
+        ):
+            # Состав пишется после сохранения рецепта, поэтому индекс
+            # ингредиентов и кеш ответов сбрасываются здесь явно.
+            transaction.on_commit(
+                partial(recipe_ingredients_changed, instance.pk)
+            )
+            bump_after_commit(
+                recipe_version_name(instance.pk),
+                author_version_name(instance.author_id),
+                RECIPES,
+            )
+
+        return instance
+
+
+class FavoriteResponseSerializer(
+    ImageVariantsMixin, serializers.ModelSerializer
+):
+    """Представление рецептов в избранном согласно схеме."""
+
+    image_variant_fields = ("image",)
+
+    class Meta:
+        model = Recipe
+        fields = ["id", "name", "image", "cooking_time"]
+
+
+class PantryQuerySerializer(serializers.Serializer):
+    """Параметры подбора рецептов по продуктам: ?ingredients=1,2,3&limit=10."""
+
+    ingredients = serializers.CharField()
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_PAGE_SIZE
+    )
+
+    def validate_ingredients(self, value):
+        try:
+            ids = {int(item) for item in value.split(",") if item.strip()}
+        except ValueError:
+            raise serializers.ValidationError(
+                "Укажите id ингредиентов через запятую."
+            )
+        if not ids:
+            raise serializers.ValidationError("Список ингредиентов пуст.")
+        return ids
+
+
+class PantryRecipeSerializer(FavoriteResponseSerializer):
+    """Рецепт с числом имеющихся и недостающих ингредиентов."""
+
+    matched = serializers.IntegerField(read_only=True)
+    missing = serializers.IntegerField(read_only=True)
+
+    class Meta(FavoriteResponseSerializer.Meta):
+        fields = FavoriteResponseSerializer.Meta.fields + [
+            "matched",
+            "missing",
+        ]
+
+
+class FavoriteCreateSerializer(serializers.ModelSerializer):
+    """Сериализатор для добавления рецепта в избранное."""
+
+    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+
+    class Meta:
+        model = Favorite
+        fields = ["recipe"]
+
+    def validate(self, data):
+        user = self.context["request"].user
+        recipe = data["recipe"]
+        if user.favorites.filter(recipe=recipe).exists():
+            raise serializers.ValidationError("Этот рецепт уже в избранном.")
+        return data
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        favorite = user.favorites.get_or_create(recipe=validated_data["recipe"])
+        return favorite
+
+
+class ShoppingListCreateSerializer(serializers.ModelSerializer):
+    """Сериализатор для добавления рецепта в список покупок."""
+
+    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+
+    class Meta:
+        model = ShoppingList
+        fields = ["recipe"]
+
+    def validate(self, data):
+        user = self.context["request"].user
+        recipe = data["recipe"]
+        if user.shopping_carts.filter(recipe=recipe).exists():
+            raise serializers.ValidationError("Этот рецепт уже в списке покупок.")
+        return data
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        shopping_item = user.shopping_carts.get_or_create(
+            recipe=validated_data["recipe"]
+        )
+        return shopping_item
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Сессия докачиваемой загрузки изображения."""
+
+    size = serializers.IntegerField(min_value=1, max_value=MAX_IMAGE_SIZE)
+    complete = serializers.BooleanField(read_only=True)
+    reference = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "size",
+            "offset",
+            "content_type",
+            "complete",
+            "reference",
+        ]
+        read_only_fields = ["id", "offset", "content_type"]
+
+    def get_reference(self, obj):
+        return f"{UPLOAD_REFERENCE_PREFIX}{obj.id}"
@@ -0,0 +1,170 @@
+import atexit
+import logging
+import secrets
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+
+from .constants import (
+    BASE62_ALPHABET,
+    MAX_LENGTH_SHORT_CODE,
+    SHORT_LINK_CACHE_SIZE,
+    SHORT_LINK_CACHE_TTL,
+    SHORT_LINK_CODE_ATTEMPTS,
+    SHORT_LINK_CODE_LENGTH,
+    SHORT_LINK_FLUSH_INTERVAL,
+    SHORT_LINK_FLUSH_THRESHOLD,
+)
+from .models import ShortLink
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def generate_code(length: int = SHORT_LINK_CODE_LENGTH) -> str:
+    return "".join(secrets.choice(BASE62_ALPHABET) for _ in range(length))
+
+
+def is_valid_code(code: str) -> bool:
+    return 0 < len(code) <= MAX_LENGTH_SHORT_CODE and all(
+        char in BASE62_ALPHABET for char in code
+    )
+
+
+code_cache = LRUCache(
+    getattr(settings, "SHORT_LINK_CACHE_SIZE", SHORT_LINK_CACHE_SIZE),
+    getattr(settings, "SHORT_LINK_CACHE_TTL", SHORT_LINK_CACHE_TTL),
+)
+
+
+class HitCounter:
+    """
+    Счётчики переходов по коротким ссылкам, накопленные в памяти процесса.
+    В базу они сбрасываются одним UPDATE на код после threshold переходов
+    или фоновым потоком раз в interval секунд, даже если новых переходов
+    больше нет, а не при каждом клике.
+    """
+
+    def __init__(self, interval: float, threshold: int):
+        self.interval = interval
+        self.threshold = threshold
+        self._pending = Counter()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, code: str) -> None:
+        with self._lock:
+            self._pending[code] += 1
+            self._total += 1
+            due = self._total >= self.threshold
+            if self._timer is None:
+                self._timer = threading.Thread(
+                    target=self._flush_periodically,
+                    name="short-link-hits",
+                    daemon=True,
+                )
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def _flush_periodically(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                # У потока своё соединение с базой; между сбросами
+                # оно не нужно.
+                connection.close()
+
+    def flush(self) -> int:
+        """
+        Записать накопленные переходы; возвращает число обновлённых кодов.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._total = 0
+        if not pending:
+            return 0
+        try:
+            with transaction.atomic():
+                for code, hits in pending.items():
+                    ShortLink.objects.filter(code=code).update(
+                        hits=F("hits") + hits
+                    )
+        except DatabaseError:
+            logger.exception(
+                "Не удалось сохранить переходы по коротким ссылкам"
+            )
+            with self._lock:
+                self._pending.update(pending)
+                self._total += sum(pending.values())
+            return 0
+        return len(pending)
+
+
+hit_counter = HitCounter(
+    getattr(
+        settings, "SHORT_LINK_FLUSH_INTERVAL", SHORT_LINK_FLUSH_INTERVAL
+    ),
+    getattr(
+        settings, "SHORT_LINK_FLUSH_THRESHOLD", SHORT_LINK_FLUSH_THRESHOLD
+    ),
+)
+atexit.register(hit_counter.flush)
+
+
+def get_short_code(recipe) -> str:
+    """Код короткой ссылки рецепта; создаётся при первом обращении."""
+    code = (
+        ShortLink.objects.filter(recipe=recipe)
+        .values_list("code", flat=True)
+        .first()
+    )
+    if code is not None:
+        return code
+    for _ in range(SHORT_LINK_CODE_ATTEMPTS):
+        code = generate_code()
+        try:
+            with transaction.atomic():
+                ShortLink.objects.create(code=code, recipe=recipe)
+        except IntegrityError:
+            existing = (
+                ShortLink.objects.filter(recipe=recipe)
+                .values_list("code", flat=True)
+                .first()
+            )
+            if existing is not None:
+                return existing
+            continue
+        code_cache.set(code, recipe.pk)
+        return code
+    raise RuntimeError("Не удалось подобрать свободный код короткой ссылки.")
+
+
+def resolve_code(code: str) -> Optional[int]:
+    """
+    id рецепта по коду короткой ссылки или None.
+    Коды не меняются, поэтому найденное соответствие хранится в LRU
+    процесса и повторные переходы обходятся без запросов к базе.
+    """
+    if not is_valid_code(code):
+        return None
+    recipe_id = code_cache.get(code)
+    if recipe_id is None:
+        recipe_id = (
+            ShortLink.objects.filter(code=code)
+            .values_list("recipe_id", flat=True)
+            .first()
+        )
+        if recipe_id is None:
+            return None
+        code_cache.set(code, recipe_id)
+    hit_counter.add(code)
+    return recipe_id
@@ -0,0 +1,303 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from . import feed
+from .authentication import invalidate_user_tokens, token_cache
+from .catalogue import INGREDIENTS
+from .counters import adjust
+from .constants import (
+    AVATAR_THUMBNAIL_SIZE,
+    FEED_FANOUT_LIMIT,
+    RECIPE_THUMBNAIL_SIZE,
+)
+from .derivatives import discard_derivatives, schedule_derivatives
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    ShoppingList,
+    ShortLink,
+    Subscription,
+)
+from .popularity import WEIGHTS, add_score, contribution
+from .postings import recipe_ingredients_changed
+from .relations import relations_version_name
+from .response_cache import (
+    PUBLIC_USER_FIELDS,
+    RECIPES,
+    author_version_name,
+    bump_after_commit,
+    bump_versions,
+    recipe_version_name,
+)
+from .search import repair_search_triggers
+from .shortlinks import code_cache
+from .similarity import sync_email_grams
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_tokens(sender, instance, **kwargs):
+    """Блокировка, удаление или смена пароля сбрасывают кеш токенов."""
+    transaction.on_commit(partial(invalidate_user_tokens, instance.pk))
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_password_change(sender, instance, created, **kwargs):
+    """
+    После смены пароля старые токены больше не действуют. set_password
+    помнит новый пароль в _password до конца save(); удаление токенов
+    сбрасывает и их снимки в кеше через discard_cached_token.
+    """
+    if not created and getattr(instance, "_password", None) is not None:
+        Token.objects.filter(user=instance).delete()
+
+
+@receiver(post_delete, sender=Token)
+def discard_cached_token(sender, instance, **kwargs):
+    """
+    Выход из аккаунта удаляет токен и из кеша: и из этого процесса,
+    и сменой версии пользователя — из остальных.
+    """
+    transaction.on_commit(partial(token_cache.discard, instance.key))
+    transaction.on_commit(partial(invalidate_user_tokens, instance.user_id))
+
+
+@receiver(post_save, sender=User)
+def update_email_grams(sender, instance, created, update_fields, **kwargs):
+    """Держать индекс биграмм почты в актуальном состоянии."""
+    if update_fields is not None and "email" not in update_fields:
+        return
+    sync_email_grams(instance)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_catalogue(sender, **kwargs):
+    """
+    Сбросить индекс ингредиентов во всех процессах после фиксации:
+    иначе параллельный запрос пересобрал бы его из старых данных
+    уже под новой версией.
+    """
+    bump_after_commit(INGREDIENTS)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscriber_relations(sender, instance, **kwargs):
+    bump_after_commit(relations_version_name(instance.subscriber_id))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+def invalidate_user_relations(sender, instance, **kwargs):
+    bump_after_commit(relations_version_name(instance.user_id))
+
+
+@receiver(post_save, sender=Recipe)
+def build_recipe_image_derivatives(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and "image" not in update_fields:
+        return
+    schedule_derivatives(
+        instance.image,
+        RECIPE_THUMBNAIL_SIZE,
+        partial(
+            bump_versions,
+            recipe_version_name(instance.pk),
+            author_version_name(instance.author_id),
+            RECIPES,
+        ),
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_image_derivatives(sender, instance, **kwargs):
+    discard_derivatives(instance.image.storage, instance.image.name)
+
+
+@receiver(post_save, sender=User)
+def build_avatar_derivatives(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and "avatar" not in update_fields:
+        return
+    schedule_derivatives(
+        instance.avatar,
+        AVATAR_THUMBNAIL_SIZE,
+        partial(bump_versions, author_version_name(instance.pk), RECIPES),
+    )
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == "api":
+        repair_search_triggers(connections[using])
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def update_ingredient_postings(
+    sender, instance, signal, created=False, **kwargs
+):
+    """
+    Состав нового рецепта пишется в той же транзакции после сохранения
+    рецепта, поэтому индекс обновляется только после фиксации. Изменение
+    состава существующего рецепта сообщает RecipeSerializer.update.
+    """
+    if signal is post_save and not created:
+        return
+    recipe_id = instance.pk
+    transaction.on_commit(lambda: recipe_ingredients_changed(recipe_id))
+
+
+@receiver(post_save, sender=Subscription)
+def subscribe_feed(sender, instance, created, **kwargs):
+    """
+    Новая подписка: счётчик подписчиков и последние рецепты автора в ленте.
+    """
+    if not created:
+        return
+    subscriber_id, author_id = instance.subscriber_id, instance.author_id
+    adjust(User, author_id, "followers_count", 1)
+    transaction.on_commit(lambda: feed.backfill(subscriber_id, author_id))
+
+
+@receiver(post_delete, sender=Subscription)
+def unsubscribe_feed(sender, instance, **kwargs):
+    """
+    Отписка убирает рецепты автора из ленты. Если автор перестал быть
+    популярным, его рецепты снова раскладываются по лентам подписчиков.
+    """
+    subscriber_id, author_id = instance.subscriber_id, instance.author_id
+    adjust(User, author_id, "followers_count", -1)
+    transaction.on_commit(partial(feed.trim, subscriber_id, author_id))
+    if feed.followers_count(author_id) == FEED_FANOUT_LIMIT - 1:
+        transaction.on_commit(lambda: feed.backfill_followers(author_id))
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(sender, instance, created, **kwargs):
+    if not created:
+        return
+    transaction.on_commit(
+        partial(
+            feed.fan_out_recipe,
+            instance.pk,
+            instance.author_id,
+            instance.pub_date,
+        )
+    )
+
+
+def counter_delta(signal, created=False):
+    """+1 для новой строки, -1 для удалённой, 0 для изменённой."""
+    if signal is post_delete:
+        return -1
+    return 1 if created else 0
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def count_recipes(sender, instance, signal, created=False, **kwargs):
+    """
+    Счётчики меняются в той же транзакции, что и строка, поэтому
+    откат не оставляет расхождений. Каскадное удаление пользователя
+    тоже отправляет post_delete по каждой связанной строке.
+    """
+    delta = counter_delta(signal, created)
+    if delta:
+        adjust(User, instance.author_id, "recipes_count", delta)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def count_favorites(sender, instance, signal, created=False, **kwargs):
+    delta = counter_delta(signal, created)
+    if delta:
+        adjust(Recipe, instance.recipe_id, "favorites_count", delta)
+
+
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+def count_cart(sender, instance, signal, created=False, **kwargs):
+    delta = counter_delta(signal, created)
+    if delta:
+        adjust(Recipe, instance.recipe_id, "cart_count", delta)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+def score_popularity(sender, instance, signal, created=False, **kwargs):
+    """
+    Добавление увеличивает оценку на вес связи, удаление уменьшает
+    на то, что от этого веса осталось после затухания.
+    """
+    delta = counter_delta(signal, created)
+    if not delta:
+        return
+    weight = WEIGHTS[sender.__name__]
+    if delta < 0:
+        weight = contribution(weight, instance.date_added)
+    add_score(Recipe, instance.recipe_id, delta * weight)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_responses(sender, instance, **kwargs):
+    bump_after_commit(
+        recipe_version_name(instance.pk),
+        author_version_name(instance.author_id),
+        RECIPES,
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_responses(
+    sender, instance, update_fields=None, **kwargs
+):
+    """Автор виден в своём профиле и во всех своих рецептах."""
+    if update_fields is not None and not (
+        PUBLIC_USER_FIELDS & set(update_fields)
+    ):
+        return
+    bump_after_commit(author_version_name(instance.pk), RECIPES)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_followers_count(sender, instance, **kwargs):
+    bump_after_commit(author_version_name(instance.author_id))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def invalidate_favorites_count(sender, instance, **kwargs):
+    bump_after_commit(recipe_version_name(instance.recipe_id), RECIPES)
+
+
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+def invalidate_popular_order(sender, instance, **kwargs):
+    """Покупки меняют только порядок ?ordering=popular."""
+    bump_after_commit(RECIPES)
+
+
+@receiver(post_delete, sender=ShortLink)
+def forget_short_code(sender, instance, **kwargs):
+    """
+    Ссылка удаляется вместе с рецептом: код больше не должен вести
+    на него из LRU этого процесса. Остальные процессы забудут код
+    по истечении SHORT_LINK_CACHE_TTL.
+    """
+    transaction.on_commit(partial(code_cache.discard, instance.code))
@@ -0,0 +1,157 @@
+import difflib
+import math
+from collections import Counter
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.db.models.functions import Length, Lower
+
+from .constants import (
+    EMAIL_GRAM_SIZE,
+    EMAIL_SIMILARITY_CHUNK_SIZE,
+    EMAIL_SIMILARITY_RATIO,
+)
+from .models import EmailGram
+
+User = get_user_model()
+
+RATIO = Fraction(EMAIL_SIMILARITY_RATIO).limit_denominator(1000)
+
+
+def normalize_email(email: str) -> str:
+    """Привести почту к виду, в котором сравниваются адреса."""
+    return (email or "").lower()
+
+
+def email_grams(email: str) -> List[str]:
+    """
+    Биграммы почты с номером вхождения («ab1», «ab2», ...),
+    чтобы пересечение множеств совпадало с пересечением мультимножеств.
+    """
+    seen = Counter()
+    grams = []
+    for index in range(len(email) - EMAIL_GRAM_SIZE + 1):
+        gram = email[index:index + EMAIL_GRAM_SIZE]
+        seen[gram] += 1
+        grams.append(f"{gram}{seen[gram]}")
+    return grams
+
+
+def _min_matches(total: int) -> int:
+    """Минимум совпавших символов, при котором ratio() >= RATIO."""
+    return math.ceil(RATIO * total / 2)
+
+
+def _length_window(length: int) -> range:
+    """
+    Длины адресов, для которых ratio() вообще может достичь RATIO:
+    совпасть может не больше символов, чем в более коротком адресе.
+    """
+    low = math.ceil(RATIO * length / (2 - RATIO))
+    high = math.floor((2 - RATIO) * length / RATIO)
+    return range(max(low, 1), high + 1)
+
+
+def _min_shared_grams(length: int, other_length: int) -> int:
+    """
+    Нижняя граница числа общих биграмм (q-gram lemma).
+
+    Совпавшие блоки SequenceMatcher образуют общую подпоследовательность,
+    поэтому расстояние Левенштейна не превышает числа вставок и удалений
+    T - 2M. Каждая правка разрушает не больше EMAIL_GRAM_SIZE биграмм.
+    """
+    total = length + other_length
+    max_distance = total - 2 * _min_matches(total)
+    return (
+        max(length, other_length)
+        - EMAIL_GRAM_SIZE
+        + 1
+        - EMAIL_GRAM_SIZE * max_distance
+    )
+
+
+def _is_similar(email: str, other: str) -> bool:
+    matcher = difflib.SequenceMatcher(None, email, other)
+    return (
+        matcher.real_quick_ratio() >= EMAIL_SIMILARITY_RATIO
+        and matcher.quick_ratio() >= EMAIL_SIMILARITY_RATIO
+        and matcher.ratio() >= EMAIL_SIMILARITY_RATIO
+    )
+
+
+def _candidate_ids(email: str, window: range) -> Optional[Dict[int, int]]:
+    """
+    Пользователи, у которых общих биграмм достаточно для похожести,
+    с числом общих биграмм. None — индекс не может отсечь кандидатов.
+    """
+    threshold = min(_min_shared_grams(len(email), other) for other in window)
+    if threshold <= 0:
+        return None
+    rows = (
+        EmailGram.objects.filter(
+            gram__in=email_grams(email),
+            length__gte=window.start,
+            length__lt=window.stop,
+        )
+        .values("user_id")
+        .annotate(shared=Count("id"))
+        .filter(shared__gte=threshold)
+        .values_list("user_id", "shared")
+    )
+    return dict(rows)
+
+
+def _chunks(values: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(values), EMAIL_SIMILARITY_CHUNK_SIZE):
+        yield values[start:start + EMAIL_SIMILARITY_CHUNK_SIZE]
+
+
+def find_similar_email(email: str, exclude_user_id=None) -> Optional[str]:
+    """
+    Найти зарегистрированную почту, похожую на email не меньше чем на
+    EMAIL_SIMILARITY_RATIO по difflib.SequenceMatcher.ratio().
+
+    Индекс биграмм отбирает только тех пользователей, для которых
+    похожесть возможна, а точная проверка выполняется лишь для них.
+    """
+    email = normalize_email(email)
+    window = _length_window(len(email))
+    candidates = _candidate_ids(email, window)
+
+    if candidates is None:
+        users = (
+            User.objects.annotate(email_length=Length("email"))
+            .filter(
+                email_length__gte=window.start, email_length__lt=window.stop
+            )
+            .values_list("pk", Lower("email"))
+        )
+        if exclude_user_id is not None:
+            users = users.exclude(pk=exclude_user_id)
+        for _, other in users.iterator():
+            if _is_similar(email, other):
+                return other
+        return None
+
+    candidates.pop(exclude_user_id, None)
+    for chunk in _chunks(list(candidates)):
+        for pk, other in User.objects.filter(pk__in=chunk).values_list(
+            "pk", Lower("email")
+        ):
+            if candidates[pk] < _min_shared_grams(len(email), len(other)):
+                continue
+            if _is_similar(email, other):
+                return other
+    return None
+
+
+def sync_email_grams(user) -> None:
+    """Перестроить биграммы почты пользователя."""
+    email = normalize_email(user.email)
+    EmailGram.objects.filter(user=user).delete()
+    EmailGram.objects.bulk_create(
+        EmailGram(user=user, gram=gram, length=len(email))
+        for gram in email_grams(email)
+    )
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import TokenCache, invalidate_user_tokens, token_cache
+from api.models import User
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+class CachedTokenTests(TestCase):
+    """
+    Закешированный токен перестаёт действовать сразу после выхода,
+    блокировки пользователя или смены пароля.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="reader", email="reader@example.org", password="old-pass"
+        )
+
+    def setUp(self):
+        cache.clear()
+        token_cache._data.clear()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        # Первый запрос кладёт токен в кеш, второй обслуживается из него.
+        self.assert_status(200)
+        with self.assertNumQueries(0):
+            token_cache.get(self.token.key)
+
+    def assert_status(self, expected):
+        response = self.client.get("/api/users/me/")
+        self.assertEqual(response.status_code, expected)
+
+    def test_logout(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/auth/token/logout/")
+        self.assertEqual(response.status_code, 204)
+        self.assert_status(401)
+
+    def test_deactivation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            user.is_active = False
+            user.save()
+        self.assert_status(401)
+
+    def test_password_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            user.set_password("new-pass")
+            user.save()
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+        self.assert_status(401)
+
+    def test_password_change_endpoint(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/users/set_password/",
+                {"current_password": "old-pass", "new_password": "new-pass"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 204)
+        self.assert_status(401)
+
+    def test_version_bump_reaches_other_processes(self):
+        # Другой процесс: свой LRU, общий только кеш версий.
+        other = TokenCache(max_size=10, ttl=60)
+        other.set(self.token.key, self.token)
+        self.assertIsNotNone(other.get(self.token.key))
+        invalidate_user_tokens(self.user.pk)
+        self.assertIsNone(other.get(self.token.key))
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_shared_snapshot_is_checked_against_version(self):
+        writer = TokenCache(max_size=10, ttl=60, alias="shared")
+        reader = TokenCache(max_size=10, ttl=60, alias="shared")
+        writer.set(self.token.key, self.token)
+        self.assertEqual(reader.get(self.token.key), self.token)
+        invalidate_user_tokens(self.user.pk)
+        reader._data.clear()
+        self.assertIsNone(reader.get(self.token.key))
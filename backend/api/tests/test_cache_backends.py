@@ -0,0 +1,158 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from api.cache_backends import LOCAL, SHARED, TieredCache
+from api.lru import LRUCache
+
+from .utils import isolated_caches
+
+
+class Clock:
+    """Подменяет time.monotonic в api.lru, чтобы сроки шли по команде."""
+
+    def __init__(self, test):
+        self.now = 1000.0
+        patcher = mock.patch("api.lru.time.monotonic", lambda: self.now)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class LRUCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = Clock(self)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        cache = LRUCache(max_size=10, ttl=10)
+        cache.set("default", 1)
+        cache.set("short", 2, ttl=1)
+        cache.set("forever", 3, ttl=None)
+        self.clock.advance(5)
+        self.assertEqual(cache.get("default"), 1)
+        self.assertEqual(cache.get("short", "нет"), "нет")
+        self.clock.advance(5)
+        self.assertIsNone(cache.get("default"))
+        self.assertEqual(cache.get("forever"), 3)
+        self.assertEqual(len(cache), 1)
+
+    def test_discard_and_clear(self):
+        cache = LRUCache(max_size=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.discard("a")
+        cache.discard("missing")
+        self.assertIsNone(cache.get("a"))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+@isolated_caches
+class TieredCacheTests(SimpleTestCase):
+    """
+    Два экземпляра TieredCache с общим locmem-кешем ведут себя
+    как два процесса с общим Redis.
+    """
+
+    def setUp(self):
+        self.clock = Clock(self)
+        caches["shared"].clear()
+        self.cache = self.process()
+        self.other = self.process()
+
+    def process(self, **options):
+        return TieredCache(
+            "",
+            {
+                "OPTIONS": {
+                    "SHARED": "shared",
+                    "LOCAL_TIMEOUT": 30,
+                    "SHORT_TIMEOUT": 1,
+                    "MAX_ENTRIES": 3,
+                    **options,
+                }
+            },
+        )
+
+    def reads(self, cache, tier):
+        stats = cache.stats()[tier]
+        return stats["hits"], stats["misses"]
+
+    def test_reads_from_memory_first(self):
+        self.cache.set("key", {"a": 1})
+        self.assertEqual(self.cache.get("key"), {"a": 1})
+        self.assertEqual(self.reads(self.cache, LOCAL), (1, 0))
+        self.assertEqual(self.reads(self.cache, SHARED), (0, 0))
+
+    def test_other_process_fills_memory_from_shared(self):
+        self.cache.set("key", "value")
+        self.assertEqual(self.other.get("key"), "value")
+        self.assertEqual(self.other.get("key"), "value")
+        self.assertEqual(self.reads(self.other, SHARED), (1, 0))
+        self.assertEqual(self.reads(self.other, LOCAL), (1, 1))
+        self.assertIsNone(self.other.get("missing"))
+
+    def test_overwrite_is_seen_after_local_timeout(self):
+        self.cache.set("key", "old")
+        self.assertEqual(self.other.get("key"), "old")
+        self.cache.set("key", "new")
+        self.assertEqual(self.other.get("key"), "old")
+        self.clock.advance(31)
+        self.assertEqual(self.other.get("key"), "new")
+
+    def test_version_keys_are_kept_briefly(self):
+        self.cache.set("version:recipes", 1)
+        self.assertEqual(self.other.get("version:recipes"), 1)
+        self.cache.incr("version:recipes")
+        self.assertEqual(self.cache.get("version:recipes"), 2)
+        self.assertEqual(self.other.get("version:recipes"), 1)
+        self.clock.advance(1)
+        self.assertEqual(self.other.get("version:recipes"), 2)
+
+    def test_bypass_keys_are_read_from_shared(self):
+        self.cache.set("auth:token", "user")
+        self.assertEqual(self.cache.get("auth:token"), "user")
+        self.assertEqual(self.cache.stats()[LOCAL]["size"], 0)
+        self.assertEqual(self.reads(self.cache, SHARED), (1, 0))
+        self.other.delete("auth:token")
+        self.assertIsNone(self.cache.get("auth:token"))
+
+    def test_values_are_copies(self):
+        self.cache.set("key", [1])
+        self.cache.get("key").append(2)
+        self.assertEqual(self.cache.get("key"), [1])
+
+    def test_add_existing_key_drops_local_copy(self):
+        self.cache.set("key", "old")
+        self.assertEqual(self.other.get("key"), "old")
+        self.cache.delete("key")
+        self.cache.set("key", "new")
+        self.assertFalse(self.other.add("key", "mine"))
+        self.assertEqual(self.other.get("key"), "new")
+        self.assertTrue(self.other.add("fresh", 1))
+        self.assertEqual(self.cache.get("fresh"), 1)
+
+    def test_zero_timeout_is_not_kept_locally(self):
+        self.cache.set("key", "value", timeout=0)
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(self.cache.stats()[LOCAL]["size"], 0)
+
+    def test_local_size_is_bounded(self):
+        for index in range(5):
+            self.cache.set(f"key{index}", index)
+        self.assertEqual(self.cache.stats()[LOCAL]["size"], 3)
+        self.assertEqual(self.cache.get("key0"), 0)
+        self.assertEqual(self.reads(self.cache, SHARED), (1, 0))
@@ -0,0 +1,64 @@
+import gzip
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Ingredient
+from api.views import accepts_gzip
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+class IngredientCatalogueTests(TestCase):
+    """
+    Полный список ингредиентов отдаётся в gzip только клиенту,
+    который его принимает.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ("соль", "сахар", "свёкла"):
+            Ingredient.objects.create(name=name, measurement_unit="г")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get_catalogue(self, accept_encoding):
+        response = self.client.get(
+            "/api/ingredients/", HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_gzip_is_sent_when_accepted(self):
+        for header in ("gzip", "deflate, gzip;q=0.5", "*"):
+            with self.subTest(accept_encoding=header):
+                response = self.get_catalogue(header)
+                self.assertEqual(response["Content-Encoding"], "gzip")
+                rows = json.loads(gzip.decompress(response.content))
+                self.assertEqual(len(rows), 3)
+
+    def test_gzip_is_not_sent_when_refused(self):
+        for header in ("", "identity", "gzip;q=0", "identity, gzip;q=0"):
+            with self.subTest(accept_encoding=header):
+                response = self.get_catalogue(header)
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(len(json.loads(response.content)), 3)
+
+    def test_accepts_gzip(self):
+        cases = {
+            "gzip": True,
+            "GZIP;Q=1": True,
+            "br, gzip;q=0.001": True,
+            "*;q=0.1": True,
+            "gzip;q=0": False,
+            "gzip;q=0.0, *": False,
+            "identity, gzip;q=0": False,
+            "x-gzip": False,
+            "*;q=0": False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(accept_encoding=header):
+                self.assertIs(accepts_gzip(header), expected)
@@ -0,0 +1,114 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.counters import adjust
+from api.models import Favorite, Recipe, ShoppingList, Subscription, User
+
+
+class CounterTests(TestCase):
+    """
+    Денормализованные счётчики меняются вместе со связанными строками,
+    а recount_counters исправляет накопившиеся расхождения.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.reader, cls.other = (
+            User.objects.create_user(
+                username=username,
+                email=f"{username}@example.org",
+                password="x",
+            )
+            for username in ("author", "reader", "other")
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.author,
+                name=f"рецепт {index}",
+                text="текст",
+                cooking_time=5,
+            )
+            for index in range(3)
+        ]
+        cls.recipe = cls.recipes[0]
+
+    def counts(self, obj, *fields):
+        obj.refresh_from_db(fields=fields)
+        return tuple(getattr(obj, field) for field in fields)
+
+    def test_related_rows_adjust_counters(self):
+        self.assertEqual(self.counts(self.author, "recipes_count"), (3,))
+        for user in (self.reader, self.other):
+            Favorite.objects.create(user=user, recipe=self.recipe)
+            Subscription.objects.create(subscriber=user, author=self.author)
+        ShoppingList.objects.create(user=self.reader, recipe=self.recipe)
+        self.assertEqual(
+            self.counts(self.recipe, "favorites_count", "cart_count"), (2, 1)
+        )
+        self.assertEqual(self.counts(self.author, "followers_count"), (2,))
+
+        Favorite.objects.filter(user=self.reader).delete()
+        Subscription.objects.get(subscriber=self.other).delete()
+        self.recipes[-1].delete()
+        self.assertEqual(
+            self.counts(self.recipe, "favorites_count", "cart_count"), (1, 1)
+        )
+        self.assertEqual(
+            self.counts(self.author, "followers_count", "recipes_count"),
+            (1, 2),
+        )
+
+        # Каскадное удаление тоже уменьшает счётчики.
+        self.other.delete()
+        self.assertEqual(
+            self.counts(self.recipe, "favorites_count", "cart_count"), (0, 1)
+        )
+
+    def test_stale_instance_does_not_overwrite_counters(self):
+        stale = Recipe.objects.get(pk=self.recipe.pk)
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        stale.name = "новое название"
+        stale.save()
+        self.assertEqual(self.counts(self.recipe, "favorites_count"), (1,))
+
+    def test_adjust_does_not_go_below_zero(self):
+        adjust(Recipe, self.recipe.pk, "cart_count", -1)
+        self.assertEqual(self.counts(self.recipe, "cart_count"), (0,))
+
+    def test_recount_fixes_drift(self):
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        Subscription.objects.create(subscriber=self.reader, author=self.author)
+        Recipe.objects.filter(pk=self.recipe.pk).update(
+            favorites_count=7, cart_count=3
+        )
+        Recipe.objects.filter(pk=self.recipes[1].pk).update(cart_count=1)
+        User.objects.filter(pk=self.author.pk).update(
+            recipes_count=0, followers_count=5
+        )
+        User.objects.filter(pk=self.reader.pk).update(recipes_count=2)
+
+        output = StringIO()
+        call_command("recount_counters", "--chunk-size", "2", stdout=output)
+        self.assertIn("User: исправлено строк — 2", output.getvalue())
+        self.assertIn("Recipe: исправлено строк — 2", output.getvalue())
+        self.assertEqual(
+            self.counts(self.author, "recipes_count", "followers_count"),
+            (3, 1),
+        )
+        self.assertEqual(self.counts(self.reader, "recipes_count"), (0,))
+        self.assertEqual(
+            self.counts(self.recipe, "favorites_count", "cart_count"), (1, 0)
+        )
+        self.assertEqual(self.counts(self.recipes[1], "cart_count"), (0,))
+
+        output = StringIO()
+        call_command("recount_counters", stdout=output)
+        self.assertIn("User: исправлено строк — 0", output.getvalue())
+        self.assertIn("Recipe: исправлено строк — 0", output.getvalue())
+
+    def test_recount_rejects_bad_chunk_size(self):
+        with self.assertRaises(CommandError):
+            call_command("recount_counters", "--chunk-size", "0")
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import derivatives
+from api.constants import RECIPE_THUMBNAIL_SIZE
+from api.models import Ingredient, Recipe, RecipeIngredient, User
+
+from .utils import (
+    InlineExecutor,
+    TemporaryMediaMixin,
+    isolated_caches,
+    png_bytes,
+    png_data_uri,
+)
+
+
+@isolated_caches
+class DerivativeCleanupTests(TemporaryMediaMixin, TestCase):
+    """
+    Производные изображения удаляются вместе с рецептом
+    и при замене его картинки.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username="author", email="author@example.org", password="x"
+        )
+        cls.salt = Ingredient.objects.create(name="соль", measurement_unit="г")
+
+    def setUp(self):
+        cache.clear()
+        inline = mock.patch.object(derivatives, "get_executor", InlineExecutor)
+        inline.start()
+        self.addCleanup(inline.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = Recipe.objects.create(
+                author=self.author,
+                name="борщ",
+                text="текст",
+                cooking_time=5,
+                image=ContentFile(png_bytes((40, 40)), name="borscht.png"),
+            )
+            RecipeIngredient.objects.create(
+                recipe=self.recipe, ingredient=self.salt, amount=5
+            )
+        self.storage = self.recipe.image.storage
+
+    def patch(self, **changes):
+        payload = {
+            "name": "борщ",
+            "text": "текст",
+            "cooking_time": 5,
+            "ingredients": [{"id": self.salt.pk, "amount": 5}],
+            **changes,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/recipes/{self.recipe.pk}/", payload, format="json"
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def variants(self, name):
+        return [
+            derivatives.derivative_name(name, variant)
+            for variant in derivatives.VARIANTS
+        ]
+
+    def assert_variants_exist(self, name, exist):
+        for target in self.variants(name):
+            with self.subTest(target=target):
+                self.assertEqual(self.storage.exists(target), exist)
+
+    def test_built_on_save(self):
+        self.assert_variants_exist(self.recipe.image.name, True)
+        self.assertEqual(
+            derivatives.Image.open(
+                self.storage.path(
+                    derivatives.derivative_name(
+                        self.recipe.image.name, derivatives.THUMB
+                    )
+                )
+            ).size,
+            RECIPE_THUMBNAIL_SIZE,
+        )
+
+    def test_recipe_delete_removes_derivatives(self):
+        name = self.recipe.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        self.assert_variants_exist(name, False)
+
+    def test_image_replacement_removes_old_derivatives(self):
+        previous = self.recipe.image.name
+        self.patch(image=png_data_uri((40, 40), "blue"))
+        self.recipe.refresh_from_db()
+        self.assertNotEqual(self.recipe.image.name, previous)
+        self.assert_variants_exist(previous, False)
+        self.assert_variants_exist(self.recipe.image.name, True)
+
+    def test_avatar_replacement_removes_old_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                "/api/users/me/avatar/",
+                {"avatar": png_data_uri((40, 40))},
+                format="json",
+            )
+        self.author.refresh_from_db()
+        previous = self.author.avatar.name
+        self.assert_variants_exist(previous, True)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                "/api/users/me/avatar/",
+                {"avatar": png_data_uri((40, 40), "blue")},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assert_variants_exist(previous, False)
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.test import TestCase
+
+from api.models import FeedEntry, Recipe, Subscription, User
+
+
+class FeedTrimTests(TestCase):
+    """Записи ленты убираются только после фиксации отписки."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.author = (
+            User.objects.create_user(
+                username=username,
+                email=f"{username}@example.org",
+                password="x",
+            )
+            for username in ("reader", "author")
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name="борщ", text="текст", cooking_time=5
+        )
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subscription = Subscription.objects.create(
+                subscriber=self.reader, author=self.author
+            )
+        self.assertEqual(self.entries(), [self.recipe.pk])
+
+    def entries(self):
+        return list(
+            FeedEntry.objects.filter(user=self.reader).values_list(
+                "recipe_id", flat=True
+            )
+        )
+
+    def test_trimmed_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.subscription.delete()
+            self.assertEqual(self.entries(), [self.recipe.pk])
+        self.assertTrue(callbacks)
+        self.assertEqual(self.entries(), [])
+
+    def test_rolled_back_unsubscribe_keeps_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.subscription.delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertTrue(Subscription.objects.exists())
+        self.assertEqual(self.entries(), [self.recipe.pk])
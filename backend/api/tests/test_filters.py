@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.core.exceptions import FieldError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Favorite, Recipe, ShoppingList, User
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+class RecipeFilterTests(TestCase):
+    """
+    Фильтры is_favorited и is_in_shopping_cart работают через
+    FilterSet и сочетаются с остальными параметрами списка.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.author, other = (
+            User.objects.create_user(
+                username=username,
+                email=f"{username}@example.org",
+                password="x",
+            )
+            for username in ("reader", "author", "other")
+        )
+        cls.liked, cls.cooked, cls.both, cls.foreign = (
+            Recipe.objects.create(
+                author=author, name=name, text="текст", cooking_time=5
+            )
+            for author, name in (
+                (cls.author, "в избранном"),
+                (cls.author, "в корзине"),
+                (cls.author, "везде"),
+                (other, "чужой"),
+            )
+        )
+        for recipe in (cls.liked, cls.both, cls.foreign):
+            Favorite.objects.create(user=cls.reader, recipe=recipe)
+        for recipe in (cls.cooked, cls.both):
+            ShoppingList.objects.create(user=cls.reader, recipe=recipe)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def ids(self, query, client=None):
+        response = (client or self.client).get(f"/api/recipes/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return {item["id"] for item in response.data["results"]}
+
+    def test_related_names(self):
+        # Прежние фильтры обращались к favorites и shoppinglist,
+        # которых у рецепта нет: запрос с ними падал с FieldError.
+        for lookup in ("favorites__user", "shoppinglist__user"):
+            with self.subTest(lookup=lookup):
+                with self.assertRaises(FieldError):
+                    Recipe.objects.filter(**{lookup: self.reader}).exists()
+
+    def test_is_favorited(self):
+        self.assertEqual(
+            self.ids("is_favorited=1"),
+            {self.liked.pk, self.both.pk, self.foreign.pk},
+        )
+        self.assertEqual(len(self.ids("is_favorited=0")), 4)
+
+    def test_is_in_shopping_cart(self):
+        self.assertEqual(
+            self.ids("is_in_shopping_cart=1"), {self.cooked.pk, self.both.pk}
+        )
+
+    def test_filters_combine(self):
+        # Прежний RecipeViewSet.list подменял queryset целиком
+        # и терял остальные параметры.
+        self.assertEqual(
+            self.ids("is_favorited=1&is_in_shopping_cart=1"), {self.both.pk}
+        )
+        self.assertEqual(
+            self.ids(f"is_favorited=1&author={self.author.pk}"),
+            {self.liked.pk, self.both.pk},
+        )
+
+    def test_anonymous_gets_nothing(self):
+        anonymous = APIClient()
+        self.assertEqual(self.ids("is_favorited=1", anonymous), set())
+        self.assertEqual(self.ids("is_in_shopping_cart=1", anonymous), set())
@@ -0,0 +1,109 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.management.commands import load_ingredients
+from api.models import Ingredient
+
+ROWS = [
+    ("абрикосы", "г"),
+    ("молоко", "мл"),
+    ("соль", "г"),
+    ("молоко", "мл"),
+    ("соль", "щепотка"),
+]
+
+
+class LoadIngredientsTests(TestCase):
+    """
+    Загрузка ингредиентов из CSV и JSON: повторы пропускаются,
+    повторный запуск ничего не добавляет.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix="foodgram-ingredients-")
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.directory = Path(directory)
+
+    def write(self, name, content):
+        path = self.directory / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def csv_file(self):
+        return self.write(
+            "ingredients.csv",
+            "".join(f"{name},{unit}\n" for name, unit in ROWS) + "\n,\n",
+        )
+
+    def json_file(self, items=None):
+        if items is None:
+            items = [
+                {"name": f" {name} ", "measurement_unit": unit}
+                for name, unit in ROWS
+            ]
+        return self.write(
+            "ingredients.json", json.dumps(items, ensure_ascii=False)
+        )
+
+    def load(self, *args):
+        call_command("load_ingredients", *args, stdout=StringIO())
+        return set(Ingredient.objects.values_list("name", "measurement_unit"))
+
+    def test_csv(self):
+        self.assertEqual(self.load(self.csv_file()), set(ROWS))
+
+    def test_json(self):
+        # Маленькие куски проверяют разбор объектов на их границах.
+        with mock.patch.object(load_ingredients, "JSON_READ_CHUNK_SIZE", 7):
+            self.assertEqual(self.load(self.json_file()), set(ROWS))
+
+    def test_rerun_is_idempotent(self):
+        path = self.csv_file()
+        self.load(path)
+        # Два подсчёта и одна вставка в точке сохранения.
+        with self.assertNumQueries(5):
+            call_command("load_ingredients", path, stdout=StringIO())
+        self.assertEqual(self.load(path), set(ROWS))
+        self.assertEqual(Ingredient.objects.count(), 4)
+
+    def test_small_batches(self):
+        path = self.json_file()
+        # Пять строк пачками по две: три вставки в одной точке сохранения.
+        with self.assertNumQueries(7):
+            call_command(
+                "load_ingredients",
+                path,
+                "--batch-size",
+                "2",
+                stdout=StringIO(),
+            )
+        self.assertEqual(self.load(path, "--batch-size", "1"), set(ROWS))
+
+    def test_malformed_json_row(self):
+        for item in (
+            {"name": "соль"},
+            {"title": "соль", "measurement_unit": "г"},
+            {"name": None, "measurement_unit": "г"},
+            ["соль", "г"],
+        ):
+            with self.subTest(item=item):
+                path = self.json_file(
+                    [{"name": "сахар", "measurement_unit": "г"}, item]
+                )
+                with self.assertRaisesMessage(CommandError, "№2"):
+                    self.load(path)
+                self.assertFalse(Ingredient.objects.exists())
+
+    def test_bad_arguments(self):
+        with self.assertRaises(CommandError):
+            self.load(self.csv_file(), "--batch-size", "0")
+        with self.assertRaises(CommandError):
+            self.load(str(self.directory / "missing.csv"))
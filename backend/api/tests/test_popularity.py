@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Favorite, Recipe, User
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+class DecayPopularityTests(TestCase):
+    """
+    Затухание оценок меняет порядок ?ordering=popular,
+    и закешированная страница списка сбрасывается.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="reader", email="reader@example.org", password="x"
+        )
+        cls.popular, cls.newest = (
+            Recipe.objects.create(
+                author=cls.user, name=name, text="текст", cooking_time=5
+            )
+            for name in ("популярный", "новый")
+        )
+        Favorite.objects.create(user=cls.user, recipe=cls.popular)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def popular_order(self):
+        response = self.client.get("/api/recipes/?ordering=popular")
+        self.assertEqual(response.status_code, 200)
+        return [item["id"] for item in response.data["results"]]
+
+    def test_decay_resets_cached_order(self):
+        self.assertEqual(
+            self.popular_order(), [self.popular.pk, self.newest.pk]
+        )
+        call_command("decay_popularity", "--hours", "10000", stdout=StringIO())
+        self.popular.refresh_from_db()
+        self.assertEqual(self.popular.popularity, 0)
+        self.assertEqual(
+            self.popular_order(), [self.newest.pk, self.popular.pk]
+        )
+
+
+@isolated_caches
+class PopularCursorPaginationTests(TestCase):
+    """Курсорные страницы ?ordering=popular идут в порядке популярности."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username="author", email="author@example.org", password="x"
+        )
+        recipes = [
+            Recipe.objects.create(
+                author=author, name=f"рецепт {index}", text="т", cooking_time=5
+            )
+            for index in range(5)
+        ]
+        for popularity, recipe in zip((3.5, 0, 7.25, 3.5, 1), recipes):
+            Recipe.objects.filter(pk=recipe.pk).update(popularity=popularity)
+        cls.expected = list(
+            Recipe.objects.order_by("-popularity", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_pages_follow_popularity(self):
+        url = "/api/recipes/?ordering=popular&pagination=cursor&limit=2"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        # Порядок по дате публикации дал бы id по убыванию.
+        self.assertNotEqual(self.expected, sorted(self.expected, reverse=True))
+        self.assertEqual(seen, self.expected)
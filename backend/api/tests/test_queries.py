@@ -0,0 +1,122 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingList,
+    Subscription,
+    User,
+)
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+class QueryCountTests(TestCase):
+    """
+    Число запросов на списках и карточке рецепта не зависит от количества
+    рецептов, авторов и ингредиентов на странице.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                username=f"user{index}",
+                email=f"user{index}@example.org",
+                password="password",
+            )
+            for index in range(4)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"ингредиент {index}", measurement_unit="г"
+            )
+            for index in range(5)
+        ]
+        cls.recipes = []
+        for index in range(12):
+            recipe = Recipe.objects.create(
+                author=cls.users[index % len(cls.users)],
+                name=f"рецепт {index}",
+                text="описание",
+                cooking_time=10,
+            )
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+                for ingredient in ingredients
+            )
+            cls.recipes.append(recipe)
+        cls.user = cls.users[0]
+        for recipe in cls.recipes[:4]:
+            Favorite.objects.create(user=cls.user, recipe=recipe)
+            ShoppingList.objects.create(user=cls.user, recipe=recipe)
+        for author in cls.users[1:]:
+            Subscription.objects.create(subscriber=cls.user, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.anonymous = APIClient()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_queries(self, client, url, expected):
+        with self.assertNumQueries(expected):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_recipe_list_anonymous(self):
+        # Количество, страница рецептов, авторы и ингредиенты.
+        response = self.assert_queries(
+            self.anonymous, "/api/recipes/?limit=10", 4
+        )
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_recipe_list_authenticated(self):
+        # Флаги избранного и корзины приходят аннотациями той же страницы.
+        response = self.assert_queries(
+            self.client, "/api/recipes/?limit=10", 4
+        )
+        flags = {
+            item["id"]: (item["is_favorited"], item["is_in_shopping_cart"])
+            for item in response.data["results"]
+        }
+        favorited = {recipe.pk for recipe in self.recipes[:4]}
+        for recipe_id, (is_favorited, is_in_shopping_cart) in flags.items():
+            self.assertEqual(is_favorited, recipe_id in favorited)
+            self.assertEqual(is_in_shopping_cart, recipe_id in favorited)
+
+    def test_recipe_list_filtered(self):
+        self.assert_queries(self.client, "/api/recipes/?is_favorited=1", 4)
+        self.assert_queries(
+            self.client, "/api/recipes/?is_in_shopping_cart=1", 4
+        )
+
+    def test_recipe_detail(self):
+        # Автор рецепта для ключа кеша, рецепт, автор и ингредиенты.
+        response = self.assert_queries(
+            self.client, f"/api/recipes/{self.recipes[0].pk}/", 4
+        )
+        self.assertEqual(len(response.data["ingredients"]), 5)
+
+    def test_subscriptions(self):
+        # Количество, авторы со счётчиками и превью рецептов всех авторов.
+        response = self.assert_queries(
+            self.client, "/api/users/subscriptions/?recipes_limit=2", 3
+        )
+        self.assertEqual(len(response.data["results"]), 3)
+        for author in response.data["results"]:
+            self.assertEqual(len(author["recipes"]), 2)
+            self.assertEqual(author["recipes_count"], 3)
+
+    def test_queries_do_not_grow_with_page_size(self):
+        for limit in (1, 6, 12):
+            cache.clear()
+            self.assert_queries(self.client, f"/api/recipes/?limit={limit}", 4)
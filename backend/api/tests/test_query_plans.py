@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+
+from api.management.commands.check_query_plans import (
+    ORDERED_SCANS,
+    SQLITE_SCAN,
+    full_scans,
+    hot_queries,
+)
+from api.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingList,
+    Subscription,
+    User,
+)
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class QueryPlanTests(TestCase):
+    """
+    Запросы горячих путей (списки, фильтры, корзина, подписки)
+    читают таблицы по индексам, а не полным сканированием.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, author = (
+            User.objects.create_user(
+                username=username,
+                email=f"{username}@example.org",
+                password="x",
+            )
+            for username in ("reader", "author")
+        )
+        ingredient = Ingredient.objects.create(
+            name="свёкла", measurement_unit="г"
+        )
+        for index in range(5):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f"борщ {index}",
+                text="текст",
+                cooking_time=5,
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=1
+            )
+            Favorite.objects.create(user=cls.user, recipe=recipe)
+            ShoppingList.objects.create(user=cls.user, recipe=recipe)
+        Subscription.objects.create(subscriber=cls.user, author=author)
+
+    def skip_unless_sqlite(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Планы разбираются здесь только для SQLite.")
+
+    def test_hot_queries_do_not_scan_tables(self):
+        self.skip_unless_sqlite()
+        for name, queryset in hot_queries(self.user).items():
+            with self.subTest(query=name):
+                plan = queryset.explain()
+                self.assertEqual(
+                    full_scans(
+                        plan, SQLITE_SCAN, ORDERED_SCANS.get(name, set())
+                    ),
+                    [],
+                    plan,
+                )
+
+    def test_full_scan_is_detected(self):
+        self.skip_unless_sqlite()
+        plan = Recipe.objects.filter(text="текст").explain()
+        self.assertEqual(full_scans(plan, SQLITE_SCAN), ["api_recipe"])
+
+    def test_command_passes(self):
+        stdout = StringIO()
+        call_command("check_query_plans", stdout=stdout)
+        self.assertIn("Все запросы используют индексы.", stdout.getvalue())
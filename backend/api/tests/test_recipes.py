@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Ingredient, Recipe, RecipeIngredient, User
+
+from .utils import TemporaryMediaMixin, isolated_caches, png_data_uri
+
+
+@isolated_caches
+class RecipeIngredientsTests(TemporaryMediaMixin, TestCase):
+    """
+    Изменение рецепта сохраняет состав целиком: новые ингредиенты
+    добавляются, лишние удаляются, у остальных меняется количество.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username="author", email="author@example.org", password="x"
+        )
+        cls.salt, cls.sugar, cls.beet, cls.onion = (
+            Ingredient.objects.create(name=name, measurement_unit="г")
+            for name in ("соль", "сахар", "свёкла", "лук")
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def payload(self, ingredients):
+        return {
+            "name": "борщ",
+            "text": "текст",
+            "cooking_time": 30,
+            "image": png_data_uri(),
+            "ingredients": [
+                {"id": ingredient.pk, "amount": amount}
+                for ingredient, amount in ingredients
+            ],
+        }
+
+    def rows(self, recipe_id):
+        return set(
+            RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list(
+                "ingredient_id", "amount"
+            )
+        )
+
+    def test_create_keeps_every_ingredient(self):
+        response = self.client.post(
+            "/api/recipes/",
+            self.payload([(self.salt, 5), (self.sugar, 10), (self.beet, 1)]),
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(
+            self.rows(response.data["id"]),
+            {(self.salt.pk, 5), (self.sugar.pk, 10), (self.beet.pk, 1)},
+        )
+
+    def test_patch_updates_removes_and_adds_rows(self):
+        recipe = Recipe.objects.create(
+            author=self.author, name="борщ", text="текст", cooking_time=30
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in (self.salt, self.sugar, self.beet)
+        )
+        untouched = RecipeIngredient.objects.get(
+            recipe=recipe, ingredient=self.salt
+        )
+        payload = self.payload(
+            [(self.salt, 1), (self.sugar, 7), (self.onion, 2)]
+        )
+
+        # Рецепт, автор, по запросу на каждый ингредиент и общая проверка,
+        # точка сохранения, UPDATE рецепта, текущий состав, по одному
+        # DELETE, UPDATE и INSERT, фиксация, подписки и состав для ответа.
+        with self.assertNumQueries(15):
+            response = self.client.patch(
+                f"/api/recipes/{recipe.pk}/", payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            self.rows(recipe.pk),
+            {(self.salt.pk, 1), (self.sugar.pk, 7), (self.onion.pk, 2)},
+        )
+        self.assertTrue(
+            RecipeIngredient.objects.filter(pk=untouched.pk).exists()
+        )
+        self.assertEqual(
+            {
+                item["id"]: item["amount"]
+                for item in response.data["ingredients"]
+            },
+            {self.salt.pk: 1, self.sugar.pk: 7, self.onion.pk: 2},
+        )
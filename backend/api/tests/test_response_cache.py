@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Recipe, User
+from api.relations import relation_cache
+from api.response_cache import RECIPES, recipe_version_name
+from api.versions import get_version
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+class ResponseCacheTests(TestCase):
+    """
+    В кеше лежит ответ для анонима, а флаги избранного, корзины
+    и подписки каждый пользователь получает только свои.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second, author = (
+            User.objects.create_user(
+                username=username,
+                email=f"{username}@example.org",
+                password="x",
+            )
+            for username in ("first", "second", "author")
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=author,
+                name=f"рецепт {index}",
+                text="текст",
+                cooking_time=5,
+            )
+            for index in range(3)
+        ]
+        cls.recipe = cls.recipes[0]
+
+    def setUp(self):
+        cache.clear()
+        relation_cache.clear()
+        self.anonymous = APIClient()
+        self.clients = {}
+        for user in (self.first, self.second):
+            self.clients[user.username] = client = APIClient()
+            client.force_authenticate(user)
+
+    def flags(self, client, url):
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        items = response.data.get("results", [response.data])
+        return {
+            item["id"]: (item["is_favorited"], item["is_in_shopping_cart"])
+            for item in items
+        }
+
+    def assert_flags(self, url, favorited_by_first, in_cart_of_second):
+        expected = {
+            "first": (favorited_by_first, False),
+            "second": (False, in_cart_of_second),
+        }
+        for name, client in self.clients.items():
+            with self.subTest(user=name, url=url):
+                self.assertEqual(
+                    self.flags(client, url)[self.recipe.pk], expected[name]
+                )
+        with self.subTest(user="anonymous", url=url):
+            self.assertEqual(
+                self.flags(self.anonymous, url)[self.recipe.pk], (False, False)
+            )
+
+    def change(self, method, url):
+        client = self.clients["first" if "favorite" in url else "second"]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(client, method)(url)
+        self.assertIn(response.status_code, (201, 204))
+
+    def test_flags_are_personal(self):
+        urls = ["/api/recipes/", f"/api/recipes/{self.recipe.pk}/"]
+        for url in urls:
+            self.assert_flags(url, False, False)
+
+        recipes = get_version(RECIPES)
+        recipe = get_version(recipe_version_name(self.recipe.pk))
+        self.change("post", f"/api/recipes/{self.recipe.pk}/favorite/")
+        self.change("post", f"/api/recipes/{self.recipe.pk}/shopping_cart/")
+        self.assertGreater(get_version(RECIPES), recipes)
+        self.assertGreater(
+            get_version(recipe_version_name(self.recipe.pk)), recipe
+        )
+        for url in urls:
+            self.assert_flags(url, True, True)
+
+        self.change("delete", f"/api/recipes/{self.recipe.pk}/favorite/")
+        self.change("delete", f"/api/recipes/{self.recipe.pk}/shopping_cart/")
+        for url in urls:
+            self.assert_flags(url, False, False)
+
+    def test_anonymous_body_is_cached(self):
+        url = "/api/recipes/"
+        self.flags(self.clients["first"], url)
+        with self.assertNumQueries(0):
+            flags = self.flags(self.anonymous, url)
+        self.assertEqual(len(flags), 3)
+
+    def test_cached_body_has_no_personal_flags(self):
+        first = self.clients["first"]
+        with self.captureOnCommitCallbacks(execute=True):
+            first.post(f"/api/recipes/{self.recipe.pk}/favorite/")
+        self.assertEqual(
+            self.flags(first, "/api/recipes/")[self.recipe.pk], (True, False)
+        )
+        with self.assertNumQueries(0):
+            flags = self.flags(self.anonymous, "/api/recipes/")
+        self.assertEqual(flags[self.recipe.pk], (False, False))
+
+    def test_versions_are_kept_in_process_briefly(self):
+        get_version(RECIPES)
+        shared_reads = sum(
+            cache.stats()["shared"][key] for key in ("hits", "misses")
+        )
+        for _ in range(5):
+            get_version(RECIPES)
+        self.assertEqual(
+            sum(cache.stats()["shared"][key] for key in ("hits", "misses")),
+            shared_reads,
+        )
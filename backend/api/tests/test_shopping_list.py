@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Ingredient, Recipe, RecipeIngredient, ShoppingList, User
+
+from .utils import isolated_caches
+
+URL = "/api/recipes/download_shopping_cart/"
+
+
+@isolated_caches
+class ShoppingListDownloadTests(TestCase):
+    """
+    Список покупок отдаётся потоком в txt, csv или json:
+    количество одинаковых ингредиентов из разных рецептов суммируется.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, other = (
+            User.objects.create_user(
+                username=username,
+                email=f"{username}@example.org",
+                password="x",
+            )
+            for username in ("buyer", "other")
+        )
+        salt, beet, milk = (
+            Ingredient.objects.create(name=name, measurement_unit=unit)
+            for name, unit in (
+                ("соль", "г"),
+                ("свёкла", "г"),
+                ("молоко", "мл"),
+            )
+        )
+        borscht, porridge, foreign = (
+            Recipe.objects.create(
+                author=other, name=name, text="текст", cooking_time=5
+            )
+            for name in ("борщ", "каша", "чужой")
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+            for recipe, ingredient, amount in (
+                (borscht, salt, 5),
+                (borscht, beet, 300),
+                (porridge, salt, 2),
+                (porridge, milk, 250),
+                (foreign, milk, 1000),
+            )
+        )
+        for recipe in (borscht, porridge):
+            ShoppingList.objects.create(user=cls.user, recipe=recipe)
+        ShoppingList.objects.create(user=other, recipe=foreign)
+        cls.expected = [
+            ("молоко", "мл", 250),
+            ("свёкла", "г", 300),
+            ("соль", "г", 7),
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def download(self, query="", **headers):
+        response = self.client.get(URL + query, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_txt_is_default(self):
+        response, body = self.download()
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="shopping_list.txt"',
+        )
+        self.assertEqual(body, "молоко-250(мл)\nсвёкла-300(г)\nсоль-7(г)")
+
+    def test_csv(self):
+        response, body = self.download("?format=csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], ["name", "measurement_unit", "amount"])
+        self.assertEqual(
+            rows[1:],
+            [
+                [name, unit, str(amount)]
+                for name, unit, amount in self.expected
+            ],
+        )
+
+    def test_json_by_accept_header(self):
+        response, body = self.download(HTTP_ACCEPT="application/json")
+        self.assertEqual(
+            response["Content-Type"], "application/json; charset=utf-8"
+        )
+        self.assertEqual(
+            json.loads(body),
+            [
+                {"name": name, "measurement_unit": unit, "amount": amount}
+                for name, unit, amount in self.expected
+            ],
+        )
+
+    def test_empty_cart(self):
+        ShoppingList.objects.filter(user=self.user).delete()
+        for query, expected in (
+            ("?format=txt", ""),
+            ("?format=csv", "name,measurement_unit,amount\r\n"),
+            ("?format=json", "[]"),
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(self.download(query)[1], expected)
+
+    def test_anonymous(self):
+        response = APIClient().get(URL)
+        self.assertEqual(response.status_code, 401)
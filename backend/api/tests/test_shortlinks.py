@@ -0,0 +1,76 @@
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Recipe, ShortLink, User
+from api.shortlinks import HitCounter, code_cache, hit_counter
+
+from .utils import isolated_caches
+
+
+@isolated_caches
+class ShortLinkTests(TestCase):
+    """Короткая ссылка ведёт на рецепт, пока рецепт существует."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username="author", email="author@example.org", password="x"
+        )
+        cls.recipe = Recipe.objects.create(
+            author=author, name="борщ", text="текст", cooking_time=5
+        )
+
+    def setUp(self):
+        cache.clear()
+        code_cache.clear()
+        self.client = APIClient()
+
+    def short_code(self):
+        response = self.client.get(f"/api/recipes/{self.recipe.pk}/get-link/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["short-link"].rstrip("/").rsplit("/", 1)[-1]
+
+    def test_redirect_is_served_from_cache(self):
+        code = self.short_code()
+        response = self.client.get(f"/s/{code}")
+        self.assertRedirects(
+            response,
+            f"/recipes/{self.recipe.pk}",
+            fetch_redirect_response=False,
+        )
+        with self.assertNumQueries(0):
+            self.client.get(f"/s/{code}")
+        hit_counter.flush()
+        self.assertEqual(ShortLink.objects.get(code=code).hits, 2)
+
+    def test_deleted_recipe_link_is_not_found(self):
+        code = self.short_code()
+        self.assertEqual(self.client.get(f"/s/{code}").status_code, 302)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        self.assertIsNone(code_cache.get(code))
+        self.assertEqual(self.client.get(f"/s/{code}").status_code, 404)
+
+    def test_unknown_code_is_not_found(self):
+        self.assertEqual(self.client.get("/s/nope42").status_code, 404)
+        self.assertEqual(self.client.get("/s/bad-code!").status_code, 404)
+
+
+class HitCounterTests(TestCase):
+    def test_flushes_after_threshold(self):
+        counter = HitCounter(interval=3600, threshold=3)
+        flushes = []
+        counter.flush = lambda: flushes.append(1)
+        for _ in range(3):
+            counter.add("abc")
+        self.assertEqual(flushes, [1])
+
+    def test_flushes_on_timer_without_new_hits(self):
+        counter = HitCounter(interval=0.01, threshold=1000)
+        flushed = threading.Event()
+        counter.flush = flushed.set
+        counter.add("abc")
+        self.assertTrue(flushed.wait(5))
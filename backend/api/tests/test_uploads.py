@@ -0,0 +1,198 @@
+import os
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import derivatives
+from api.models import UploadSession, User
+
+from .utils import (
+    InlineExecutor,
+    TemporaryMediaMixin,
+    isolated_caches,
+    png_bytes,
+)
+
+
+@isolated_caches
+class UploadSessionTests(TemporaryMediaMixin, TestCase):
+    """
+    Изображение загружается частями по Upload-Offset, а готовая
+    сессия подставляется в поле изображения как «upload:<id>».
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = (
+            User.objects.create_user(
+                username=username,
+                email=f"{username}@example.org",
+                password="x",
+            )
+            for username in ("uploader", "other")
+        )
+
+    def setUp(self):
+        cache.clear()
+        inline = mock.patch.object(derivatives, "get_executor", InlineExecutor)
+        inline.start()
+        self.addCleanup(inline.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.image = png_bytes((64, 64))
+
+    def start(self, size=None):
+        response = self.client.post(
+            "/api/uploads/",
+            {"size": size or len(self.image)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def send(self, session_id, offset, data, client=None):
+        return (client or self.client).generic(
+            "PATCH",
+            f"/api/uploads/{session_id}/",
+            data,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_chunks_are_resumed_and_used_as_avatar(self):
+        session = self.start()
+        half = len(self.image) // 2
+
+        response = self.send(session["id"], 0, self.image[:half])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Upload-Offset"], str(half))
+        self.assertFalse(response.data["complete"])
+
+        # Повтор уже принятой части: клиент узнаёт, откуда продолжить.
+        response = self.send(session["id"], 0, self.image[:half])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["offset"], half)
+
+        response = self.client.get(f"/api/uploads/{session['id']}/")
+        self.assertEqual(response.data["offset"], half)
+
+        response = self.send(session["id"], half, self.image[half:])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["complete"])
+        self.assertEqual(response.data["content_type"], "image/png")
+
+        path = UploadSession.objects.get(pk=session["id"]).path
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), self.image)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                "/api/users/me/avatar/",
+                {"avatar": session["reference"]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.path.exists(path))
+        self.user.refresh_from_db()
+        with self.user.avatar.open("rb") as file:
+            self.assertEqual(file.read(), self.image)
+
+    def test_incomplete_session_is_rejected(self):
+        session = self.start()
+        self.send(session["id"], 0, self.image[:10])
+        response = self.client.put(
+            "/api/users/me/avatar/",
+            {"avatar": session["reference"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(UploadSession.objects.exists())
+
+    def test_not_an_image(self):
+        session = self.start()
+        response = self.send(session["id"], 0, b"x" * len(self.image))
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(UploadSession.objects.get(pk=session["id"]).offset, 0)
+
+    def test_chunk_past_declared_size(self):
+        session = self.start(size=10)
+        response = self.send(session["id"], 0, self.image[:20])
+        self.assertEqual(response.status_code, 413)
+
+    def test_sessions_are_private(self):
+        session = self.start()
+        other = APIClient()
+        other.force_authenticate(self.other)
+        response = self.send(session["id"], 0, self.image, client=other)
+        self.assertEqual(response.status_code, 404)
+        response = other.put(
+            "/api/users/me/avatar/",
+            {"avatar": session["reference"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete(self):
+        session = self.start()
+        self.send(session["id"], 0, self.image[:10])
+        path = UploadSession.objects.get(pk=session["id"]).path
+        response = self.client.delete(f"/api/uploads/{session['id']}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(os.path.exists(path))
+
+
+class ClearUploadSessionsTests(TemporaryMediaMixin, TestCase):
+    """Команда удаляет брошенные сессии и файлы без сессий."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="uploader", email="uploader@example.org", password="x"
+        )
+
+    def session(self, hours_ago):
+        session = UploadSession.objects.create(user=self.user, size=10)
+        UploadSession.objects.filter(pk=session.pk).update(
+            created=timezone.now() - timedelta(hours=hours_ago)
+        )
+        self.touch(session.path, hours_ago)
+        return session
+
+    def touch(self, path, hours_ago):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"part")
+        moment = time.time() - hours_ago * 3600
+        os.utime(path, (moment, moment))
+        return path
+
+    def test_clear(self):
+        stale, fresh = self.session(48), self.session(1)
+        directory = settings.UPLOAD_SESSIONS_DIR
+        orphan = self.touch(os.path.join(directory, "orphan.part"), 48)
+        recent = self.touch(os.path.join(directory, "recent.part"), 1)
+
+        output = StringIO()
+        call_command("clear_upload_sessions", "--hours", "24", stdout=output)
+
+        self.assertIn(
+            "Удалено сессий: 1, лишних файлов: 1.", output.getvalue()
+        )
+        self.assertEqual(
+            list(UploadSession.objects.values_list("pk", flat=True)),
+            [fresh.pk],
+        )
+        self.assertFalse(os.path.exists(stale.path))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(os.path.exists(fresh.path))
+        # Файл мог появиться раньше, чем сессия попала в базу.
+        self.assertTrue(os.path.exists(recent))
@@ -0,0 +1,57 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.test import override_settings
+from PIL import Image
+
+# Кеши тестов живут в памяти процесса, чтобы не читать и не портить
+# общий кеш разработчика и не получать ответы из кеша прошлых запусков.
+isolated_caches = override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "api.cache_backends.TieredCache",
+            "OPTIONS": {"SHARED": "shared"},
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "foodgram-tests",
+        },
+    },
+)
+
+
+class InlineExecutor:
+    """Строит производные сразу, чтобы тест не ждал пул потоков."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class TemporaryMediaMixin:
+    """Загруженные файлы и сессии загрузки пишутся во временный каталог."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp(prefix="foodgram-tests-")
+        cls.addClassCleanup(shutil.rmtree, cls.media_root, True)
+        media = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            UPLOAD_SESSIONS_DIR=f"{cls.media_root}/upload_sessions",
+        )
+        media.enable()
+        cls.addClassCleanup(media.disable)
+        super().setUpClass()
+
+
+def png_bytes(size=(4, 4), color="red") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def png_data_uri(size=(4, 4), color="red") -> str:
+    """Картинка в виде, в котором её присылает фронтенд."""
+    encoded = base64.b64encode(png_bytes(size, color)).decode()
+    return f"data:image/png;base64,{encoded}"
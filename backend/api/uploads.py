@@ -0,0 +1,125 @@
+import os
+from typing import Optional
+
+import filetype
+from django.core.files import File
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+
+from .constants import (
+    ALLOWED_IMAGE_TYPES,
+    IMAGE_HEADER_SIZE,
+    MAX_IMAGE_SIZE,
+    UPLOAD_READ_SIZE,
+)
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """MIME-тип изображения по первым байтам или None, если тип не разрешён."""
+    kind = filetype.image_match(head[:IMAGE_HEADER_SIZE])
+    if kind is None or kind.mime not in ALLOWED_IMAGE_TYPES:
+        return None
+    return kind.mime
+
+
+def image_extension(mime: str) -> str:
+    kind = filetype.get_type(mime=mime)
+    return kind.extension if kind else "bin"
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Обработчик multipart-загрузок изображений: файл пишется во временный
+    файл на диске, тип проверяется по первым байтам, а размер — по ходу
+    чтения, так что неподходящая загрузка обрывается до конца тела запроса.
+    """
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        limit = MAX_IMAGE_SIZE + IMAGE_HEADER_SIZE
+        if content_length and content_length > limit:
+            raise MultiPartParserError("Файл изображения слишком большой.")
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.head = b""
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_IMAGE_SIZE:
+            raise MultiPartParserError("Файл изображения слишком большой.")
+        if len(self.head) < IMAGE_HEADER_SIZE:
+            self.head += raw_data[:IMAGE_HEADER_SIZE - len(self.head)]
+            if len(self.head) >= IMAGE_HEADER_SIZE:
+                self._check_type()
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if len(self.head) < IMAGE_HEADER_SIZE:
+            self._check_type()
+        return super().file_complete(file_size)
+
+    def _check_type(self):
+        if sniff_image_type(self.head) is None:
+            raise MultiPartParserError("Файл не является изображением.")
+
+
+class ImageUploadMixin:
+    """Подключает ImageUploadHandler к запросам вьюсета."""
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+
+class SessionUploadedFile(File):
+    """
+    Файл завершённой сессии загрузки. temporary_file_path позволяет
+    валидатору и хранилищу работать с файлом на диске без чтения в память.
+    """
+
+    def __init__(self, session):
+        self.path = session.path
+        super().__init__(
+            open(self.path, "rb"),
+            name=f"upload.{image_extension(session.content_type)}",
+        )
+        self.content_type = session.content_type
+
+    def temporary_file_path(self):
+        return self.path
+
+
+class UploadRejected(Exception):
+    """Часть загрузки не прошла проверку."""
+
+
+def append_chunk(session, stream, length: int) -> int:
+    """
+    Дописать в файл сессии до length байт из потока запроса.
+    Тип изображения проверяется по первому прочитанному блоку до записи
+    на диск. Возвращает число записанных байт.
+    """
+    written = 0
+    file = None
+    try:
+        while written < length:
+            data = stream.read(min(UPLOAD_READ_SIZE, length - written))
+            if not data:
+                break
+            if file is None:
+                if session.offset == 0:
+                    mime = sniff_image_type(data)
+                    if mime is None:
+                        raise UploadRejected("Файл не является изображением.")
+                    session.content_type = mime
+                os.makedirs(os.path.dirname(session.path), exist_ok=True)
+                file = open(session.path, "ab")
+            file.write(data)
+            written += len(data)
+    finally:
+        if file is not None:
+            file.close()
+    return written
@@ -0,0 +1,61 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .constants import VERSION_CACHE_KEY
+from .models import Revision
+
+
+def get_version(name: str) -> float:
+    """
+    Текущая версия набора данных name.
+    Версия — момент последнего изменения, поэтому годится и для Last-Modified.
+    """
+    key = VERSION_CACHE_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name: str) -> float:
+    """Отметить, что набор данных name изменился."""
+    key = VERSION_CACHE_KEY.format(name=name)
+    version = max(time.time(), (cache.get(key) or 0) + 1e-6)
+    cache.set(key, version, None)
+    return version
+
+
+def get_revision(name: str) -> int:
+    """
+    Номер ревизии набора данных name: целое, которое растёт на единицу
+    при каждом bump_revision. В отличие от версии-времени по нему видно,
+    не было ли между двумя изменениями чужих.
+    """
+    revision = (
+        Revision.objects.filter(name=name)
+        .values_list("value", flat=True)
+        .first()
+    )
+    return revision or 0
+
+
+def bump_revision(name: str) -> int:
+    """
+    Увеличить ревизию на единицу и вернуть новое значение.
+    Счётчик живёт в базе, а не в кеше: у FileBasedCache и LocMemCache
+    incr — это чтение и запись без блокировки, и два воркера могли бы
+    получить один и тот же номер. UPDATE держит блокировку строки
+    до конца транзакции, поэтому прочитанное значение — наше.
+    """
+    with transaction.atomic():
+        Revision.objects.bulk_create(
+            [Revision(name=name)], ignore_conflicts=True
+        )
+        Revision.objects.filter(name=name).update(value=F("value") + 1)
+        return Revision.objects.values_list("value", flat=True).get(
+            name=name
+        )